@@ -0,0 +1,339 @@
+# ============================
+# API.PY - HTTP JSON API
+# Stdlib-only HTTP/1.1 front end for web and mobile clients: one request
+# sends one action and returns the engine's events, their prose and a
+# state summary. Connections are kept alive; sessions live in an
+# in-memory sessions.SessionManager table (idle ones hibernate to disk).
+#
+#   POST   /sessions                 {"seed": 1}?   → {"session", "state"}
+#   GET    /sessions/<id>                           → {"session", "state"}
+#   POST   /sessions/<id>/actions    action         → {"events", "text", "state"}
+#   DELETE /sessions/<id>
+#
+# An action is a raw engine action ({"type": "craft", "recipe": "Spear"})
+# or a batch.py command line ({"command": "craft spear"}).
+#
+# Usage:  python api.py [--host 0.0.0.0] [--port $PORT or 8000]
+# Bench:  python api.py bench [--clients 50] [--requests 400]
+# ============================
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import time
+from contextlib import ExitStack, contextmanager
+
+from batch import parse_command
+from engine import GameEngine
+from narration import narrate, text_only
+from sessions import SessionManager
+
+DEFAULT_PORT = 8000
+SESSION_DIR = os.path.join("saves", ".sessions")
+MAX_HEADER = 16 * 1024
+MAX_BODY = 64 * 1024
+BACKLOG = 1024
+KEEPALIVE_TIMEOUT = 75.0        # seconds an idle keep-alive connection stays open
+SWEEP_EVERY = 5.0
+ACTION_FIELDS = ("item", "recipe", "weapon", "path")   # names the engine looks up in its tables
+REASONS = {200: "OK", 201: "Created", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 408: "Request Timeout", 413: "Payload Too Large",
+           500: "Internal Server Error", 501: "Not Implemented"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def summary(state):
+    """What a client needs to draw the screen and offer the right actions."""
+    fight = state.fight
+    return {
+        "hp": state.hp, "max_hp": state.max_hp, "xp": state.xp, "next_level": int(state.upgrade_amt),
+        "level": state.lv, "attack": state.total_attack(), "weapon": state.current_weapon,
+        "area": state.area_name(), "alive": state.alive,
+        "fight": None if fight is None else {"enemy": fight["enemy"]["name"], "enemy_hp": fight["enemy_hp"],
+                                             "boss": fight["boss"], "allow_run": fight["allow_run"]},
+        "pending_area": state.pending_area is not None,
+        "level_up": [{"path": p, "tier": t, "description": d} for p, t, d in state.upgrade_choices()]
+                    if fight is None and state.can_level_up() else None,
+        "usable_items": state.usable_items(),
+        "weapons": list(state.weapons_inventory),
+        "bag": state.bag,
+        "buildings": state.buildings,
+    }
+
+
+class GameAPI:
+    """Routes requests to the session table; one request is handled start to finish without awaiting."""
+
+    def __init__(self, sessions):
+        self.engine = GameEngine()
+        self.sessions = sessions
+        self.requests = 0
+
+    def route(self, method, path, body):
+        """(status, JSON-able reply or None) for one request."""
+        parts = [p for p in path.split("?", 1)[0].split("/") if p]
+        if parts[:1] != ["sessions"] or len(parts) > 3:
+            raise HTTPError(404, "no such endpoint")
+        if len(parts) == 1:
+            if method != "POST":
+                raise HTTPError(405, "use POST /sessions")
+            seed = body.get("seed") if isinstance(body, dict) else None
+            if seed is not None and not isinstance(seed, int):
+                raise HTTPError(400, "seed must be an integer")
+            sid = self.sessions.create(seed=seed)
+            with self.session(sid) as s:
+                return 201, {"session": sid, "state": summary(s.state)}
+
+        sid = parts[1]
+        if sid not in self.sessions:
+            raise HTTPError(404, f"no session {sid}")
+        if len(parts) == 2:
+            if method == "GET":
+                with self.session(sid) as s:
+                    return 200, {"session": sid, "state": summary(s.state)}
+            if method == "DELETE":
+                self.sessions.close(sid)
+                return 204, None
+            raise HTTPError(405, "use GET or DELETE")
+        if parts[2] != "actions":
+            raise HTTPError(404, "no such endpoint")
+        if method != "POST":
+            raise HTTPError(405, "use POST")
+        return 200, self.act(sid, self.parse_action(body))
+
+    @contextmanager
+    def session(self, sid):
+        """sessions.session(sid), but a session closed since the check (by another worker, say) is a 404."""
+        with ExitStack() as stack:
+            try:
+                session = stack.enter_context(self.sessions.session(sid))
+            except KeyError:
+                raise HTTPError(404, f"no session {sid}") from None
+            yield session
+
+    def parse_action(self, body):
+        if not isinstance(body, dict):
+            raise HTTPError(400, "send a JSON object")
+        if "command" in body:
+            try:
+                action = parse_command(str(body["command"]))
+            except ValueError as e:
+                raise HTTPError(400, str(e)) from None
+            if not isinstance(action, dict):
+                raise HTTPError(400, "not an action")
+        else:
+            action = body
+        if not isinstance(action.get("type"), str):
+            raise HTTPError(400, "an action needs a string 'type' (or send {'command': ...})")
+        if action["type"] not in self.engine.handlers:
+            raise HTTPError(400, f"unknown action '{action['type']}'")
+        for field in ACTION_FIELDS:
+            if field in action and action[field] is not None and not isinstance(action[field], str):
+                raise HTTPError(400, f"'{field}' must be a string")
+        return action
+
+    def act(self, sid, action):
+        with self.session(sid) as s:
+            state = s.state
+            events = self.engine.step(state, action)
+            text = []
+            for ev in events:
+                text += text_only(narrate(ev, state))
+            return {"events": events, "text": text, "state": summary(state)}
+
+
+# ===============================================
+#                 HTTP/1.1 Server
+# ===============================================
+class HTTPServer:
+    """Minimal keep-alive HTTP/1.1 over asyncio streams, in front of a GameAPI."""
+
+    def __init__(self, api):
+        self.api = api
+        self._server = None
+        self._sweeper = None
+
+    async def start(self, host="0.0.0.0", port=DEFAULT_PORT, sock=None):
+        """Listen on host:port, or on an already bound `sock` (prefork.py's workers). Returns the port."""
+        if sock is not None:
+            host = port = None
+        self._server = await asyncio.start_server(self.handle_connection, host, port, sock=sock, limit=MAX_HEADER,
+                                                  backlog=BACKLOG)
+        self._sweeper = asyncio.create_task(self._sweep_loop())
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self._sweeper.cancel()
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(SWEEP_EVERY)
+            self.api.sessions.sweep()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEPALIVE_TIMEOUT)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+                    break
+                except asyncio.LimitOverrunError:
+                    self.respond(writer, 413, {"error": "headers too large"}, False)
+                    break
+                keep_alive = await self.handle_request(head, reader, writer)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def handle_request(self, head, reader, writer):
+        """Answer one request; returns whether the connection stays open."""
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, path, version = lines[0].split(" ")
+        except ValueError:
+            self.respond(writer, 400, {"error": "bad request line"}, False)
+            return False
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+        if "transfer-encoding" in headers:
+            # Only Content-Length framing is read; skipping a chunked body would parse it as the next request
+            self.respond(writer, 501, {"error": "Transfer-Encoding is not supported, send Content-Length"}, False)
+            return False
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.respond(writer, 400, {"error": "bad Content-Length"}, False)
+            return False
+        if length > MAX_BODY:
+            self.respond(writer, 413, {"error": "body too large"}, False)
+            return False
+        try:
+            body = await asyncio.wait_for(reader.readexactly(length), KEEPALIVE_TIMEOUT) if length else b""
+        except asyncio.TimeoutError:
+            self.respond(writer, 408, {"error": "body not received in time"}, False)
+            return False
+        except asyncio.IncompleteReadError:
+            return False   # the client hung up mid-body
+
+        self.api.requests += 1
+        try:
+            try:
+                payload = json.loads(body) if body else {}
+            except ValueError:
+                raise HTTPError(400, "body is not JSON") from None
+            status, reply = self.api.route(method, path, payload)
+        except HTTPError as e:
+            status, reply = e.status, {"error": str(e)}
+        except Exception as e:
+            status, reply = 500, {"error": f"{type(e).__name__}: {e}"}
+        self.respond(writer, status, reply, keep_alive)
+        return keep_alive
+
+    def respond(self, writer, status, reply, keep_alive):
+        data = b"" if reply is None else json.dumps(reply, separators=(",", ":")).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+        )
+
+
+# ===============================================
+#                   Benchmark
+# ===============================================
+async def request(reader, writer, method, path, body=None):
+    data = b"" if body is None else json.dumps(body).encode("utf-8")
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: bench\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data)
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = int(head.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+    return json.loads(await reader.readexactly(length)) if length else None
+
+async def bench_client(port, requests, latencies):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port, limit=1 << 20)
+    reply = await request(reader, writer, "POST", "/sessions", {})
+    path = f"/sessions/{reply['session']}/actions"
+    rotation = ({"type": "explore"}, {"type": "search"}, {"type": "check_traps"}, {"command": "craft spear"})
+    state = reply["state"]
+    for i in range(requests - 1):
+        if state["fight"]:
+            action = {"type": "attack"}
+        elif state["pending_area"]:
+            action = {"type": "advance", "accept": True}
+        elif state["level_up"]:
+            action = {"type": "upgrade", "path": state["level_up"][0]["path"]}
+        else:
+            action = rotation[i % len(rotation)]
+        began = time.perf_counter()
+        state = (await request(reader, writer, "POST", path, action))["state"]
+        latencies.append(time.perf_counter() - began)
+    writer.close()
+
+async def bench(clients, requests):
+    root = tempfile.mkdtemp(prefix="backwoods-api-")
+    server = HTTPServer(GameAPI(SessionManager(root)))
+    port = await server.start("127.0.0.1", 0)
+    latencies = []
+    began = time.perf_counter()
+    await asyncio.gather(*(bench_client(port, requests, latencies) for _ in range(clients)))
+    elapsed = time.perf_counter() - began
+    await server.close()
+    shutil.rmtree(root, ignore_errors=True)
+    latencies.sort()
+    p = lambda q: latencies[min(len(latencies) - 1, int(len(latencies) * q))] * 1000
+    n = server.api.requests
+    print(f"{clients} keep-alive clients, {n:,} requests in {elapsed:.2f}s: {n / elapsed:,.0f} requests/s "
+          f"(clients in the same process)")
+    print(f"  latency p50 {p(0.5):.2f} ms, p99 {p(0.99):.2f} ms")
+
+
+# ===============================================
+# Entry
+# ===============================================
+async def serve(host, port, session_dir):
+    server = HTTPServer(GameAPI(SessionManager(session_dir)))
+    port = await server.start(host, port)
+    print(f"The Backwoods API on http://{host}:{port}/sessions")
+    await server._server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP JSON API for The Backwoods.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", DEFAULT_PORT)))
+    parser.add_argument("--sessions", default=SESSION_DIR, help="where idle sessions hibernate")
+    sub = parser.add_subparsers(dest="command")
+    p = sub.add_parser("bench", help="keep-alive clients against an in-process server")
+    p.add_argument("--clients", type=int, default=50)
+    p.add_argument("--requests", type=int, default=400, help="per client")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "bench":
+            asyncio.run(bench(args.clients, args.requests))
+        else:
+            asyncio.run(serve(args.host, args.port, args.sessions))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -1,250 +1,74 @@
 # ============================
 # APP.PY - The Backwoods
+# Terminal client: prompts & prose on top of engine.py
 # ============================
 
 import sys
-import time
-import random
 import os
-import json
+import random
+import argparse
+import atexit
 
 SAVE_DIR = "saves"
 
-# ==== Imports: Areas & Animals ====
+# ==== Imports: Areas & Rules ====
 from map import areas
-from animals import (
-    camp_animals,
-    forest_animals,
-    highlands_animals,
-    jungle_animals,
-    boss,
+from engine import (
+    GameEngine,
+    GameState,
+    CAMPFIRE_COST,
+    FINDABLE_WEAPONS,
+    WORKBENCH_COST,
+    start_boss_fight,
 )
-
-# ==== Constants & Gameplay Flags ====
-FLYING_ENEMIES = {"Sparrow", "Hawk", "Eagle"}  # used by Bow special
-BOW_ENEMY_ATK_REDUCTION = 1
-
-# ==== Player State (INIT BEFORE ANY FUNCTION USES THEM) ====
-xp = 0
-upgrade_amt = 110
-hp = 60
-max_hp = 60
-att = 6
-lv = 1
-alive = True
-
-# ==== Upgrade Path Tracking ====
-strength_level = 0
-endurance_level = 0
-survival_level = 0
-crit_chance = 0  # percent
-
-# ==== World State ====
-current_area_index = 0  # starts at Camp
-current_weapon = "Fists"
-adrenaline_active = False
+from narration import RESTART_SCRIPT, boss_cinematic_script, inventory_lines, map_lines, narrate, stats_lines
+from presenter import DEFAULT_SPEED, SPEEDS, present
+from replay import SessionRecorder, format_command
+from storage import SlotStore
+from sqlstore import SQLiteSlotStore
+from autosave import AutosaveWriter
+from checkpoints import CheckpointRing
+from history import SaveHistory
+
+# ==== Player State (one game per terminal, on its own seeded RNG) ====
+session_seed = int.from_bytes(os.urandom(4), "big")
+state = GameState(random.Random(session_seed))
+engine = GameEngine()
+recorder = None  # replay.SessionRecorder when started with --record
+
+# ==== Save slots & autosave ====
+store = SlotStore(SAVE_DIR)
+history = SaveHistory(SAVE_DIR)   # every manual save is kept as a version (python history.py)
+current_slot = None
+autosaver = None         # AutosaveWriter, started by the entry point
+AUTOSAVE_SLOT = "autosave"  # where a game not loaded from / saved to a slot autosaves; reserved for that
+AUTOSAVE_EVENTS = {"victory", "ran_away", "death", "boss_defeated", "gather", "trap", "weapon_found",
+                   "crafted", "cooked", "upgraded", "area_entered"}
+
+# ==== Rewind buffer (menu-level states before each action; dev "rewind") ====
+checkpoints = CheckpointRing()
 
 # ==== DEV MODE FLAG ====
 devmode_active = False
 
-# ==== Inventory (Weapons / Items / Resources) ====
-weapons_inventory = {"Fists": {"name": "Fists", "bonus": 0}}  # name → {name, bonus}
-bag = {}  # name → count (Items + Resources; UI splits them)
-
-# Categories used for Inventory UI
-ITEM_NAMES = {"Fruit", "Food", "Medkit", "Bandage", "Adrenaline Shot"}
-RESOURCE_NAMES = {"Wood", "Stone", "Rope", "Fur", "Bones", "Scales", "Meat"}
-
-# ==== Weapons: Craftable & Findable (stats & availability) ====
-# Craftable basics:
-CRAFT_WEAPONS_BASIC = [
-    {"name": "Wooden Sword", "bonus": 2, "cost": {"Wood": 3}},
-    {"name": "Spear",        "bonus": 3, "cost": {"Wood": 2, "Bones": 1}},
-]
-# Requires Workbench to appear in crafting:
-CRAFT_WEAPONS_ADV = [
-    {"name": "Bone Spear",   "bonus": 4, "cost": {"Bones": 2, "Rope": 1, "Wood": 2}},
-]
-# Armor (Workbench unlocks these in crafting under Weapons section)
-CRAFT_ARMOR_ADV = [
-    {"name": "Scale Armor",  "hp_bonus": 10, "cost": {"Scales": 2, "Rope": 2}},
-    {"name": "Fur Cloak",    "hp_bonus": 5,  "cost": {"Fur": 3, "Rope": 1}},
-]
-# Find-only weapons by area:
-FINDABLE_WEAPONS = {
-    "Dagger":      {"bonus": 3, "areas": {"Camp", "Forest", "Highlands", "Jungle"}},
-    "Rusty Sword": {"bonus": 4, "areas": {"Forest", "Highlands", "Jungle"}},
-    "Bow":         {"bonus": 3, "areas": {"Forest", "Highlands", "Jungle"}},  # -1 enemy atk vs non-flying
-    "Axe":         {"bonus": 5, "areas": {"Jungle"}},  # Jungle-only
-}
-
-# ==== Buildings & Trap Logic ====
-buildings = {}  # e.g., {"Campfire": 1, "Trap": 2, "Advanced Trap": 1, "Workbench": 1}
-MAX_TRAPS_TOTAL = 4        # normal + advanced combined
-NTCC = 0.20                # Normal Trap Catch Chance
-ATCC = 0.35                # Advanced Trap Catch Chance
-
-# ==== Resource Distribution (by Area) ====
-RESOURCE_TABLE = {
-    "Camp": [
-        ("Wood",   0.35),
-        ("Stone",  0.20),
-        ("Rope",   0.15),
-        ("Bones",  0.00),
-        ("Scales", 0.00),
-        ("Fruit",  0.25),
-        ("Nothing",0.05),
-    ],
-    "Forest": [
-        ("Wood",   0.40),
-        ("Stone",  0.20),
-        ("Rope",   0.25),
-        ("Bones",  0.15),
-        ("Scales", 0.00),
-        ("Fruit",  0.20),
-        ("Nothing",0.05),
-    ],
-    "Highlands": [
-        ("Wood",   0.30),
-        ("Stone",  0.35),
-        ("Rope",   0.25),
-        ("Bones",  0.05),
-        ("Scales", 0.20),
-        ("Fruit",  0.15),
-        ("Nothing",0.05),
-    ],
-    "Jungle": [
-        ("Wood",   0.40),
-        ("Stone",  0.20),
-        ("Rope",   0.20),
-        ("Bones",  0.35),
-        ("Scales", 0.35),
-        ("Fruit",  0.10),
-        ("Nothing",0.05),
-    ],
-}
+# ==== Text speed: instant / fast / cinematic (Settings, or python app.py --speed fast) ====
+text_speed = DEFAULT_SPEED
 
 # ===============================================
 #                    Helpers
 # ===============================================
-def add_to_bag(name: str, count: int = 1):
-    """Add items/resources to the bag."""
-    bag[name] = bag.get(name, 0) + max(1, count)
-
-def remove_from_bag(req: dict):
-    """Consume a dict of resources from the bag."""
-    for k, v in req.items():
-        if k in bag:
-            bag[k] -= v
-            if bag[k] <= 0:
-                del bag[k]
-
-def have_in_bag(req: dict) -> bool:
-    """Check if the bag contains at least 'req' amounts for each resource."""
-    return all(bag.get(k, 0) >= v for k, v in req.items())
-
-def total_attack():
-    """Player base attack plus current weapon bonus."""
-    return att + weapons_inventory[current_weapon]["bonus"]
-
 def get_current_area_name():
-    return areas[current_area_index]["name"]
-
-def weighted_choice(pairs):
-    """Choose one key based on weights; pairs = [(key, weight), ...]. Works with any total sum."""
-    total = sum(w for _, w in pairs)
-    if total <= 0:
-        return pairs[-1][0]
-    r = random.random() * total
-    acc = 0.0
-    for key, w in pairs:
-        acc += w
-        if r < acc:
-            return key
-    return pairs[-1][0]  # fallback
-
-def is_trap_cap_reached():
-    return buildings.get("Trap", 0) + buildings.get("Advanced Trap", 0) >= MAX_TRAPS_TOTAL
-
-def normalize_resource_name(name: str) -> str:
-    """Normalize singular names from animals into our bag naming."""
-    if name == "Bone":  return "Bones"
-    if name == "Scale": return "Scales"
-    return name
-
-def show_missing_materials(cost):
-    """Print a clear 'you need/have' breakdown for crafting."""
-    print("Required:")
-    for k, v in cost.items():
-        have = bag.get(k, 0)
-        print(f" - {k}: {have}/{v}")
-
-def type_text(line, char_delay=0.15, end="\n"):
-    """Types text one character at a time."""
-    for ch in line:
-        print(ch, end="", flush=True)
-        time.sleep(char_delay)
-    print(end, end="", flush=True)
-
-def boss_cinematic():
-    cinematic_lines = [
-        "The ground trembles beneath your feet...",
-        "Somewhere in the darkness, gears begin to turn.",
-        "A low drone builds, pulsing like the heartbeat of a sleeping giant...",
-        "The iron doors shudder.",
-        "A presence stirs beyond the gate—older than memory, forged of metal and will...",
-    ]
-
-    for line in cinematic_lines:
-        type_text(line)
-        if "..." in line:
-            time.sleep(0.5)
-        else:
-            time.sleep(0.3)
-
-    # Boss name reveal slowly on one line
-    boss_name = "THE RUINED TITAN"
-    print("\n", end="")
-    for ch in boss_name:
-        print(ch, end="", flush=True)
-        time.sleep(0.3)
-    print("\n")
-
-    time.sleep(1)
-    print("\n" * 20)
-    print("...", flush=True)
-    time.sleep(1)
-
-def get_strong_animal(area_name):
-    """Strong animal used by Search (no XP)."""
-    if area_name == "Camp":
-        return {"name": "Wolf", "hp": 25, "attack": 5, "xp_reward": 0}
-    elif area_name == "Forest":
-        return {"name": "Wild Ape", "hp": 50, "attack": 9, "xp_reward": 0}
-    elif area_name == "Highlands":
-        return {"name": "Crocodile", "hp": 60, "attack": 12, "xp_reward": 0}
-    elif area_name == "Jungle":
-        return {"name": "Crocodile", "hp": 60, "attack": 12, "xp_reward": 0}
-    else:
-        return {"name": "Wolf", "hp": 25, "attack": 5, "xp_reward": 0}
-
-def game_end_sequence(enemy_name):
-    print("\n===================================")
-    time.sleep(0.5)
-    print(f"🏆 {enemy_name} collapses in a storm of fire and shrapnel...")
-    time.sleep(1)
-    print("The earth falls silent. The mechanical threat has been destroyed.")
-    time.sleep(1)
-    print("You have survived The Backwoods.")
-    time.sleep(1.5)
-    print("\n*** CONGRATULATIONS! YOU BEAT THE GAME ***\n")
-    time.sleep(1)
+    return state.area_name()
 
+def show(script):
+    """Print a narration script at the chosen text speed (any key skips ahead)."""
+    present(script, text_speed)
+
+def game_end_menu():
     while True:
         choice = input("[1] Return to Main Menu\n[2] Quit Game\n> ").strip()
         if choice == "1":
-            start_menu()
-            return
+            go_to("start_menu")
         elif choice == "2":
             print("Thank you for playing The Backwoods!")
             sys.exit(0)
@@ -252,63 +76,67 @@ def game_end_sequence(enemy_name):
             print("Invalid input. Please choose 1 or 2.")
 
 
+# ===============================================
+# Engine Bridge: send actions, print their events
+# ===============================================
+def act(action):
+    """Send one action to the engine and print what happened."""
+    if recorder is not None:
+        recorder.before(state, action)
+    settled = state.fight is None and state.pending_area is None
+    before = serialize_state() if settled else None
+    events = engine.step(state, action)
+    if recorder is not None:
+        recorder.after(state)
+    if settled:
+        fight = next((ev for ev in events if ev["type"] == "fight_start"), None)
+        label = format_command(action)
+        checkpoints.push(before, f"before fight: {fight['enemy']} ({label})" if fight else label)
+    if autosaver is not None and not devmode_active and any(ev["type"] in AUTOSAVE_EVENTS for ev in events):
+        autosaver.submit(current_slot or AUTOSAVE_SLOT, serialize_state())
+    show_events(events)
+    return events
+
+def play(action):
+    """Like act(), then keep prompting until any fight or path choice it opened is settled."""
+    events = act(action)
+    settle()
+    return events
+
+def settle():
+    while state.fight is not None or state.pending_area is not None:
+        if state.fight is not None:
+            fight_prompt()
+        else:
+            area_prompt()
+
+def show_events(events):
+    for ev in events:
+        show_event(ev)
+
+def show_event(ev):
+    kind = ev["type"]
+    script = boss_cinematic_script() if kind == "fight_start" and ev["boss"] else []
+    show(script + narrate(ev, state))
+    if kind == "death":
+        handle_death()
+    elif kind == "boss_defeated":
+        game_end_menu()
+
+
 # ===============================================
 # UI: Stats, Map, Inventory (Weapons / Items / Resources)
 # ===============================================
 def stats():
-    print("==== Your Stats ====")
-    print(f"HP: {hp}/{max_hp}")
-    print(f"XP: {xp}/{int(upgrade_amt)}")
-    print(f"Attack: {total_attack()}")
-    print(f"Weapon: {current_weapon}")
-    print(f"Level: {lv}")
-    print(f"Current Area: {get_current_area_name()}")
-    print("====================")
+    print("\n".join(stats_lines(state)))
 
 def show_map():
-    print("\n===== MAP =====")
-    for i, area in enumerate(areas):
-        marker = "<== You are here" if i == current_area_index else ""
-        print(f"{area['name']} {marker}")
-        if i < len(areas) - 1:
-            print("  |")
-    print("================\n")
+    print("\n".join(map_lines(state)))
 
 def show_inventory():
     """Inventory UI split into Weapons, Items, Resources."""
-    global current_weapon
-
-    print("\n===== INVENTORY =====")
-
-    # Weapons
-    print("\n-- Weapons --")
-    wlist = list(weapons_inventory.values())
-    for idx, w in enumerate(wlist, start=1):
-        t_atk = att + w["bonus"]
-        mark = " (Equipped)" if w["name"] == current_weapon else ""
-        print(f"[{idx}] {w['name']} - Attack: {t_atk}{mark}")
-
-    # Items
-    print("\n-- Items --")
-    any_items = False
-    for name in sorted(ITEM_NAMES):
-        if bag.get(name, 0) > 0:
-            any_items = True
-            print(f"{name} x{bag[name]}")
-    if not any_items:
-        print("No items.")
-
-    # Resources
-    print("\n-- Resources --")
-    any_res = False
-    for name in sorted(RESOURCE_NAMES):
-        if bag.get(name, 0) > 0:
-            any_res = True
-            print(f"{name} x{bag[name]}")
-    if not any_res:
-        print("No resources.")
-
-    print("=====================")
+    print("\n".join(inventory_lines(state)))
+    wlist = list(state.weapons_inventory.values())
 
     # Equip or use prompt
     choice = input("Select a weapon number to equip, type 'use' to use an item, or press Enter to go back:\n> ").strip().lower()
@@ -324,12 +152,7 @@ def show_inventory():
     if choice.isdigit():
         num = int(choice)
         if 1 <= num <= len(wlist):
-            selected = wlist[num - 1]["name"]
-            if selected == current_weapon:
-                print(f"{selected} is already equipped.")
-            else:
-                current_weapon = selected
-                print(f"You equipped the {current_weapon}.")
+            act({"type": "equip", "weapon": wlist[num - 1]["name"]})
         else:
             print("Invalid choice.")
     else:
@@ -340,54 +163,27 @@ def show_inventory():
 # ===============================================
 def use_item():
     """Use a healing/buff item from Items section."""
-    global hp, adrenaline_active
-
-    owned = [name for name in ITEM_NAMES if bag.get(name, 0) > 0]
+    item_name = None
+    owned = state.usable_items()
     if not owned:
         print("You have no items to use.")
-        return
-
-    print("\n-- Usable Items --")
-    for i, nm in enumerate(owned, start=1):
-        print(f"[{i}] {nm}")
-    sel = input("> ").strip()
-
-    # Dev commands usable here
-    if dev_command_handler(sel):
-        return
+    else:
+        print("\n-- Usable Items --")
+        for i, nm in enumerate(owned, start=1):
+            print(f"[{i}] {nm}")
+        sel = input("> ").strip()
 
-    if not sel.isdigit() or not (1 <= int(sel) <= len(owned)):
-        print("Invalid choice.")
-        return
+        # Dev commands usable here
+        if dev_command_handler(sel):
+            return
 
-    item_name = owned[int(sel) - 1]
-
-    if item_name == "Fruit":
-        healed = min(max_hp - hp, 10)
-        hp += healed
-        print(f"You eat Fruit and heal {healed} HP.")
-    elif item_name == "Food":
-        healed = min(max_hp - hp, 15)
-        hp += healed
-        print(f"You eat Food and heal {healed} HP.")
-    elif item_name == "Medkit":
-        healed = min(max_hp - hp, 25)
-        hp += healed
-        print(f"You use a Medkit and heal {healed} HP.")
-    elif item_name == "Bandage":
-        healed = min(max_hp - hp, 10)
-        hp += healed
-        print(f"You use a Bandage and heal {healed} HP.")
-    elif item_name == "Adrenaline Shot":
-        adrenaline_active = True
-        print("You used an Adrenaline Shot! You feel stronger for your next fight.")
-    else:
-        print("That item cannot be used.")
-        return
+        if not sel.isdigit() or not (1 <= int(sel) <= len(owned)):
+            print("Invalid choice.")
+        else:
+            item_name = owned[int(sel) - 1]
 
-    bag[item_name] -= 1
-    if bag[item_name] <= 0:
-        del bag[item_name]
+    # Even a wasted pick spends the turn against the boss, so always tell the engine
+    act({"type": "use_item", "item": item_name})
 
 # ===============================================
 # Save/Load Helpers
@@ -398,50 +194,52 @@ def ensure_save_dir():
 
 def serialize_state():
     """Return a JSON-serializable snapshot of the full game state."""
-    return {
-        "xp": xp,
-        "upgrade_amt": upgrade_amt,
-        "hp": hp,
-        "max_hp": max_hp,
-        "att": att,
-        "lv": lv,
-        "alive": alive,
-        "current_area_index": current_area_index,
-        "current_weapon": current_weapon,
-        "adrenaline_active": adrenaline_active,
-        "weapons_inventory": weapons_inventory,
-        "bag": bag,
-        "buildings": buildings,
-    }
-
-def apply_state(state):
-    """Load a snapshot back into globals."""
-    global xp, upgrade_amt, hp, max_hp, att, lv, alive
-    global current_area_index, current_weapon, adrenaline_active
-    global weapons_inventory, bag, buildings
-
-    xp = state.get("xp", 0)
-    upgrade_amt = state.get("upgrade_amt", 110)
-    hp = state.get("hp", 60)
-    max_hp = state.get("max_hp", 60)
-    att = state.get("att", 6)
-    lv = state.get("lv", 1)
-    alive = state.get("alive", True)
-    current_area_index = state.get("current_area_index", 0)
-    current_weapon = state.get("current_weapon", "Fists")
-    adrenaline_active = state.get("adrenaline_active", False)
-    weapons_inventory = state.get("weapons_inventory", {"Fists": {"name": "Fists", "bonus": 0}})
-    bag = state.get("bag", {})
-    buildings = state.get("buildings", {})
+    return state.to_dict()
+
+def apply_state(snapshot):
+    """Load a snapshot back into the current game."""
+    state.apply(snapshot)
 
 def list_saves():
-    """Return a sorted list of save filenames (without .json)."""
-    ensure_save_dir()
-    files = []
-    for fn in os.listdir(SAVE_DIR):
-        if fn.lower().endswith(".json"):
-            files.append(fn[:-5])
-    return sorted(files, key=str.lower)
+    """Slots a manual save may overwrite: every slot but the autosave one."""
+    return [name for name in store.list() if name.lower() != AUTOSAVE_SLOT]
+
+def settle_autosave():
+    """Finish queued autosaves first, so they can't land on top of a manual save/load/delete."""
+    if autosaver is not None:
+        autosaver.flush()
+        for slot, error in autosaver.errors:
+            print(f"⚠ Autosave to '{slot}' failed: {error}")
+        autosaver.errors.clear()
+
+def describe_slot(entry):
+    """One menu line for a catalog entry: name plus level, area and weapon."""
+    if entry.get("error"):
+        return f"{entry['name']}  (unreadable)"
+    return f"{entry['name']}  (Lv {entry['level']}, {entry['area']}, {entry['weapon']})"
+
+def write_slot(name):
+    """Full save of the current game into slot `name`; later actions journal into it."""
+    global current_slot
+    settle_autosave()
+    snapshot = serialize_state()
+    try:
+        previous = store.load(name) if store.exists(name) else None
+    except Exception:
+        previous = None   # unreadable: nothing worth keeping, and it mustn't block the save
+    try:
+        store.save(name, snapshot)
+        current_slot = name
+        print(f"✅ Game saved successfully as '{name}'.")
+    except Exception as e:
+        print(f"❌ Failed to save: {e}")
+        return
+    try:
+        if previous is not None:
+            history.record(name, previous, "overwritten")   # no-op unless play went on since the last version
+        history.record(name, snapshot)
+    except Exception as e:
+        print(f"⚠ Save history not updated: {e}")
 
 def save_game():
     """Manual save. Player can overwrite existing saves or create a new one."""
@@ -472,48 +270,41 @@ def save_game():
         if not safe:
             print("Invalid name. Must use letters, numbers, '-' or '_'.")
             return
-        path = os.path.join(SAVE_DIR, f"{safe}.json")
-
-        if os.path.exists(path):
+        if safe.lower() == AUTOSAVE_SLOT:
+            print(f"'{safe}' is reserved for autosaves. Pick another name.")
+            return
+        if store.exists(safe):
             confirm = input(f"A save named '{safe}' already exists. Overwrite? (y/n)\n> ").strip().lower()
             if confirm != "y":
                 print("Save cancelled.")
                 return
 
-        try:
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(serialize_state(), f, indent=2)
-            print(f"✅ Game saved successfully as '{safe}.json'.")
-        except Exception as e:
-            print(f"❌ Failed to save: {e}")
+        write_slot(safe)
         return
 
     if choice.isdigit() and 1 <= int(choice) <= len(saves):
         selected = saves[int(choice) - 1]
-        path = os.path.join(SAVE_DIR, f"{selected}.json")
         confirm = input(f"Overwrite existing save '{selected}'? (y/n)\n> ").strip().lower()
         if confirm != "y":
             print("Save cancelled.")
             return
-        try:
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(serialize_state(), f, indent=2)
-            print(f"✅ Game saved successfully as '{selected}.json'.")
-        except Exception as e:
-            print(f"❌ Failed to save: {e}")
+        write_slot(selected)
     else:
         print("Invalid choice.")
 
 def load_game_from_slot():
     """Allows player to pick a save file to load."""
-    saves = list_saves()
+    global current_slot
+    settle_autosave()
+    entries = store.catalog()
+    saves = [e["name"] for e in entries]
     if not saves:
         print("No save files found.")
         return False
 
     print("\n===== LOAD GAME =====")
-    for i, name in enumerate(saves, start=1):
-        print(f"[{i}] {name}")
+    for i, entry in enumerate(entries, start=1):
+        print(f"[{i}] {describe_slot(entry)}")
     print("[0] Back")
 
     choice = input("> ").strip()
@@ -524,12 +315,11 @@ def load_game_from_slot():
         return False
 
     selected = saves[int(choice) - 1]
-    path = os.path.join(SAVE_DIR, f"{selected}.json")
 
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            state = json.load(f)
-        apply_state(state)
+        apply_state(store.load(selected))
+        current_slot = selected
+        checkpoints.clear()
         print(f"✅ Loaded save '{selected}'.")
         return True
     except Exception as e:
@@ -538,14 +328,17 @@ def load_game_from_slot():
 
 def delete_save_slot():
     """Allows the player to delete an existing save file."""
-    saves = list_saves()
+    global current_slot
+    settle_autosave()
+    entries = store.catalog()
+    saves = [e["name"] for e in entries]
     if not saves:
         print("No save files to delete.")
         return
 
     print("\n===== DELETE SAVE =====")
-    for i, name in enumerate(saves, start=1):
-        print(f"[{i}] {name}")
+    for i, entry in enumerate(entries, start=1):
+        print(f"[{i}] {describe_slot(entry)}")
     print("[0] Back")
 
     choice = input("> ").strip()
@@ -556,12 +349,13 @@ def delete_save_slot():
         return
 
     selected = saves[int(choice) - 1]
-    path = os.path.join(SAVE_DIR, f"{selected}.json")
 
     confirm = input(f"Are you sure you want to delete '{selected}'? (y/n)\n> ").strip().lower()
     if confirm == "y":
         try:
-            os.remove(path)
+            store.delete(selected)
+            if current_slot == selected:
+                current_slot = None
             print(f"✅ Save '{selected}' deleted.")
         except Exception as e:
             print(f"❌ Failed to delete save: {e}")
@@ -577,9 +371,7 @@ def dev_command_handler(user_input):
     Returns True if a dev command was handled (so caller should skip normal flow),
     False otherwise (caller should continue normal handling).
     """
-    global hp, max_hp, att, xp, lv, crit_chance
-    global current_area_index, strength_level, endurance_level, survival_level
-    global devmode_active, bag, weapons_inventory, alive
+    global devmode_active
 
     # Normalize
     if not isinstance(user_input, str):
@@ -602,6 +394,8 @@ endurance <1-3>              - Set Endurance upgrade path level
 survival <1-3>               - Set Survival upgrade path level
 boss                         - Trigger final boss encounter (city_boss_encounter)
 godmode on/off               - Toggle invincibility (hp/max_hp 9999 or reset)
+checkpoints                  - List the states you can rewind to
+rewind [n]                   - Rewind to before the last fight, or n checkpoints back
 exit                         - Exit developer mode and return to main menu
 cmnd                         - Show this list of developer commands
 """)
@@ -617,7 +411,31 @@ cmnd                         - Show this list of developer commands
     if cmd == "exit":
         print("\nExiting Developer Mode... Returning to Main Menu.")
         devmode_active = False
-        start_menu()
+        go_to("start_menu")
+
+    # Rewind buffer
+    if cmd == "checkpoints":
+        labels = checkpoints.labels()
+        if not labels:
+            print("[DEV] No checkpoints yet.")
+        for i, label in enumerate(labels):
+            print(f"[{i}] {label}")
+        return True
+    if cmd == "rewind" or cmd.startswith("rewind "):
+        arg = cmd[len("rewind"):].strip()
+        if arg in ("", "fight", "last fight"):
+            n = checkpoints.find(lambda label: label.startswith("before fight"))
+            if n is None:
+                print("[DEV] No fight to rewind.")
+                return True
+        elif arg.isdigit() and int(arg) < len(checkpoints):
+            n = int(arg)
+        else:
+            print(f"[DEV] Usage: rewind [n] with n below {len(checkpoints)}")
+            return True
+        label = checkpoints.labels()[n]
+        apply_state(checkpoints.rewind(n))
+        print(f"[DEV] Rewound to: {label}. HP {state.hp}/{state.max_hp}, XP {state.xp}")
         return True
 
     # Quick single-word commands
@@ -626,15 +444,15 @@ cmnd                         - Show this list of developer commands
         city_boss_encounter()
         return True
     if cmd in ("godmode on", "godmode 1"):
-        alive = True
-        hp = 9999
-        max_hp = 9999
+        state.alive = True
+        state.hp = 9999
+        state.max_hp = 9999
         print("[DEV] Godmode ON (HP set to 9999).")
         return True
     if cmd in ("godmode off", "godmode 0"):
-        alive = True
-        hp = 60
-        max_hp = 60
+        state.alive = True
+        state.hp = 60
+        state.max_hp = 60
         print("[DEV] Godmode OFF (HP reset to 60).")
         return True
 
@@ -648,18 +466,16 @@ cmnd                         - Show this list of developer commands
 
         # hp <value>
         if key == "hp" and len(parts) >= 2:
-            val = int(parts[1])
-            hp = val
-            if hp > max_hp:
-                max_hp = hp
-            print(f"[DEV] HP set to {hp}/{max_hp}")
+            state.hp = int(parts[1])
+            if state.hp > state.max_hp:
+                state.max_hp = state.hp
+            print(f"[DEV] HP set to {state.hp}/{state.max_hp}")
             return True
 
         # xp <value>
         if key == "xp" and len(parts) >= 2:
-            val = int(parts[1])
-            xp = val
-            print(f"[DEV] XP set to {xp}")
+            state.xp = int(parts[1])
+            print(f"[DEV] XP set to {state.xp}")
             return True
 
         # area <name>
@@ -668,7 +484,7 @@ cmnd                         - Show this list of developer commands
             # match against areas list by lowercase
             for i, a in enumerate(areas):
                 if a["name"].lower() == area_name.lower():
-                    current_area_index = i
+                    state.current_area_index = i
                     print(f"[DEV] Teleported to area: {a['name']}")
                     return True
             print("[DEV] Invalid area name. Try: camp, forest, highlands, jungle, city.")
@@ -681,7 +497,7 @@ cmnd                         - Show this list of developer commands
                 return True
             item = parts[2].capitalize()
             amt = int(parts[3])
-            bag[item] = bag.get(item, 0) + amt
+            state.bag[item] = state.bag.get(item, 0) + amt
             print(f"[DEV] Gave resource: {item} x{amt}")
             return True
 
@@ -692,7 +508,7 @@ cmnd                         - Show this list of developer commands
             # Default bonus if not in FINDABLE_WEAPONS
             default_bonus = 3
             bonus = FINDABLE_WEAPONS.get(wname, {}).get("bonus", default_bonus)
-            weapons_inventory[wname] = {"name": wname, "bonus": bonus}
+            state.weapons_inventory[wname] = {"name": wname, "bonus": bonus}
             print(f"[DEV] Weapon unlocked: {wname} (+{bonus} Attack)")
             return True
 
@@ -701,29 +517,27 @@ cmnd                         - Show this list of developer commands
             lvl_value = max(1, min(3, int(parts[1])))
             if key == "strength":
                 # remove previous stat deltas then apply fresh (simple approach: just add)
-                globals()["strength_level"] = lvl_value
-                globals()["crit_chance"] = [0, 10, 15, 20][lvl_value]
+                state.strength_level = lvl_value
+                state.crit_chance = [0, 10, 15, 20][lvl_value]
                 # ensure attack reflects tier (each level +2)
                 # We won't subtract old bonuses; this is a dev shortcut. If needed, track base_att.
-                att_bonus = 2  # per tier
-                # Optionally you can normalize ATT to base first; for now, just add up to level once:
                 # a simple guard: if att seems too low for level, bump it:
                 min_expected_att = 6 + (2 * lvl_value)
-                if att < min_expected_att:
-                    att = min_expected_att
-                print(f"[DEV] Strength set to {lvl_value} (crit {crit_chance}%). ATT now {att}")
+                if state.att < min_expected_att:
+                    state.att = min_expected_att
+                print(f"[DEV] Strength set to {lvl_value} (crit {state.crit_chance}%). ATT now {state.att}")
             elif key == "endurance":
-                globals()["endurance_level"] = lvl_value
+                state.endurance_level = lvl_value
                 # normalize HP to a reasonable baseline for dev
                 base_hp = 60
                 bonus = 6 if lvl_value == 1 else 14 if lvl_value == 2 else 26  # 6 / (6+8) / (6+8+12)
-                max_hp = base_hp + bonus
-                hp = max_hp
+                state.max_hp = base_hp + bonus
+                state.hp = state.max_hp
                 if lvl_value == 3:
-                    bag["Medkit"] = bag.get("Medkit", 0) + 2
-                print(f"[DEV] Endurance set to {lvl_value} (Max HP {max_hp}).")
+                    state.bag["Medkit"] = state.bag.get("Medkit", 0) + 2
+                print(f"[DEV] Endurance set to {lvl_value} (Max HP {state.max_hp}).")
             elif key == "survival":
-                globals()["survival_level"] = lvl_value
+                state.survival_level = lvl_value
                 print(f"[DEV] Survival set to {lvl_value}.")
             return True
 
@@ -736,87 +550,17 @@ cmnd                         - Show this list of developer commands
 
 
 # ===============================================
-# Trap Logic (manual & passive)
+# Trap Logic (manual)
 # ===============================================
 def check_traps_now():
-    global bag
-
-    if buildings.get("Trap", 0) == 0 and buildings.get("Advanced Trap", 0) == 0:
-        print("You have no traps to check.")
+    events = act("check_traps")
+    if not any(ev["type"] == "check_traps" for ev in events):
         return
-
-    print("\n=== Checking Traps ===")
-    normal_traps = buildings.get("Trap", 0)
-    adv_traps = buildings.get("Advanced Trap", 0)
-
-    # Effective trap catch chances (Survival III bonus)
-    eff_NTCC = NTCC + (0.10 if survival_level >= 3 else 0.0)
-    eff_ATCC = ATCC + (0.10 if survival_level >= 3 else 0.0)
-
-    caught_anything = False
-
-    # Normal Traps: Meat 1–2 and Fur 1–2
-    for _ in range(normal_traps):
-        if random.random() < eff_NTCC:
-            caught_anything = True
-            meat_qty = random.randint(1, 2)
-            fur_qty = random.randint(1, 2)
-            add_to_bag("Meat", meat_qty)
-            add_to_bag("Fur", fur_qty)
-            print(f"Normal Trap caught something! +Meat x{meat_qty}, +Fur x{fur_qty}")
-        else:
-            print("Normal Trap was empty.")
-
-    # Advanced Traps: pick 3 distinct among Meat/Fur/Bones/Scales, each 1–2
-    for _ in range(adv_traps):
-        if random.random() < eff_ATCC:
-            caught_anything = True
-            possible = ["Meat", "Fur", "Bones", "Scales"]
-            chosen = random.sample(possible, 3)
-            for item in chosen:
-                qty = random.randint(1, 2)
-                add_to_bag(item, qty)
-                print(f"🧩 Advanced Trap captured {item} x{qty}")
-        else:
-            print("Advanced Trap was empty.")
-
-    if not caught_anything:
+    if not any(ev["type"] == "trap" and ev["catch"] for ev in events):
         print("\nYour traps caught nothing this time.")
     else:
         print("\n✅ Trap check complete. Resources added to your inventory.")
 
-def passive_trap_catches():
-    """Called after explore() — silent background catches with small prints."""
-    global bag
-
-    normal_traps = buildings.get("Trap", 0)
-    adv_traps = buildings.get("Advanced Trap", 0)
-
-    if normal_traps == 0 and adv_traps == 0:
-        return
-
-    eff_NTCC = NTCC + (0.10 if survival_level >= 3 else 0.0)
-    eff_ATCC = ATCC + (0.10 if survival_level >= 3 else 0.0)
-
-    # Normal traps
-    for _ in range(normal_traps):
-        if random.random() < eff_NTCC:
-            meat_qty = random.randint(1, 2)
-            fur_qty = random.randint(1, 2)
-            add_to_bag("Meat", meat_qty)
-            add_to_bag("Fur", fur_qty)
-            print(f"🔔 (Passive Trap) Gained Meat x{meat_qty}, Fur x{fur_qty}")
-
-    # Advanced traps
-    for _ in range(adv_traps):
-        if random.random() < eff_ATCC:
-            possible = ["Meat", "Fur", "Bones", "Scales"]
-            chosen = random.sample(possible, 3)
-            for item in chosen:
-                qty = random.randint(1, 2)
-                add_to_bag(item, qty)
-                print(f"⚙️ (Passive Adv Trap) Gained {item} x{qty}")
-
 # ===============================================
 # Crafting System
 # ===============================================
@@ -842,9 +586,9 @@ def craft():
         elif c == "2":
             craft_traps()
         elif c == "3":
-            craft_campfire()
+            craft_building("Campfire")
         elif c == "4":
-            craft_workbench()
+            craft_building("Workbench")
         elif c == "5":
             return
         else:
@@ -852,18 +596,8 @@ def craft():
 
 def craft_weapons_and_armor():
     """Weapons (basic + advanced if Workbench) and Armor (if Workbench)."""
-    have_workbench = buildings.get("Workbench", 0) > 0
-
-    entries = []
-    # Basic weapons always available
-    for r in CRAFT_WEAPONS_BASIC:
-        entries.append(("weapon", r))
-    # Advanced appear if Workbench present, plus armor
-    if have_workbench:
-        for r in CRAFT_WEAPONS_ADV:
-            entries.append(("weapon", r))
-        for r in CRAFT_ARMOR_ADV:
-            entries.append(("armor", r))
+    have_workbench = state.buildings.get("Workbench", 0) > 0
+    entries = state.gear_recipes()
 
     print("\n-- Craft: Weapons" + (" & Armor" if have_workbench else "") + " --")
     for idx, (kind, rec) in enumerate(entries, start=1):
@@ -881,29 +615,11 @@ def craft_weapons_and_armor():
         print("Invalid choice.")
         return
 
-    kind, rec = entries[int(sel) - 1]
-    if not have_in_bag(rec["cost"]):
-        print("❌ You do not have enough materials.")
-        show_missing_materials(rec["cost"])
-        return
-
-    remove_from_bag(rec["cost"])
-
-    if kind == "weapon":
-        if rec["name"] in weapons_inventory:
-            print("You already own that weapon.")
-            return
-        weapons_inventory[rec["name"]] = {"name": rec["name"], "bonus": rec["bonus"]}
-        print(f"✅ You crafted {rec['name']}.")
-    else:
-        global max_hp, hp
-        max_hp += rec["hp_bonus"]
-        hp = max_hp
-        print(f"✅ You crafted {rec['name']}. Max HP increased by {rec['hp_bonus']}.")
+    act({"type": "craft", "recipe": entries[int(sel) - 1][1]["name"]})
 
 def craft_traps():
     """Craft normal or advanced traps. Enforces global max 4, with auto-replace rule."""
-    have_workbench = buildings.get("Workbench", 0) > 0
+    have_workbench = state.buildings.get("Workbench", 0) > 0
     print("\n-- Craft: Traps --")
     print("[1] Trap            | Cost: Wood x2, Rope x1")
     if have_workbench:
@@ -917,459 +633,101 @@ def craft_traps():
     if sel == "0":
         return
     if sel == "1":
-        craft_trap_normal()
+        act({"type": "craft", "recipe": "Trap"})
     elif sel == "2" and have_workbench:
-        craft_trap_advanced()
+        act({"type": "craft", "recipe": "Advanced Trap"})
     else:
         print("Invalid choice.")
 
-def craft_trap_normal():
-    cost = {"Wood": 2, "Rope": 1}
-    if is_trap_cap_reached():
-        print("You cannot build more traps (limit reached).")
-        return
-    if not have_in_bag(cost):
-        print("❌ You do not have enough materials.")
-        show_missing_materials(cost)
-        return
-    remove_from_bag(cost)
-    buildings["Trap"] = buildings.get("Trap", 0) + 1
-    print("✅ You built a Trap.")
-
-def craft_trap_advanced():
-    """Advanced Trap: if cap is full and a normal trap exists, replace one normal."""
-    cost = {"Wood": 3, "Rope": 2, "Bones": 1}
-    total = buildings.get("Trap", 0) + buildings.get("Advanced Trap", 0)
-
-    if not have_in_bag(cost):
-        print("❌ You do not have enough materials.")
-        show_missing_materials(cost)
-        return
-
-    if total < MAX_TRAPS_TOTAL:
-        remove_from_bag(cost)
-        buildings["Advanced Trap"] = buildings.get("Advanced Trap", 0) + 1
-        print("✅ You built an Advanced Trap.")
-        return
-
-    if buildings.get("Trap", 0) > 0:
-        remove_from_bag(cost)
-        buildings["Trap"] -= 1
-        if buildings["Trap"] <= 0:
-            del buildings["Trap"]
-        buildings["Advanced Trap"] = buildings.get("Advanced Trap", 0) + 1
-        print("✅ You built an Advanced Trap. One normal trap was replaced.")
-    else:
-        print("All your traps are already advanced. You cannot build more.")
-
-def craft_campfire():
-    cost = {"Wood": 3, "Stone": 1}
-    print("\n=== Craft Campfire ===")
+def craft_building(name):
+    """Campfire / Workbench: show the cost, confirm, then build."""
+    cost = CAMPFIRE_COST if name == "Campfire" else WORKBENCH_COST
+    print(f"\n=== Craft {name} ===")
     print("Cost:", ", ".join([f"{k} x{v}" for k, v in cost.items()]))
-    confirm = input("Craft Campfire? (y/n)\n> ").strip().lower()
+    confirm = input(f"Craft {name}? (y/n)\n> ").strip().lower()
     if confirm != "y":
         print("Cancelled.")
         return
-    if not have_in_bag(cost):
-        print("❌ You do not have enough materials.")
-        show_missing_materials(cost)
-        return
-    remove_from_bag(cost)
-    buildings["Campfire"] = buildings.get("Campfire", 0) + 1
-    print("✅ You built a Campfire. You can cook 5 Meat → 1 Food in Buildings.")
-
-def craft_workbench():
-    cost = {"Wood": 4, "Stone": 2, "Rope": 2}
-    print("\n=== Craft Workbench ===")
-    print("Cost:", ", ".join([f"{k} x{v}" for k, v in cost.items()]))
-    confirm = input("Craft Workbench? (y/n)\n> ").strip().lower()
-    if confirm != "y":
-        print("Cancelled.")
-        return
-    if buildings.get("Workbench", 0) > 0:
-        print("You already have a Workbench.")
-        return
-    if not have_in_bag(cost):
-        print("❌ You do not have enough materials.")
-        show_missing_materials(cost)
-        return
-    remove_from_bag(cost)
-    buildings["Workbench"] = 1
-    print("✅ You built a Workbench. Advanced crafting is now available.")
+    act({"type": "craft", "recipe": name})
 
 def use_campfire():
-    if buildings.get("Campfire", 0) <= 0:
-        print("You don't have a Campfire.")
-        return
-    if bag.get("Meat", 0) >= 5:
-        bag["Meat"] -= 5
-        if bag["Meat"] == 0:
-            del bag["Meat"]
-        add_to_bag("Food", 1)
-        print("You cooked 5 Meat into 1 Food.")
-    else:
-        print("Not enough Meat to cook (need 5).")
-
-# ===============================================
-# Findable Weapons
-# ===============================================
-def get_allowed_findable_weapons(area_name: str):
-    allowed = []
-    for wname, data in FINDABLE_WEAPONS.items():
-        if area_name in data["areas"]:
-            allowed.append(wname)
-    return allowed
-
-def maybe_find_weapon(area_name: str):
-    """25% branch: try to find a weapon appropriate for this area."""
-    allowed = get_allowed_findable_weapons(area_name)
-    if not allowed:
-        print("You find some old debris, but no usable weapons.")
-        return
-
-    # Weight rarities (Axe rare)
-    weights = []
-    for name in allowed:
-        if name == "Axe":
-            weights.append(1)
-        elif name in {"Rusty Sword", "Bow"}:
-            weights.append(3)
-        else:  # Dagger common
-            weights.append(5)
-
-    total = sum(weights)
-    r = random.randint(1, total)
-    upto = 0
-    pick = allowed[0]
-    for name, w in zip(allowed, weights):
-        upto += w
-        if r <= upto:
-            pick = name
-            break
-
-    if pick not in weapons_inventory:
-        bonus = FINDABLE_WEAPONS[pick]["bonus"]
-        weapons_inventory[pick] = {"name": pick, "bonus": bonus}
-        print(f"\n🗡️ You found a {pick}! Added to your weapons.")
-    else:
-        print(f"\nYou spot a {pick}, but you already own one.")
-
-# ===============================================
-# Resource Gathering
-# ===============================================
-def gather_resource(area_name):
-    """Gather one resource using the area table. Base qty 1–3; Survival II adds +1."""
-    outcome = weighted_choice(RESOURCE_TABLE[area_name])
-
-    if outcome == "Nothing":
-        print("You find no useful resources.")
-        return
-
-    qty = random.randint(1, 3)
-    if survival_level >= 2:
-        qty += 1
-
-    add_to_bag(outcome, qty)
-    icon = (
-        "🪵" if outcome == "Wood" else
-        "🪨" if outcome == "Stone" else
-        "🧵" if outcome == "Rope" else
-        "🍎" if outcome == "Fruit" else
-        "💀" if outcome == "Bones" else
-        "🐍" if outcome == "Scales" else
-        "🎒"
-    )
-    print(f"{icon} You collected {outcome} x{qty}.")
+    act("cook")
 
 # ===============================================
-# Combat
+# Combat Prompts
 # ===============================================
-def maybe_crit(dmg: int) -> (int, bool):
-    """Apply Strength path crits. Returns (final_damage, is_crit)."""
-    if crit_chance > 0 and random.randint(1, 100) <= crit_chance:
-        return dmg * 2, True
-    return dmg, False
-
-def fight(enemy, allow_run=True):
-    global hp, alive, xp, adrenaline_active
-    player_attack = total_attack()
-    if adrenaline_active:
-        player_attack += 2
-        adrenaline_active = False
-    enemy_hp = enemy["hp"]
-    enemy_name = enemy["name"]
-
-    print(f"\n⚔️ You engage the {enemy_name} in battle!")
-
-    while enemy_hp > 0 and hp > 0:
-        print(f"\nYour HP: {hp}/{max_hp}")
-        print(f"{enemy_name} HP: {enemy_hp}")
-
-        if allow_run:
-            action = input("Do you ATTACK, USE ITEM, or RUN?\n> ").strip().lower()
-        else:
-            action = input("Do you ATTACK or USE ITEM?\n> ").strip().lower()
+def fight_prompt():
+    """One turn of the current fight: show HP, read the player's move, send it."""
+    fight = state.fight
+    enemy_name = fight["enemy"]["name"]
 
-        # Dev commands usable during fight
-        if dev_command_handler(action):
-            continue
+    print(f"\nYour HP: {state.hp}/{state.max_hp}")
+    print(f"{enemy_name} HP: {fight['enemy_hp']}")
 
-        if action == "attack":
-            base = random.randint(max(1, player_attack - 2), player_attack + 2)
-            dmg, was_crit = maybe_crit(base)
-            enemy_hp -= dmg
-            print(f"You hit the {enemy_name} for {dmg} damage!" + (" [CRIT!]" if was_crit else ""))
-        elif action in ("use", "use item", "item"):
-            use_item()
-            continue
-        elif action == "run":
-            if not allow_run:
-                print("You cannot run from this foe!")
-                continue
-            print("You run away and escape safely, but gain no XP.")
-            return
-        else:
-            print("You hesitate and lose your turn!")
-
-        if enemy_hp > 0:
-            enemy_dmg = random.randint(enemy["attack"] - 1, enemy["attack"] + 1)
-            # Bow effect: -1 atk vs non-flying
-            if current_weapon == "Bow" and enemy_name not in FLYING_ENEMIES:
-                enemy_dmg = max(0, enemy_dmg - BOW_ENEMY_ATK_REDUCTION)
-            hp -= enemy_dmg
-            print(f"The {enemy_name} hits you for {enemy_dmg} damage!")
-
-    if hp <= 0:
-        handle_death(enemy_name)
+    if fight["allow_run"]:
+        action = input("Do you ATTACK, USE ITEM, or RUN?\n> ").strip().lower()
     else:
-        if enemy.get("xp_reward", 0) > 0:
-            print(f"\n🏆 You defeated the {enemy_name} and gained {enemy['xp_reward']} XP!")
-            globals()["xp"] += enemy["xp_reward"]
-
-def fight_boss(enemy):
-    global hp, xp, adrenaline_active, current_weapon, devmode_active
-
-    enemy_name = enemy["name"]
-    enemy_hp = enemy["hp"]
-
-    # Burn effect tracker
-    burn_turns = 0
-
-    print(f"\n⚔️ FINAL BATTLE: {enemy_name} has awakened!")
-    print("There is no escape...")
-
-    while enemy_hp > 0 and hp > 0:
-        # Apply burn effect
-        if burn_turns > 0:
-            hp -= 2
-            burn_turns -= 1
-            print(f"[Burning -2 HP] Your HP is now {hp}/{max_hp}")
-            if hp <= 0:
-                handle_death(enemy_name)
-                return
-
-        # Player's turn
-        player_attack = total_attack()
-        if adrenaline_active:
-            player_attack += 2
-            adrenaline_active = False
-
-        print(f"\nYour HP: {hp}/{max_hp}")
-        print(f"{enemy_name} HP: {enemy_hp}")
-
         action = input("Do you ATTACK or USE ITEM?\n> ").strip().lower()
 
-        # --- 🔧 DEV COMMAND SUPPORT ---
-        if devmode_active and dev_command_handler(action):
-            continue
-
-        if action.startswith("use"):  # Accept "use", "use item", "item"
-            use_item()
-            continue
-        elif action == "attack":
-            base = random.randint(max(1, player_attack - 2), player_attack + 2)
-            dmg, was_crit = maybe_crit(base)
-            enemy_hp -= dmg
-            if was_crit:
-                print(f"You strike the {enemy_name} for {dmg} damage! [CRITICAL HIT!]")
-            else:
-                print(f"You strike the {enemy_name} for {dmg} damage!")
-        else:
-            print("You hesitate and lose your attack!")
+    # Dev commands usable during fight
+    if dev_command_handler(action):
+        return
 
-        # Boss defeated check
-        if enemy_hp <= 0:
-            game_end_sequence(enemy_name)
-            return
+    if action == "attack":
+        act("attack")
+    elif action in ("use", "use item", "item") or (fight["boss"] and action.startswith("use")):
+        use_item()
+    elif action == "run" and not fight["boss"]:
+        act("run")
+    else:
+        act("wait")
 
-        # Boss's turn
-        boss_attack_choice = random.choice(["plasma", "thermal"])
-        if boss_attack_choice == "plasma":
-            dmg = random.randint(10, 13)
-            hp -= dmg
-            print(f"⚡ {enemy_name} fires a *Plasma Beam*! You take {dmg} damage!")
-        else:
-            dmg = random.randint(8, 10)
-            hp -= dmg
-            burn_turns = 3
-            print(f"🔥 {enemy_name} unleashes a *Thermal Surge*! You take {dmg} damage and are now burning!")
-            print("[Burning -2 HP for 3 turns]")
-
-        if hp <= 0:
-            handle_death(enemy_name)
-            return
+def area_prompt():
+    """Answer the 'continue into the discovered area?' question from explore."""
+    choice = input("Do you want to continue into this area? It looks more dangerous. (y/n)\n> ").strip().lower()
+    if dev_command_handler(choice):
+        return
+    act({"type": "advance", "accept": choice == "y"})
 
 # ===============================================
 # Death & Restart Flow
 # ===============================================
-def handle_death(enemy_name: str):
-    print(f"\n💀 The {enemy_name} has defeated you!")
-    print(f"You reached the {get_current_area_name()} at Level {lv}.")
-    print("Restarting game", end="", flush=True)
-    for _ in range(3):
-        time.sleep(1)
-        print(".", end="", flush=True)
-    print()
-    time.sleep(1)
-    restart_game(forced=True)
+def handle_death():
+    """engine.die() already restarted the character (bag/buildings kept): just tell the player."""
+    show(RESTART_SCRIPT)
+    print("Restarting game...")
+    print("----- Welcome To The Backwoods -----")
+    go_to("main")
 
 # ===============================================
 # Explore & Search
 # ===============================================
 def explore():
     """Explore the current area: fights, finds, traps, and discovering new areas."""
-    global current_area_index
-
-    area_name = get_current_area_name()
-    print(f"\nYou explore the {area_name}...")
-
-    if area_name == "City":
-        city_boss_encounter()
-        return
-
-    if area_name == "Camp":
-        pool = camp_animals
-    elif area_name == "Forest":
-        pool = forest_animals
-    elif area_name == "Highlands":
-        pool = highlands_animals
-    elif area_name == "Jungle":
-        pool = jungle_animals
-    else:
-        pool = []
-
-    # 80% chance to encounter a random-area animal
-    if pool and random.random() < 0.80:
-        enemy = random.choice(pool)
-        print(f"You encounter a {enemy['name']}!")
-        fight(enemy)
-    else:
-        # No animal: 25% chance to find a weapon, otherwise gather resources
-        if random.random() < 0.25:
-            maybe_find_weapon(area_name)
-        else:
-            gather_resource(area_name)
-
-    # Passive traps tick
-    passive_trap_catches()
-
-    # Discover next area: 10%
-    if random.random() < 0.10 and current_area_index < len(areas) - 1:
-        next_area = areas[current_area_index + 1]
-        print(f"\n🌿 You discover a path to the {next_area['name']}!")
-        print(next_area['description'])
-        choice = input("Do you want to continue into this area? It looks more dangerous. (y/n)\n> ").strip().lower()
-
-        if dev_command_handler(choice):
-            return
-
-        if choice == "y":
-            current_area_index += 1
-            print(f"\nYou push forward... now entering the {next_area['name']}!")
-        else:
-            print("You decide to stay and prepare a bit longer.")
-
-    # Endurance II passive regen after exploration loop
-    if hp > 0 and endurance_level >= 2:
-        healed = min(2, max_hp - hp)
-        if healed > 0:
-            globals()["hp"] += healed
-            print(f"[Regen +{healed} HP]")
+    play("explore")
 
 def search_area():
-    """Your specified search system:
-       50% strong animal (no XP, no running)
-       30% resource
-       20% nothing
-       City: always boss
-    """
-    area_name = get_current_area_name()
-    print(f"\n=== Searching the {area_name} ===")
-    time.sleep(0.3)
-
-    if area_name == "City":
-        print("You step deeper into the ruins...")
-        time.sleep(0.3)
-        city_boss_encounter()
-        return
-
-    roll = random.random()
-
-    if roll < 0.50:
-        enemy = get_strong_animal(area_name)
-        print("You sense a powerful presence nearby...")
-        time.sleep(0.3)
-        fight(enemy, allow_run=False)
-        return
-    elif roll < 0.80:
-        print("You search the area for resources...")
-        time.sleep(0.3)
-        gather_resource(area_name)
-        return
-    else:
-        print("You find nothing of value.")
-        time.sleep(0.3)
-        return
+    """50% strong animal (no XP, no running), 30% resource, 20% nothing. City: always boss."""
+    play("search")
 
-# ===============================================
-# City Boss Encounter
-# ===============================================
 def city_boss_encounter():
-    boss_cinematic()
-    enemy = {"name": boss["name"], "hp": boss["hp"], "attack": boss["attack"], "xp_reward": 0}
-    print("A towering figure of steel and vengeance stands before you.")
-    print("Its core glows with unstable power.")
-    time.sleep(0.3)
-    fight_boss(enemy)
+    """Dev shortcut: the final fight from anywhere. Not an engine action, so no client can send it."""
+    events = []
+    start_boss_fight(state, events)
+    show_events(events)
+    settle()
 
 # ===============================================
 # Upgrades
 # ===============================================
-def upgrade():
-    global hp, max_hp, att, xp, lv, upgrade_amt
-    global strength_level, endurance_level, survival_level, crit_chance
-    global bag
+UPGRADE_KEYS = {"Strength": "1", "Endurance": "2", "Survival": "3"}
 
+def upgrade():
     print("\n=== LEVEL UP! ===")
     choices = {}
-
-    if strength_level < 3:
-        next_level = strength_level + 1
-        desc = "(+2 ATK, Crit 10%)" if next_level == 1 else "(+2 ATK, Crit 15%)" if next_level == 2 else "(+2 ATK, Crit 20%)"
-        choices["1"] = ("Strength", next_level, desc)
-
-    if endurance_level < 3:
-        next_level = endurance_level + 1
-        desc = "(+6 Max HP)" if next_level == 1 else "(+8 Max HP, +2 Regen/Explore)" if next_level == 2 else "(+12 Max HP, +2 Medkits)"
-        choices["2"] = ("Endurance", next_level, desc)
-
-    if survival_level < 3:
-        next_level = survival_level + 1
-        desc = "(+10% Gather Chance)" if next_level == 1 else "(+20% Gather Yield)" if next_level == 2 else "(+30% Yield, +10% Trap Success)"
-        choices["3"] = ("Survival", next_level, desc)
-
-    for key, (name, lvl, desc) in choices.items():
-        print(f"[{key}] {name} {lvl} {desc}")
+    for path, tier, desc in state.upgrade_choices():
+        choices[UPGRADE_KEYS[path]] = path
+        print(f"[{UPGRADE_KEYS[path]}] {path} {tier} {desc}")
 
     while True:
         choice = input("> ").strip()
@@ -1377,31 +735,7 @@ def upgrade():
             return
 
         if choice in choices:
-            path, tier, _ = choices[choice]
-
-            if path == "Strength":
-                strength_level = tier
-                att += 2
-                crit_chance = 10 if tier == 1 else 15 if tier == 2 else 20
-
-            elif path == "Endurance":
-                endurance_level = tier
-                if tier == 1:
-                    max_hp += 6
-                elif tier == 2:
-                    max_hp += 8
-                elif tier == 3:
-                    max_hp += 12
-                    bag["Medkit"] = bag.get("Medkit", 0) + 2
-                hp = max_hp
-
-            elif path == "Survival":
-                survival_level = tier
-
-            lv += 1
-            xp = 0
-            upgrade_amt = int(upgrade_amt * 1.3)
-            print(f"You chose {path} Level {tier}!")
+            act({"type": "upgrade", "path": choices[choice]})
             return
         else:
             print("Invalid choice.")
@@ -1419,47 +753,24 @@ def quit_game():
     else:
         print("Quit cancelled.")
 
-def restart_game(forced=False, autostart=True):
-    """Forced restart (death) preserves bag/buildings; manual restart wipes."""
-    global xp, upgrade_amt, hp, max_hp, att, lv, alive, current_area_index
-    global current_weapon, adrenaline_active, weapons_inventory, bag, buildings
-    global strength_level, endurance_level, survival_level, crit_chance
-
-    if not forced:
-        confirm = input("Are you sure you want to restart? (y/n)\n> ").strip().lower()
-        if dev_command_handler(confirm):
-            return
-        if confirm != "y":
-            print("Restart cancelled.")
-            return
+def restart_game(autostart=True):
+    """Manual restart: wipes bag/buildings too (a death restart happens in engine.die())."""
+    global current_slot
+    confirm = input("Are you sure you want to restart? (y/n)\n> ").strip().lower()
+    if dev_command_handler(confirm):
+        return
+    if confirm != "y":
+        print("Restart cancelled.")
+        return
 
     print("Restarting game...")
-    xp = 0
-    upgrade_amt = 110
-    hp = 60
-    max_hp = 60
-    att = 6
-    lv = 1
-    alive = True
-    current_area_index = 0
-    current_weapon = "Fists"
-    adrenaline_active = False
-    strength_level = 0
-    endurance_level = 0
-    survival_level = 0
-    crit_chance = 0
-
-    if forced:
-        weapons_inventory = {"Fists": {"name": "Fists", "bonus": 0}}
-        # keep bag & buildings
-    else:
-        weapons_inventory = {"Fists": {"name": "Fists", "bonus": 0}}
-        bag = {}
-        buildings = {}
+    state.reset()
+    current_slot = None   # a fresh game stays out of the slot it was loaded from
+    checkpoints.clear()
 
     if autostart:
         print("----- Welcome To The Backwoods -----")
-        main()
+        go_to("main")
 
 def settings():
     while True:
@@ -1468,9 +779,10 @@ def settings():
 [2] Restart
 [3] Save Game
 [4] Main Menu
-[5] Back
+[5] Text Speed
+[6] Back
 ''')
-        choice = input("Choose an option (1-5)\n> ").strip()
+        choice = input("Choose an option (1-6)\n> ").strip()
         if dev_command_handler(choice):
             continue
 
@@ -1482,20 +794,36 @@ def settings():
             save_game()
         elif choice == "4":
             print("Returning to main menu... (game will reset)")
-            restart_game(forced=False, autostart=False)
-            start_menu()
-            return
+            restart_game(autostart=False)
+            go_to("start_menu")
         elif choice == "5":
+            text_speed_menu()
+        elif choice == "6":
             return
         else:
             print("Invalid option, please choose again.")
 
+def text_speed_menu():
+    global text_speed
+    names = list(SPEEDS)
+    print(f"\nText speed is '{text_speed}'. Press any key during a scene to skip it.")
+    for i, name in enumerate(names, start=1):
+        print(f"[{i}] {name.capitalize()}")
+    choice = input("> ").strip().lower()
+    if choice.isdigit() and 1 <= int(choice) <= len(names):
+        choice = names[int(choice) - 1]
+    if choice in SPEEDS:
+        text_speed = choice
+        print(f"Text speed set to '{text_speed}'.")
+    else:
+        print("Text speed unchanged.")
+
 def buildings_menu():
     """Shows built structures and lets you interact with Campfire/Traps."""
     while True:
         print("\n===== BUILDINGS =====")
-        have_campfire = buildings.get("Campfire", 0) > 0
-        have_traps = buildings.get("Trap", 0) + buildings.get("Advanced Trap", 0) > 0
+        have_campfire = state.buildings.get("Campfire", 0) > 0
+        have_traps = state.buildings.get("Trap", 0) + state.buildings.get("Advanced Trap", 0) > 0
         have_any = any([have_campfire, have_traps])
 
         if not have_any:
@@ -1509,9 +837,9 @@ def buildings_menu():
                 continue
 
         if have_campfire:
-            print(f"Campfire x{buildings.get('Campfire', 0)}")
+            print(f"Campfire x{state.buildings.get('Campfire', 0)}")
         if have_traps:
-            total_traps = buildings.get("Trap", 0) + buildings.get("Advanced Trap", 0)
+            total_traps = state.buildings.get("Trap", 0) + state.buildings.get("Advanced Trap", 0)
             print(f"Traps x{total_traps}")
 
         print("\nOptions:")
@@ -1540,17 +868,38 @@ def buildings_menu():
         else:
             print("Invalid option.")
 
+# ===============================================
+# Scenes: menus hand control back to one flat loop
+# ===============================================
+class SceneChange(Exception):
+    """Raised by go_to(); unwinds whatever menus/fights are open back to run_game()."""
+
+    def __init__(self, scene):
+        super().__init__(scene)
+        self.scene = scene
+
+def go_to(scene):
+    """Leave every open prompt and continue in `scene` ("start_menu" or "main")."""
+    raise SceneChange(scene)
+
+def run_game(scene="start_menu"):
+    """Scene loop: each scene returns (or go_to()s) the next one, so the stack never grows."""
+    while scene:
+        try:
+            scene = SCENES[scene]()
+        except SceneChange as change:
+            scene = change.scene
+
 # ===============================================
 # Main Loop & Start Menu
 # ===============================================
 def main():
-    global xp, upgrade_amt
     while True:
         print(f"""
 [1] Stats
 [2] Inventory
 [3] Explore
-[4] Search {areas[current_area_index]['name']}
+[4] Search {areas[state.current_area_index]['name']}
 [5] Craft
 [6] Buildings
 [7] Map
@@ -1581,7 +930,7 @@ def main():
         else:
             print("This is not a valid input, please choose 1-8.")
 
-        if xp >= upgrade_amt:
+        if state.can_level_up():
             upgrade()
 
 def start_menu():
@@ -1599,24 +948,20 @@ def start_menu():
             print("\n🔧 DEVELOPER MODE ACTIVATED: SANDBOX MODE ENABLED")
             print("(Saving Disabled - all progress will be lost on exit)")
             devmode_active = True
-            restart_game(forced=False, autostart=True)
-            main()
-            devmode_active = False
-            return
+            restart_game(autostart=True)
+            return "main"
 
         if choice == "1":
             devmode_active = False
-            restart_game(forced=False, autostart=True)
-            main()
-            return
+            restart_game(autostart=True)
+            return "main"
         elif choice == "2":
             if devmode_active:
                 print("❌ Cannot load game in Developer Mode.")
                 continue
             if load_game_from_slot():
                 print("Loading saved game...")
-                main()
-                return
+                return "main"
         elif choice == "3":
             delete_save_slot()
         elif choice == "4":
@@ -1625,9 +970,31 @@ def start_menu():
         else:
             print("Invalid choice.")
 
+SCENES = {"start_menu": start_menu, "main": main}
+
 # ===============================================
 # Entry
 # ===============================================
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="The Backwoods")
+    parser.add_argument("--speed", choices=list(SPEEDS), default=DEFAULT_SPEED, help="text speed")
+    parser.add_argument("--fast", action="store_true", help="same as --speed instant")
+    parser.add_argument("--seed", type=int, help="seed this session's RNG (default: random)")
+    parser.add_argument("--record", metavar="LOG", help="record this session for replay.py")
+    parser.add_argument("--db", metavar="PATH", help="keep save slots in this SQLite database")
+    args = parser.parse_args()
+
+    text_speed = "instant" if args.fast else args.speed
+    if args.db:
+        store = SQLiteSlotStore(args.db)
+        atexit.register(store.close)
+    autosaver = AutosaveWriter(store)
+    atexit.register(autosaver.close)   # registered last, so it runs before store.close
+    if args.seed is not None:
+        session_seed = args.seed
+        state.rng.seed(session_seed)
+    if args.record:
+        recorder = SessionRecorder(args.record, session_seed)
+        atexit.register(recorder.close, state)
     ensure_save_dir()
-    start_menu()
+    run_game()
@@ -0,0 +1,85 @@
+# ============================
+# AUTOSAVE.PY - Write-behind autosave
+# The game loop hands snapshots to submit() and carries on; a background
+# thread writes them. Only the newest pending snapshot per slot is kept,
+# and writes are spaced at least `min_interval` seconds apart.
+# ============================
+
+import threading
+import time
+
+MIN_INTERVAL = 0.5      # seconds between two disk writes (max 2 writes/s)
+
+
+class AutosaveWriter:
+    """
+    Background writer in front of a save store (anything with append(slot, snapshot)).
+    submit() never blocks on disk; flush() waits until everything submitted so
+    far is written; close() flushes and stops the thread.
+    """
+
+    def __init__(self, store, min_interval=MIN_INTERVAL):
+        self.store = store
+        self.min_interval = min_interval
+        self.errors = []                # (slot, message) for writes that failed
+        self.written = 0
+        self.coalesced = 0              # snapshots replaced by a newer one before being written
+        self._pending = {}              # slot → newest snapshot not yet written
+        self._cond = threading.Condition()
+        self._busy = False
+        self._flushing = 0
+        self._closing = False
+        self._next_write = 0.0
+        self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._thread.start()
+
+    def submit(self, slot, snapshot):
+        """Queue `snapshot` for `slot`, replacing any older one still waiting."""
+        with self._cond:
+            if self._closing:
+                raise RuntimeError("autosave writer is closed")
+            if slot in self._pending:
+                self.coalesced += 1
+            self._pending[slot] = snapshot
+            self._cond.notify_all()
+
+    def flush(self):
+        """Write everything pending now (ignoring the rate limit) and wait for it."""
+        with self._cond:
+            self._flushing += 1
+            self._cond.notify_all()
+            while self._pending or self._busy:
+                self._cond.wait()
+            self._flushing -= 1
+
+    def close(self):
+        self.flush()
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                wait = self._next_write - time.monotonic()
+                if wait > 0 and not self._flushing:
+                    self._cond.wait(wait)
+                    continue
+                slot = next(iter(self._pending))
+                snapshot = self._pending.pop(slot)
+                self._busy = True
+            try:
+                self.store.append(slot, snapshot)
+            except Exception as e:
+                self.errors.append((slot, str(e)))
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self.written += 1
+                    self._next_write = time.monotonic() + self.min_interval
+                    self._cond.notify_all()
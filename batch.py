@@ -0,0 +1,141 @@
+# ============================
+# BATCH.PY - Non-interactive runner
+# Reads one command per line from a file or stdin, runs it through
+# GameEngine at full speed (no prompts, no delays) and writes every
+# engine event as a JSON line.
+#
+# Usage:  python batch.py [commands.txt | -] [--seed N] [--out events.jsonl] [--final-state]
+#
+# Commands (case-insensitive, '#' starts a comment):
+#   explore | search | attack | run | wait | cook | check_traps
+#   use <item> | craft <recipe> | equip <weapon> | upgrade <path> | advance y/n
+#   state                       - emit {"type": "state", "state": {...}}
+#   {"type": "craft", ...}      - a raw engine action as JSON
+# ============================
+
+import argparse
+import json
+import random
+import sys
+import time
+
+from engine import (
+    CRAFT_ARMOR_ADV,
+    CRAFT_WEAPONS_ADV,
+    CRAFT_WEAPONS_BASIC,
+    FINDABLE_WEAPONS,
+    ITEM_NAMES,
+    GameEngine,
+    GameState,
+)
+
+# ==== Command Vocabulary ====
+ARG_KEYS = {"use": "item", "use_item": "item", "craft": "recipe", "equip": "weapon", "upgrade": "path"}
+ALIASES = {"use": "use_item", "traps": "check_traps", "check": "check_traps"}
+KNOWN_NAMES = {name.lower(): name for name in (
+    list(ITEM_NAMES)
+    + [r["name"] for r in CRAFT_WEAPONS_BASIC + CRAFT_WEAPONS_ADV + CRAFT_ARMOR_ADV]
+    + ["Trap", "Advanced Trap", "Campfire", "Workbench", "Fists"]
+    + list(FINDABLE_WEAPONS)
+    + ["Strength", "Endurance", "Survival"]
+)}
+
+
+def parse_command(line):
+    """
+    One input line → engine action dict, "state" for the meta command,
+    or None for blank/comment lines. Raises ValueError on bad JSON.
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if line.startswith("{"):
+        try:
+            action = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"bad JSON action: {e}") from None
+        if not isinstance(action, dict):
+            raise ValueError("JSON action must be an object")
+        return action
+
+    verb, _, rest = line.partition(" ")
+    verb = verb.lower()
+    rest = rest.strip()
+    if verb == "state":
+        return "state"
+    if verb == "advance":
+        return {"type": "advance", "accept": rest.lower() in ("y", "yes", "true", "1")}
+    action = {"type": ALIASES.get(verb, verb)}
+    if verb in ARG_KEYS:
+        action[ARG_KEYS[verb]] = KNOWN_NAMES.get(rest.lower(), rest) if rest else None
+    return action
+
+
+def run_batch(lines, state=None, engine=None, out=None):
+    """
+    Run every command in `lines` against `state`, writing JSON-lines events to
+    `out` (a text file; None collects nothing). Each event gets "cmd", the
+    1-based input line it came from. Returns (commands run, events, errors).
+    """
+    state = state if state is not None else GameState()
+    engine = engine or GameEngine()
+    write = out.write if out is not None else None
+    dumps = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+    commands = events_out = errors = 0
+
+    for n, line in enumerate(lines, start=1):
+        try:
+            action = parse_command(line)
+        except ValueError as e:
+            errors += 1
+            if write:
+                write(dumps({"cmd": n, "type": "error", "message": str(e)}) + "\n")
+            continue
+        if action is None:
+            continue
+
+        commands += 1
+        if action == "state":
+            events = [{"type": "state", "state": state.to_dict()}]
+        else:
+            events = engine.step(state, action)
+        events_out += len(events)
+        if write:
+            for ev in events:
+                write(dumps({"cmd": n, **ev}) + "\n")
+    return commands, events_out, errors
+
+
+# ===============================================
+# Entry
+# ===============================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run game commands non-interactively; print JSON-lines events.")
+    parser.add_argument("commands", nargs="?", default="-", help="command file (default: stdin)")
+    parser.add_argument("--seed", type=int, help="seed the game's RNG for a reproducible run")
+    parser.add_argument("--out", help="write events here instead of stdout")
+    parser.add_argument("--final-state", action="store_true", help="finish with a state line")
+    args = parser.parse_args(argv)
+
+    state = GameState(random.Random(args.seed) if args.seed is not None else None)
+    source = sys.stdin if args.commands == "-" else open(args.commands, "r", encoding="utf-8")
+    out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+
+    began = time.perf_counter()
+    try:
+        commands, events, errors = run_batch(source, state, out=out)
+        if args.final_state:
+            out.write(json.dumps({"type": "state", "state": state.to_dict()}, separators=(",", ":")) + "\n")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - began
+
+    print(f"{commands} commands → {events} events in {elapsed:.3f}s"
+          + (f", {errors} unreadable lines" if errors else ""), file=sys.stderr)
+    sys.exit(1 if errors else 0)
+
+if __name__ == "__main__":
+    main()
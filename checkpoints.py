@@ -0,0 +1,87 @@
+# ============================
+# CHECKPOINTS.PY - In-memory rewind buffer
+# Keeps the last N game states. Only the newest one is held in full;
+# every older entry is the small delta (storage.diff_state) that turns
+# the entry after it back into it, so a checkpoint costs a few bytes even
+# with a huge bag.
+# ============================
+
+import copy
+import json
+from collections import deque
+
+from storage import apply_delta, diff_state
+
+CAPACITY = 64
+
+
+class CheckpointRing:
+    """
+    push(snapshot, label) after each change; get(n) rebuilds the snapshot n
+    checkpoints back (0 = newest). The oldest entries fall off past `capacity`.
+    """
+
+    def __init__(self, capacity=CAPACITY):
+        self.capacity = capacity
+        self._head = None               # newest snapshot, in full
+        self._head_label = None
+        self._older = deque()           # (label, delta back to that entry), newest last
+
+    def __len__(self):
+        return 0 if self._head is None else len(self._older) + 1
+
+    def clear(self):
+        self._head = None
+        self._head_label = None
+        self._older.clear()
+
+    def push(self, snapshot, label=""):
+        """Add a checkpoint. Returns False (and stores nothing) if nothing changed."""
+        if self._head is not None:
+            back = diff_state(snapshot, self._head)
+            if back is None:
+                return False
+            self._older.append((self._head_label, back))
+            if len(self._older) >= self.capacity:
+                self._older.popleft()
+        self._head = copy.deepcopy(snapshot)
+        self._head_label = label
+        return True
+
+    def labels(self):
+        """Labels newest first; index i is what get(i) restores."""
+        if self._head is None:
+            return []
+        return [self._head_label] + [label for label, _ in reversed(self._older)]
+
+    def get(self, n=0):
+        """Fresh copy of the snapshot n checkpoints back."""
+        if not 0 <= n < len(self):
+            raise IndexError(f"only {len(self)} checkpoints")
+        snapshot = copy.deepcopy(self._head)
+        for i in range(n):
+            apply_delta(snapshot, self._older[-1 - i][1])
+        return snapshot
+
+    def find(self, predicate):
+        """Index of the newest checkpoint whose label matches, or None."""
+        for i, label in enumerate(self.labels()):
+            if predicate(label):
+                return i
+        return None
+
+    def rewind(self, n):
+        """get(n), and forget the n newer checkpoints so later pushes continue from there."""
+        snapshot = self.get(n)
+        if n:
+            for _ in range(n - 1):
+                self._older.pop()
+            self._head_label, _ = self._older.pop()
+            self._head = copy.deepcopy(snapshot)
+        return snapshot
+
+    def size_bytes(self):
+        """Rough memory footprint (JSON size of the head plus every delta)."""
+        if self._head is None:
+            return 0
+        return len(json.dumps(self._head)) + sum(len(json.dumps(d)) for _, d in self._older)
@@ -0,0 +1,850 @@
+# ============================
+# ENGINE.PY - Headless rules for The Backwoods
+# No input()/print(): every action mutates a GameState
+# and returns a list of event dicts for the caller to show.
+# ============================
+
+import random
+
+from sampler import AliasTable, TableCache, TrackedDict, TrackedList, tracked
+
+# ==== Imports: Areas & Animals ====
+from map import areas
+from animals import (
+    camp_animals,
+    forest_animals,
+    highlands_animals,
+    jungle_animals,
+    boss,
+)
+
+# ==== Constants & Gameplay Flags ====
+FLYING_ENEMIES = {"Sparrow", "Hawk", "Eagle"}  # used by Bow special
+BOW_ENEMY_ATK_REDUCTION = 1
+
+# Categories used for Inventory UI
+ITEM_NAMES = {"Fruit", "Food", "Medkit", "Bandage", "Adrenaline Shot"}
+RESOURCE_NAMES = {"Wood", "Stone", "Rope", "Fur", "Bones", "Scales", "Meat"}
+
+# Healing items → HP restored (Adrenaline Shot is a buff, handled separately)
+ITEM_HEAL = {"Fruit": 10, "Food": 15, "Medkit": 25, "Bandage": 10}
+
+# ==== Weapons: Craftable & Findable (stats & availability) ====
+# Craftable basics:
+CRAFT_WEAPONS_BASIC = [
+    {"name": "Wooden Sword", "bonus": 2, "cost": {"Wood": 3}},
+    {"name": "Spear",        "bonus": 3, "cost": {"Wood": 2, "Bones": 1}},
+]
+# Requires Workbench to appear in crafting:
+CRAFT_WEAPONS_ADV = [
+    {"name": "Bone Spear",   "bonus": 4, "cost": {"Bones": 2, "Rope": 1, "Wood": 2}},
+]
+# Armor (Workbench unlocks these in crafting under Weapons section)
+CRAFT_ARMOR_ADV = [
+    {"name": "Scale Armor",  "hp_bonus": 10, "cost": {"Scales": 2, "Rope": 2}},
+    {"name": "Fur Cloak",    "hp_bonus": 5,  "cost": {"Fur": 3, "Rope": 1}},
+]
+# Find-only weapons by area:
+FINDABLE_WEAPONS = tracked({
+    "Dagger":      {"bonus": 3, "areas": {"Camp", "Forest", "Highlands", "Jungle"}},
+    "Rusty Sword": {"bonus": 4, "areas": {"Forest", "Highlands", "Jungle"}},
+    "Bow":         {"bonus": 3, "areas": {"Forest", "Highlands", "Jungle"}},  # -1 enemy atk vs non-flying
+    "Axe":         {"bonus": 5, "areas": {"Jungle"}},  # Jungle-only
+})
+# Find rarity weights (Axe rare); anything not listed is common like the Dagger
+WEAPON_FIND_WEIGHTS = tracked({"Axe": 1, "Rusty Sword": 3, "Bow": 3})
+COMMON_FIND_WEIGHT = 5
+
+# ==== Buildings & Trap Logic ====
+MAX_TRAPS_TOTAL = 4        # normal + advanced combined
+NTCC = 0.20                # Normal Trap Catch Chance
+ATCC = 0.35                # Advanced Trap Catch Chance
+TRAP_COST = {"Wood": 2, "Rope": 1}
+ADV_TRAP_COST = {"Wood": 3, "Rope": 2, "Bones": 1}
+CAMPFIRE_COST = {"Wood": 3, "Stone": 1}
+WORKBENCH_COST = {"Wood": 4, "Stone": 2, "Rope": 2}
+
+# ==== Resource Distribution (by Area) ====
+RESOURCE_TABLE = tracked({
+    "Camp": [
+        ("Wood",   0.35),
+        ("Stone",  0.20),
+        ("Rope",   0.15),
+        ("Bones",  0.00),
+        ("Scales", 0.00),
+        ("Fruit",  0.25),
+        ("Nothing",0.05),
+    ],
+    "Forest": [
+        ("Wood",   0.40),
+        ("Stone",  0.20),
+        ("Rope",   0.25),
+        ("Bones",  0.15),
+        ("Scales", 0.00),
+        ("Fruit",  0.20),
+        ("Nothing",0.05),
+    ],
+    "Highlands": [
+        ("Wood",   0.30),
+        ("Stone",  0.35),
+        ("Rope",   0.25),
+        ("Bones",  0.05),
+        ("Scales", 0.20),
+        ("Fruit",  0.15),
+        ("Nothing",0.05),
+    ],
+    "Jungle": [
+        ("Wood",   0.40),
+        ("Stone",  0.20),
+        ("Rope",   0.20),
+        ("Bones",  0.35),
+        ("Scales", 0.35),
+        ("Fruit",  0.10),
+        ("Nothing",0.05),
+    ],
+})
+
+# ==== Encounters by Area ====
+# Only the pools are tracked: the sampler holds the animal dicts themselves,
+# so their stats are read at fight time and need no rebuild.
+AREA_ANIMALS = TrackedDict({
+    "Camp": TrackedList(camp_animals),
+    "Forest": TrackedList(forest_animals),
+    "Highlands": TrackedList(highlands_animals),
+    "Jungle": TrackedList(jungle_animals),
+})
+
+# Strong animal used by Search (no XP)
+STRONG_ANIMALS = {
+    "Camp":      {"name": "Wolf",      "hp": 25, "attack": 5,  "xp_reward": 0},
+    "Forest":    {"name": "Wild Ape",  "hp": 50, "attack": 9,  "xp_reward": 0},
+    "Highlands": {"name": "Crocodile", "hp": 60, "attack": 12, "xp_reward": 0},
+    "Jungle":    {"name": "Crocodile", "hp": 60, "attack": 12, "xp_reward": 0},
+}
+
+# ==== Upgrade Paths ====
+STRENGTH_CRIT = [0, 10, 15, 20]     # crit % by Strength tier
+ENDURANCE_HP = [0, 6, 8, 12]        # Max HP gained at each Endurance tier
+UPGRADE_DESCRIPTIONS = {
+    "Strength":  ["", "(+2 ATK, Crit 10%)", "(+2 ATK, Crit 15%)", "(+2 ATK, Crit 20%)"],
+    "Endurance": ["", "(+6 Max HP)", "(+8 Max HP, +2 Regen/Explore)", "(+12 Max HP, +2 Medkits)"],
+    "Survival":  ["", "(+10% Gather Chance)", "(+20% Gather Yield)", "(+30% Yield, +10% Trap Success)"],
+}
+
+
+def new_weapons_inventory():
+    return {"Fists": {"name": "Fists", "bonus": 0}}
+
+
+# ===============================================
+#                  Game State
+# ===============================================
+class GameState:
+    """Everything one game needs. Many can live in the same process."""
+
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else random
+        self.bag = {}        # name → count (Items + Resources; UI splits them)
+        self.buildings = {}  # e.g., {"Campfire": 1, "Trap": 2, "Workbench": 1}
+        self.reset()
+
+    def reset(self, keep_items=False):
+        """Fresh character. Death keeps bag/buildings; a manual restart wipes them."""
+        self.xp = 0
+        self.upgrade_amt = 110
+        self.hp = 60
+        self.max_hp = 60
+        self.att = 6
+        self.lv = 1
+        self.alive = True
+        self.strength_level = 0
+        self.endurance_level = 0
+        self.survival_level = 0
+        self.crit_chance = 0  # percent
+        self.current_area_index = 0  # starts at Camp
+        self.current_weapon = "Fists"
+        self.adrenaline_active = False
+        self.weapons_inventory = new_weapons_inventory()
+        if not keep_items:
+            self.bag = {}
+            self.buildings = {}
+        # Pending interactions: an ongoing fight, or a discovered path awaiting y/n
+        self.fight = None
+        self.pending_area = None
+
+    # ---- Save/Load ----
+    def to_dict(self):
+        """Return a JSON-serializable snapshot of the full game state."""
+        return {
+            "xp": self.xp,
+            "upgrade_amt": self.upgrade_amt,
+            "hp": self.hp,
+            "max_hp": self.max_hp,
+            "att": self.att,
+            "lv": self.lv,
+            "alive": self.alive,
+            "strength_level": self.strength_level,
+            "endurance_level": self.endurance_level,
+            "survival_level": self.survival_level,
+            "crit_chance": self.crit_chance,
+            "current_area_index": self.current_area_index,
+            "current_weapon": self.current_weapon,
+            "adrenaline_active": self.adrenaline_active,
+            "weapons_inventory": {k: dict(v) for k, v in self.weapons_inventory.items()},
+            "bag": dict(self.bag),
+            "buildings": dict(self.buildings),
+        }
+
+    def apply(self, data):
+        """Load a snapshot produced by to_dict()."""
+        self.xp = data.get("xp", 0)
+        self.upgrade_amt = data.get("upgrade_amt", 110)
+        self.hp = data.get("hp", 60)
+        self.max_hp = data.get("max_hp", 60)
+        self.att = data.get("att", 6)
+        self.lv = data.get("lv", 1)
+        self.alive = data.get("alive", True)
+        self.strength_level = data.get("strength_level", 0)
+        self.endurance_level = data.get("endurance_level", 0)
+        self.survival_level = data.get("survival_level", 0)
+        self.crit_chance = data.get("crit_chance", 0)
+        self.current_area_index = data.get("current_area_index", 0)
+        self.current_weapon = data.get("current_weapon", "Fists")
+        self.adrenaline_active = data.get("adrenaline_active", False)
+        self.weapons_inventory = data.get("weapons_inventory", new_weapons_inventory())
+        self.bag = data.get("bag", {})
+        self.buildings = data.get("buildings", {})
+        self.fight = None
+        self.pending_area = None
+
+    # ---- Helpers ----
+    def add_to_bag(self, name, count=1):
+        """Add items/resources to the bag."""
+        self.bag[name] = self.bag.get(name, 0) + max(1, count)
+
+    def remove_from_bag(self, req):
+        """Consume a dict of resources from the bag."""
+        for k, v in req.items():
+            if k in self.bag:
+                self.bag[k] -= v
+                if self.bag[k] <= 0:
+                    del self.bag[k]
+
+    def have_in_bag(self, req):
+        """Check if the bag contains at least 'req' amounts for each resource."""
+        return all(self.bag.get(k, 0) >= v for k, v in req.items())
+
+    def total_attack(self):
+        """Player base attack plus current weapon bonus."""
+        return self.att + self.weapons_inventory[self.current_weapon]["bonus"]
+
+    def area_name(self):
+        return areas[self.current_area_index]["name"]
+
+    def is_trap_cap_reached(self):
+        return self.buildings.get("Trap", 0) + self.buildings.get("Advanced Trap", 0) >= MAX_TRAPS_TOTAL
+
+    def usable_items(self):
+        return [name for name in ITEM_NAMES if self.bag.get(name, 0) > 0]
+
+    def can_level_up(self):
+        return self.xp >= self.upgrade_amt and bool(self.upgrade_choices())
+
+    def upgrade_choices(self):
+        """[(path, next_tier, description), ...] for every path not yet maxed."""
+        choices = []
+        for path, level in (("Strength", self.strength_level),
+                            ("Endurance", self.endurance_level),
+                            ("Survival", self.survival_level)):
+            if level < 3:
+                choices.append((path, level + 1, UPGRADE_DESCRIPTIONS[path][level + 1]))
+        return choices
+
+    def gear_recipes(self):
+        """Weapons (basic + advanced if Workbench) and Armor (if Workbench)."""
+        entries = [("weapon", r) for r in CRAFT_WEAPONS_BASIC]
+        if self.buildings.get("Workbench", 0) > 0:
+            entries += [("weapon", r) for r in CRAFT_WEAPONS_ADV]
+            entries += [("armor", r) for r in CRAFT_ARMOR_ADV]
+        return entries
+
+
+# ===============================================
+#                  Rule Helpers
+# ===============================================
+def weighted_choice(pairs, rng=random):
+    """Choose one key based on weights; pairs = [(key, weight), ...]. Works with any total sum."""
+    total = sum(w for _, w in pairs)
+    if total <= 0:
+        return pairs[-1][0]
+    r = rng.random() * total
+    acc = 0.0
+    for key, w in pairs:
+        acc += w
+        if r < acc:
+            return key
+    return pairs[-1][0]  # fallback
+
+# ---- Compiled samplers (the tables above are tracked(), so in-place edits rebuild them) ----
+def _build_weapon_table(area_name, weapons):
+    allowed = get_allowed_findable_weapons(area_name)
+    if not allowed:
+        return None
+    return AliasTable([(name, WEAPON_FIND_WEIGHTS.get(name, COMMON_FIND_WEIGHT)) for name in allowed])
+
+_resource_tables = TableCache(lambda area_name, pairs: AliasTable(pairs))
+_weapon_tables = TableCache(_build_weapon_table)
+_encounter_tables = TableCache(lambda area_name, pool: AliasTable([(enemy, 1) for enemy in pool]))
+
+def invalidate_samplers():
+    for cache in (_resource_tables, _weapon_tables, _encounter_tables):
+        cache.invalidate()
+
+def resource_sampler(area_name):
+    """Alias table over RESOURCE_TABLE[area_name]. Use .sample(rng) or .draw(n, rng)."""
+    return _resource_tables.get(area_name, RESOURCE_TABLE[area_name])
+
+def weapon_sampler(area_name):
+    """Alias table over the weapons findable here (None if there are none)."""
+    return _weapon_tables.get(area_name, FINDABLE_WEAPONS)
+
+def encounter_sampler(area_name):
+    """Uniform alias table over this area's animals (None if the area has none)."""
+    pool = AREA_ANIMALS.get(area_name)
+    return _encounter_tables.get(area_name, pool) if pool else None
+
+def roll(rng, low, high):
+    """Uniform int in [low, high], like rng.randint() but one rng.random() call and no checks."""
+    return low + int(rng.random() * (high - low + 1))
+
+def normalize_resource_name(name):
+    """Normalize singular names from animals into our bag naming."""
+    if name == "Bone":  return "Bones"
+    if name == "Scale": return "Scales"
+    return name
+
+def missing_materials(state, cost):
+    return {"type": "missing_materials", "cost": dict(cost),
+            "have": {k: state.bag.get(k, 0) for k in cost}}
+
+def maybe_crit(state, dmg):
+    """Apply Strength path crits. Returns (final_damage, is_crit)."""
+    if state.crit_chance > 0 and roll(state.rng, 1, 100) <= state.crit_chance:
+        return dmg * 2, True
+    return dmg, False
+
+def gather_resource(state, events):
+    """Gather one resource using the area table. Base qty 1–3; Survival II adds +1."""
+    outcome = resource_sampler(state.area_name()).sample(state.rng)
+
+    if outcome == "Nothing":
+        events.append({"type": "gather", "item": None, "qty": 0})
+        return
+
+    qty = roll(state.rng, 1, 3)
+    if state.survival_level >= 2:
+        qty += 1
+
+    state.add_to_bag(outcome, qty)
+    events.append({"type": "gather", "item": outcome, "qty": qty})
+
+def get_allowed_findable_weapons(area_name):
+    return [wname for wname, data in FINDABLE_WEAPONS.items() if area_name in data["areas"]]
+
+def maybe_find_weapon(state, events):
+    """25% branch: try to find a weapon appropriate for this area."""
+    table = weapon_sampler(state.area_name())
+    if table is None:
+        events.append({"type": "weapon_found", "weapon": None, "new": False})
+        return
+
+    pick = table.sample(state.rng)
+    is_new = pick not in state.weapons_inventory
+    if is_new:
+        state.weapons_inventory[pick] = {"name": pick, "bonus": FINDABLE_WEAPONS[pick]["bonus"]}
+    events.append({"type": "weapon_found", "weapon": pick, "new": is_new})
+
+def roll_traps(state, events, passive):
+    """Roll every trap once. Normal: Meat & Fur 1–2. Advanced: 3 of Meat/Fur/Bones/Scales, 1–2 each."""
+    rng = state.rng
+    bonus = 0.10 if state.survival_level >= 3 else 0.0  # Survival III
+    eff_NTCC = NTCC + bonus
+    eff_ATCC = ATCC + bonus
+
+    for _ in range(state.buildings.get("Trap", 0)):
+        if rng.random() < eff_NTCC:
+            catch = {"Meat": roll(rng, 1, 2), "Fur": roll(rng, 1, 2)}
+            for item, qty in catch.items():
+                state.add_to_bag(item, qty)
+            events.append({"type": "trap", "trap": "Trap", "catch": catch, "passive": passive})
+        elif not passive:
+            events.append({"type": "trap", "trap": "Trap", "catch": {}, "passive": passive})
+
+    for _ in range(state.buildings.get("Advanced Trap", 0)):
+        if rng.random() < eff_ATCC:
+            catch = {}
+            for item in rng.sample(["Meat", "Fur", "Bones", "Scales"], 3):
+                catch[item] = roll(rng, 1, 2)
+                state.add_to_bag(item, catch[item])
+            events.append({"type": "trap", "trap": "Advanced Trap", "catch": catch, "passive": passive})
+        elif not passive:
+            events.append({"type": "trap", "trap": "Advanced Trap", "catch": {}, "passive": passive})
+
+
+# ===============================================
+#                  Combat Rules
+# ===============================================
+def start_fight(state, enemy, events, allow_run=True, after=None):
+    """Open a regular fight. 'after' names the action to resume once it ends."""
+    player_attack = state.total_attack()
+    if state.adrenaline_active:
+        player_attack += 2
+        state.adrenaline_active = False
+    state.fight = {
+        "enemy": enemy,
+        "enemy_hp": enemy["hp"],
+        "allow_run": allow_run,
+        "attack": player_attack,
+        "boss": False,
+        "burn_turns": 0,
+        "after": after,
+    }
+    events.append({"type": "fight_start", "enemy": enemy["name"], "enemy_hp": enemy["hp"],
+                   "allow_run": allow_run, "boss": False})
+
+def start_boss_fight(state, events):
+    enemy = {"name": boss["name"], "hp": boss["hp"], "attack": boss["attack"], "xp_reward": 0}
+    state.fight = {
+        "enemy": enemy,
+        "enemy_hp": enemy["hp"],
+        "allow_run": False,
+        "attack": 0,
+        "boss": True,
+        "burn_turns": 0,
+        "after": None,
+    }
+    events.append({"type": "fight_start", "enemy": enemy["name"], "enemy_hp": enemy["hp"],
+                   "allow_run": False, "boss": True})
+    boss_turn_start(state, events)
+
+def boss_turn_start(state, events):
+    """Burn ticks, then the player's attack (and Adrenaline) is locked in for this turn."""
+    fight = state.fight
+    if fight["burn_turns"] > 0:
+        state.hp -= 2
+        fight["burn_turns"] -= 1
+        events.append({"type": "burn", "damage": 2, "hp": state.hp, "max_hp": state.max_hp})
+        if state.hp <= 0:
+            die(state, fight["enemy"]["name"], events)
+            return
+
+    player_attack = state.total_attack()
+    if state.adrenaline_active:
+        player_attack += 2
+        state.adrenaline_active = False
+    fight["attack"] = player_attack
+
+def player_strike(state, events):
+    fight = state.fight
+    player_attack = fight["attack"]
+    base = roll(state.rng, max(1, player_attack - 2), player_attack + 2)
+    dmg, was_crit = maybe_crit(state, base)
+    fight["enemy_hp"] -= dmg
+    events.append({"type": "hit", "enemy": fight["enemy"]["name"], "damage": dmg,
+                   "crit": was_crit, "boss": fight["boss"]})
+
+def enemy_strike(state, events):
+    fight = state.fight
+    enemy = fight["enemy"]
+    enemy_dmg = roll(state.rng, enemy["attack"] - 1, enemy["attack"] + 1)
+    # Bow effect: -1 atk vs non-flying
+    if state.current_weapon == "Bow" and enemy["name"] not in FLYING_ENEMIES:
+        enemy_dmg = max(0, enemy_dmg - BOW_ENEMY_ATK_REDUCTION)
+    state.hp -= enemy_dmg
+    events.append({"type": "enemy_hit", "enemy": enemy["name"], "damage": enemy_dmg})
+
+def boss_strike(state, events):
+    fight = state.fight
+    boss_attack_choice = state.rng.choice(["plasma", "thermal"])
+    if boss_attack_choice == "plasma":
+        dmg = roll(state.rng, 10, 13)
+    else:
+        dmg = roll(state.rng, 8, 10)
+        fight["burn_turns"] = 3
+    state.hp -= dmg
+    events.append({"type": "boss_attack", "enemy": fight["enemy"]["name"],
+                   "attack": boss_attack_choice, "damage": dmg})
+
+def die(state, enemy_name, events):
+    """Death: report where the run ended, then forced restart (bag & buildings kept)."""
+    events.append({"type": "death", "enemy": enemy_name, "area": state.area_name(), "level": state.lv})
+    state.reset(keep_items=True)
+
+def end_fight(state, events):
+    after = state.fight["after"]
+    state.fight = None
+    if after == "explore":
+        explore_tail(state, events)
+
+
+# ===============================================
+#                  Explore Rules
+# ===============================================
+def explore_tail(state, events):
+    """Everything explore() does after the encounter: traps, area discovery, regen."""
+    rng = state.rng
+    roll_traps(state, events, passive=True)
+
+    # Discover next area: 10%
+    if rng.random() < 0.10 and state.current_area_index < len(areas) - 1:
+        state.pending_area = state.current_area_index + 1
+        next_area = areas[state.pending_area]
+        events.append({"type": "area_discovered", "area": next_area["name"],
+                       "description": next_area["description"]})
+        return
+
+    explore_regen(state, events)
+
+def explore_regen(state, events):
+    # Endurance II passive regen after exploration loop
+    if state.hp > 0 and state.endurance_level >= 2:
+        healed = min(2, state.max_hp - state.hp)
+        if healed > 0:
+            state.hp += healed
+            events.append({"type": "regen", "amount": healed})
+
+
+# ===============================================
+#                  Game Engine
+# ===============================================
+FIGHT_ACTIONS = {"attack", "use_item", "run", "wait"}
+
+
+class GameEngine:
+    """
+    Applies one action to a GameState and returns the resulting events.
+
+    Actions are dicts with a "type" key (a bare string is shorthand for
+    {"type": ...}):
+        explore, search, cook, check_traps
+        craft        {"recipe": name}
+        equip        {"weapon": name}
+        use_item     {"item": name}
+        upgrade      {"path": "Strength" | "Endurance" | "Survival"}
+        advance      {"accept": bool}          (after "area_discovered")
+        attack, run, wait                      (during a fight)
+    """
+
+    def __init__(self):
+        # action type → bound handler, built once instead of a getattr per step
+        self.handlers = {name[3:]: getattr(self, name) for name in dir(self) if name.startswith("do_")}
+
+    def step(self, state, action):
+        if isinstance(action, str):
+            action = {"type": action}
+        kind = action.get("type")
+        events = []
+
+        if state.fight is not None and kind not in FIGHT_ACTIONS:
+            events.append({"type": "invalid_action", "action": kind, "reason": "in_fight"})
+            return events
+        if state.pending_area is not None and kind != "advance":
+            events.append({"type": "invalid_action", "action": kind, "reason": "pending_area"})
+            return events
+
+        handler = self.handlers.get(kind) if isinstance(kind, str) else None
+        if handler is None:
+            events.append({"type": "invalid_action", "action": kind, "reason": "unknown"})
+            return events
+        handler(state, action, events)
+        return events
+
+    # ---- Main menu ----
+    def do_explore(self, state, action, events):
+        """Explore the current area: fights, finds, traps, and discovering new areas."""
+        rng = state.rng
+        area_name = state.area_name()
+        events.append({"type": "explore", "area": area_name})
+
+        if area_name == "City":
+            start_boss_fight(state, events)
+            return
+
+        encounters = encounter_sampler(area_name)
+
+        # 80% chance to encounter a random-area animal
+        if encounters and rng.random() < 0.80:
+            enemy = encounters.sample(rng)
+            events.append({"type": "encounter", "enemy": enemy["name"]})
+            start_fight(state, enemy, events, after="explore")
+            return
+
+        # No animal: 25% chance to find a weapon, otherwise gather resources
+        if rng.random() < 0.25:
+            maybe_find_weapon(state, events)
+        else:
+            gather_resource(state, events)
+        explore_tail(state, events)
+
+    def do_search(self, state, action, events):
+        """50% strong animal (no XP, no running), 30% resource, 20% nothing. City: always boss."""
+        area_name = state.area_name()
+        events.append({"type": "search", "area": area_name})
+
+        if area_name == "City":
+            start_boss_fight(state, events)
+            return
+
+        roll = state.rng.random()
+        if roll < 0.50:
+            events.append({"type": "search_result", "result": "animal"})
+            start_fight(state, dict(STRONG_ANIMALS[area_name]), events, allow_run=False)
+        elif roll < 0.80:
+            events.append({"type": "search_result", "result": "resource"})
+            gather_resource(state, events)
+        else:
+            events.append({"type": "search_result", "result": "nothing"})
+
+    def do_advance(self, state, action, events):
+        """Answer the 'continue into this area?' prompt from explore."""
+        if state.pending_area is None:
+            events.append({"type": "invalid_action", "action": "advance", "reason": "no_path"})
+            return
+        if action.get("accept"):
+            state.current_area_index = state.pending_area
+            events.append({"type": "area_entered", "area": state.area_name()})
+        else:
+            events.append({"type": "area_declined"})
+        state.pending_area = None
+        explore_regen(state, events)
+
+    def do_equip(self, state, action, events):
+        name = action.get("weapon")
+        if name not in state.weapons_inventory:
+            events.append({"type": "invalid_choice"})
+        elif name == state.current_weapon:
+            events.append({"type": "already_equipped", "weapon": name})
+        else:
+            state.current_weapon = name
+            events.append({"type": "equipped", "weapon": name})
+
+    def do_use_item(self, state, action, events):
+        """Use a healing/buff item. Inside the boss fight, this spends the turn."""
+        item_name = action.get("item")
+        if item_name is not None:
+            self.apply_item(state, item_name, events)
+        if state.fight is not None and state.fight["boss"]:
+            boss_turn_start(state, events)
+
+    def apply_item(self, state, item_name, events):
+        if state.bag.get(item_name, 0) <= 0:
+            events.append({"type": "invalid_choice"})
+            return
+        if item_name in ITEM_HEAL:
+            healed = min(state.max_hp - state.hp, ITEM_HEAL[item_name])
+            state.hp += healed
+            events.append({"type": "healed", "item": item_name, "amount": healed})
+        elif item_name == "Adrenaline Shot":
+            state.adrenaline_active = True
+            events.append({"type": "adrenaline"})
+        else:
+            events.append({"type": "cannot_use", "item": item_name})
+            return
+
+        state.bag[item_name] -= 1
+        if state.bag[item_name] <= 0:
+            del state.bag[item_name]
+
+    def do_upgrade(self, state, action, events):
+        path = action.get("path")
+        choices = {p: tier for p, tier, _ in state.upgrade_choices()}
+        if state.xp < state.upgrade_amt or path not in choices:
+            events.append({"type": "invalid_choice"})
+            return
+        tier = choices[path]
+
+        if path == "Strength":
+            state.strength_level = tier
+            state.att += 2
+            state.crit_chance = STRENGTH_CRIT[tier]
+        elif path == "Endurance":
+            state.endurance_level = tier
+            state.max_hp += ENDURANCE_HP[tier]
+            if tier == 3:
+                state.bag["Medkit"] = state.bag.get("Medkit", 0) + 2
+            state.hp = state.max_hp
+        elif path == "Survival":
+            state.survival_level = tier
+
+        state.lv += 1
+        state.xp = 0
+        state.upgrade_amt = int(state.upgrade_amt * 1.3)
+        events.append({"type": "upgraded", "path": path, "level": tier})
+
+    # ---- Crafting & Buildings ----
+    def do_craft(self, state, action, events):
+        recipe = action.get("recipe")
+        if recipe == "Trap":
+            self.craft_trap_normal(state, events)
+        elif recipe == "Advanced Trap":
+            if state.buildings.get("Workbench", 0) > 0:
+                self.craft_trap_advanced(state, events)
+            else:
+                events.append({"type": "invalid_choice"})
+        elif recipe == "Campfire":
+            self.craft_campfire(state, events)
+        elif recipe == "Workbench":
+            self.craft_workbench(state, events)
+        else:
+            for kind, rec in state.gear_recipes():
+                if rec["name"] == recipe:
+                    self.craft_gear(state, kind, rec, events)
+                    return
+            events.append({"type": "invalid_choice"})
+
+    def craft_gear(self, state, kind, rec, events):
+        if not state.have_in_bag(rec["cost"]):
+            events.append(missing_materials(state, rec["cost"]))
+            return
+
+        state.remove_from_bag(rec["cost"])
+
+        if kind == "weapon":
+            if rec["name"] in state.weapons_inventory:
+                events.append({"type": "already_owned", "weapon": rec["name"]})
+                return
+            state.weapons_inventory[rec["name"]] = {"name": rec["name"], "bonus": rec["bonus"]}
+            events.append({"type": "crafted", "recipe": rec["name"], "kind": "weapon"})
+        else:
+            state.max_hp += rec["hp_bonus"]
+            state.hp = state.max_hp
+            events.append({"type": "crafted", "recipe": rec["name"], "kind": "armor",
+                           "hp_bonus": rec["hp_bonus"]})
+
+    def craft_trap_normal(self, state, events):
+        if state.is_trap_cap_reached():
+            events.append({"type": "trap_limit"})
+            return
+        if not state.have_in_bag(TRAP_COST):
+            events.append(missing_materials(state, TRAP_COST))
+            return
+        state.remove_from_bag(TRAP_COST)
+        state.buildings["Trap"] = state.buildings.get("Trap", 0) + 1
+        events.append({"type": "crafted", "recipe": "Trap", "kind": "trap"})
+
+    def craft_trap_advanced(self, state, events):
+        """Advanced Trap: if cap is full and a normal trap exists, replace one normal."""
+        if not state.have_in_bag(ADV_TRAP_COST):
+            events.append(missing_materials(state, ADV_TRAP_COST))
+            return
+
+        if not state.is_trap_cap_reached():
+            state.remove_from_bag(ADV_TRAP_COST)
+            state.buildings["Advanced Trap"] = state.buildings.get("Advanced Trap", 0) + 1
+            events.append({"type": "crafted", "recipe": "Advanced Trap", "kind": "trap", "replaced": False})
+            return
+
+        if state.buildings.get("Trap", 0) > 0:
+            state.remove_from_bag(ADV_TRAP_COST)
+            state.buildings["Trap"] -= 1
+            if state.buildings["Trap"] <= 0:
+                del state.buildings["Trap"]
+            state.buildings["Advanced Trap"] = state.buildings.get("Advanced Trap", 0) + 1
+            events.append({"type": "crafted", "recipe": "Advanced Trap", "kind": "trap", "replaced": True})
+        else:
+            events.append({"type": "trap_limit", "all_advanced": True})
+
+    def craft_campfire(self, state, events):
+        if not state.have_in_bag(CAMPFIRE_COST):
+            events.append(missing_materials(state, CAMPFIRE_COST))
+            return
+        state.remove_from_bag(CAMPFIRE_COST)
+        state.buildings["Campfire"] = state.buildings.get("Campfire", 0) + 1
+        events.append({"type": "crafted", "recipe": "Campfire", "kind": "building"})
+
+    def craft_workbench(self, state, events):
+        if state.buildings.get("Workbench", 0) > 0:
+            events.append({"type": "already_built", "building": "Workbench"})
+            return
+        if not state.have_in_bag(WORKBENCH_COST):
+            events.append(missing_materials(state, WORKBENCH_COST))
+            return
+        state.remove_from_bag(WORKBENCH_COST)
+        state.buildings["Workbench"] = 1
+        events.append({"type": "crafted", "recipe": "Workbench", "kind": "building"})
+
+    def do_cook(self, state, action, events):
+        """Campfire: 5 Meat → 1 Food."""
+        if state.buildings.get("Campfire", 0) <= 0:
+            events.append({"type": "no_building", "building": "Campfire"})
+            return
+        if state.bag.get("Meat", 0) < 5:
+            events.append({"type": "cook_failed", "need": 5})
+            return
+        state.bag["Meat"] -= 5
+        if state.bag["Meat"] == 0:
+            del state.bag["Meat"]
+        state.add_to_bag("Food", 1)
+        events.append({"type": "cooked", "item": "Food"})
+
+    def do_check_traps(self, state, action, events):
+        if state.buildings.get("Trap", 0) == 0 and state.buildings.get("Advanced Trap", 0) == 0:
+            events.append({"type": "no_building", "building": "Trap"})
+            return
+        events.append({"type": "check_traps"})
+        roll_traps(state, events, passive=False)
+
+    # ---- Fight actions ----
+    def do_attack(self, state, action, events):
+        self.fight_turn(state, "attack", events)
+
+    def do_wait(self, state, action, events):
+        self.fight_turn(state, "wait", events)
+
+    def do_run(self, state, action, events):
+        fight = state.fight
+        if fight is None or fight["boss"]:
+            events.append({"type": "invalid_action", "action": "run", "reason": "no_fight"
+                           if fight is None else "no_escape"})
+            return
+        if not fight["allow_run"]:
+            events.append({"type": "cannot_run"})
+            return
+        events.append({"type": "ran_away", "enemy": fight["enemy"]["name"]})
+        end_fight(state, events)
+
+    def fight_turn(self, state, move, events):
+        fight = state.fight
+        if fight is None:
+            events.append({"type": "invalid_action", "action": move, "reason": "no_fight"})
+            return
+
+        if move == "attack":
+            player_strike(state, events)
+        else:
+            events.append({"type": "hesitate", "boss": fight["boss"]})
+
+        enemy_name = fight["enemy"]["name"]
+        if fight["boss"]:
+            if fight["enemy_hp"] <= 0:
+                state.fight = None
+                events.append({"type": "boss_defeated", "enemy": enemy_name})
+                return
+            boss_strike(state, events)
+            if state.hp <= 0:
+                die(state, enemy_name, events)
+                return
+            boss_turn_start(state, events)
+            return
+
+        if fight["enemy_hp"] > 0:
+            enemy_strike(state, events)
+
+        if state.hp <= 0:
+            die(state, enemy_name, events)
+        elif fight["enemy_hp"] <= 0:
+            reward = fight["enemy"].get("xp_reward", 0)
+            if reward > 0:
+                state.xp += reward
+            events.append({"type": "victory", "enemy": enemy_name, "xp": reward})
+            end_fight(state, events)
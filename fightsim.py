@@ -0,0 +1,238 @@
+# ============================
+# FIGHTSIM.PY - Batched fight-outcome tables for balance work
+# Resolves every (enemy × weapon × level × Strength tier × adrenaline)
+# matchup thousands of times at once with NumPy arrays.
+#
+# Usage:  python fightsim.py [--fights 2000] [--seed 1] [--out cache/fight_table.npz] [--force]
+# Needs numpy (pip install -r requirements-dev.txt); the game itself does not.
+# ============================
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+try:
+    import numpy as np
+except ImportError:  # the game runs without it; only this tool needs it
+    np = None
+
+from animals import camp_animals, forest_animals, highlands_animals, jungle_animals
+from engine import (
+    BOW_ENEMY_ATK_REDUCTION,
+    CRAFT_WEAPONS_ADV,
+    CRAFT_WEAPONS_BASIC,
+    ENDURANCE_HP,
+    FINDABLE_WEAPONS,
+    FLYING_ENEMIES,
+    STRENGTH_CRIT,
+)
+
+DEFAULT_TABLE = os.path.join("cache", "fight_table.npz")
+MAX_LEVEL = 10          # 1 + 3 tiers in each of the three upgrade paths
+BASE_ATT = 6
+BASE_HP = 60
+HP_LOSS_QUANTILES = (5, 25, 50, 75, 95)
+
+AREA_POOLS = [
+    ("Camp", camp_animals),
+    ("Forest", forest_animals),
+    ("Highlands", highlands_animals),
+    ("Jungle", jungle_animals),
+]
+
+
+# ===============================================
+#                  Matchup Grid
+# ===============================================
+def all_enemies():
+    """[(area, enemy), ...] for every regular enemy. Same name in two areas = two entries."""
+    return [(area, enemy) for area, pool in AREA_POOLS for enemy in pool]
+
+def all_weapons():
+    """[(name, bonus), ...] for Fists plus every craftable and findable weapon."""
+    weapons = [("Fists", 0)]
+    weapons += [(r["name"], r["bonus"]) for r in CRAFT_WEAPONS_BASIC + CRAFT_WEAPONS_ADV]
+    weapons += [(name, data["bonus"]) for name, data in FINDABLE_WEAPONS.items()]
+    return weapons
+
+def player_builds():
+    """
+    [(level, strength_tier, max_hp), ...] for every reachable pairing.
+    Level-ups not spent on Strength go to Endurance first (it is the only
+    path that changes a fight), then Survival.
+    """
+    builds = []
+    for level in range(1, MAX_LEVEL + 1):
+        for strength in range(0, min(3, level - 1) + 1):
+            endurance = min(3, level - 1 - strength)
+            if level - 1 - strength - endurance > 3:
+                continue  # more spare levels than Survival can absorb
+            builds.append((level, strength, BASE_HP + sum(ENDURANCE_HP[1:endurance + 1])))
+    return builds
+
+def grid():
+    """Every player-side configuration: one row per (weapon, build, adrenaline)."""
+    rows = []
+    for weapon, bonus in all_weapons():
+        for level, strength, max_hp in player_builds():
+            for adrenaline in (False, True):
+                attack = BASE_ATT + 2 * strength + bonus + (2 if adrenaline else 0)
+                rows.append({
+                    "weapon": weapon,
+                    "bonus": bonus,
+                    "level": level,
+                    "strength": strength,
+                    "crit_chance": STRENGTH_CRIT[strength],
+                    "adrenaline": adrenaline,
+                    "attack": attack,
+                    "hp": max_hp,
+                })
+    return rows
+
+
+# ===============================================
+#                  Batched Fights
+# ===============================================
+def simulate_enemy(enemy, rows, fights, rng):
+    """
+    Fight `enemy` `fights` times for every row at once (always ATTACK, full HP).
+    Same rolls as fight(): player attack ±2 (min 1), maybe_crit doubling,
+    enemy attack ±1, Bow -1 vs non-flying. Returns (won, turns, hp_lost) arrays
+    shaped (len(rows), fights).
+    """
+    n = len(rows)
+    attack = np.array([r["attack"] for r in rows], dtype=np.int64)[:, None]
+    crit = np.array([r["crit_chance"] for r in rows], dtype=np.int64)[:, None]
+    start_hp = np.array([r["hp"] for r in rows], dtype=np.int64)[:, None]
+    bow = np.array([r["weapon"] == "Bow" and enemy["name"] not in FLYING_ENEMIES for r in rows])[:, None]
+
+    low = np.maximum(1, attack - 2)
+    span = attack + 2 - low + 1
+
+    hp = np.repeat(start_hp, fights, axis=1)
+    enemy_hp = np.full((n, fights), enemy["hp"], dtype=np.int64)
+    turns = np.zeros((n, fights), dtype=np.int64)
+    active = np.ones((n, fights), dtype=bool)
+
+    while active.any():
+        # Player swing
+        base = low + (rng.random((n, fights)) * span).astype(np.int64)
+        is_crit = (crit > 0) & (rng.integers(1, 101, size=(n, fights)) <= crit)
+        dmg = np.where(is_crit, base * 2, base)
+        enemy_hp = np.where(active, enemy_hp - dmg, enemy_hp)
+        turns += active
+
+        # Enemy swing (only if it survived)
+        swinging = active & (enemy_hp > 0)
+        enemy_dmg = rng.integers(enemy["attack"] - 1, enemy["attack"] + 2, size=(n, fights))
+        enemy_dmg = np.where(bow, np.maximum(0, enemy_dmg - BOW_ENEMY_ATK_REDUCTION), enemy_dmg)
+        hp = np.where(swinging, hp - enemy_dmg, hp)
+
+        active &= (enemy_hp > 0) & (hp > 0)
+
+    won = hp > 0
+    hp_lost = start_hp - np.maximum(hp, 0)
+    return won, turns, hp_lost
+
+def build_table(fights=2000, seed=1):
+    """Run every matchup and reduce to one summary row per (enemy, player config)."""
+    rng = np.random.default_rng(seed)
+    rows = grid()
+    columns = {key: [] for key in (
+        "area", "enemy", "weapon", "level", "strength", "crit_chance", "adrenaline",
+        "attack", "hp", "win_prob", "mean_turns", "mean_hp_lost",
+    )}
+    quantile_rows = []
+
+    for area, enemy in all_enemies():
+        won, turns, hp_lost = simulate_enemy(enemy, rows, fights, rng)
+        win_prob = won.mean(axis=1)
+        mean_turns = turns.mean(axis=1)
+        mean_hp_lost = hp_lost.mean(axis=1)
+        quantile_rows.append(np.percentile(hp_lost, HP_LOSS_QUANTILES, axis=1).T)
+
+        for i, row in enumerate(rows):
+            columns["area"].append(area)
+            columns["enemy"].append(enemy["name"])
+            for key in ("weapon", "level", "strength", "crit_chance", "adrenaline", "attack", "hp"):
+                columns[key].append(row[key])
+            columns["win_prob"].append(win_prob[i])
+            columns["mean_turns"].append(mean_turns[i])
+            columns["mean_hp_lost"].append(mean_hp_lost[i])
+
+    table = {key: np.array(values) for key, values in columns.items()}
+    table["hp_lost_quantiles"] = np.vstack(quantile_rows)
+    return table
+
+
+# ===============================================
+#                  Cached Table File
+# ===============================================
+def rules_fingerprint(fights, seed):
+    """Changes whenever an enemy, weapon or upgrade number does (or the run settings)."""
+    payload = json.dumps({
+        "enemies": all_enemies(),
+        "weapons": all_weapons(),
+        "builds": player_builds(),
+        "crit": STRENGTH_CRIT,
+        "flying": sorted(FLYING_ENEMIES),
+        "bow": BOW_ENEMY_ATK_REDUCTION,
+        "fights": fights,
+        "seed": seed,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def load_table(path=DEFAULT_TABLE):
+    with np.load(path, allow_pickle=False) as data:
+        return {key: data[key] for key in data.files}
+
+def get_table(fights=2000, seed=1, path=DEFAULT_TABLE, force=False):
+    """Return the table, reusing the file at `path` if it was built from the same rules."""
+    fingerprint = rules_fingerprint(fights, seed)
+    if not force and os.path.exists(path):
+        table = load_table(path)
+        if str(table.get("fingerprint")) == fingerprint:
+            return table
+
+    table = build_table(fights, seed)
+    table["fingerprint"] = np.array(fingerprint)
+    table["quantiles"] = np.array(HP_LOSS_QUANTILES)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp.npz"
+    np.savez_compressed(tmp, **table)
+    os.replace(tmp, path)
+    return table
+
+def print_summary(table):
+    """Per enemy: win chance for a fresh character (Fists, level 1) and the best build."""
+    print(f"{'Area':<10} {'Enemy':<16} {'L1 Fists':>9} {'Best':>6}  Mean turns (L1)")
+    keys = list(dict.fromkeys(zip(table["area"], table["enemy"])))
+    for area, enemy in keys:
+        mask = (table["area"] == area) & (table["enemy"] == enemy)
+        fresh = mask & (table["weapon"] == "Fists") & (table["level"] == 1) & ~table["adrenaline"]
+        print(f"{area:<10} {enemy:<16} {table['win_prob'][fresh][0]:>8.1%} "
+              f"{table['win_prob'][mask].max():>6.1%}  {table['mean_turns'][fresh][0]:.1f}")
+
+
+# ===============================================
+# Entry
+# ===============================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the fight-outcome table for every regular enemy.")
+    parser.add_argument("--fights", type=int, default=2000, help="fights per matchup (default 2000)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default=DEFAULT_TABLE, help=f"table file (default {DEFAULT_TABLE})")
+    parser.add_argument("--force", action="store_true", help="rebuild even if the cached table matches")
+    args = parser.parse_args(argv)
+
+    if np is None:
+        sys.exit("fightsim needs numpy: pip install numpy")
+
+    table = get_table(args.fights, args.seed, args.out, args.force)
+    print(f"{len(table['win_prob'])} matchups × {args.fights} fights → {args.out}\n")
+    print_summary(table)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+# ============================
+# HISTORY.PY - Save history
+# Every manual save (and whatever it overwrites) is kept as a version.
+# A version is a small root object holding the scalar fields plus the
+# hashes of its sub-objects (weapons_inventory, bag, buildings); every
+# object is stored once, zlib-compressed, under its content hash. A save
+# that only changed the bag costs a new bag and a new root - an untouched
+# inventory or set of buildings is shared with every earlier version.
+#
+# Layout:  saves/.history/objects/<2 hex>/<rest of hash>
+#          saves/.history/<slot>.log   (one JSON line per version)
+#          saves/.history/lock         (flock held by record/prune/GC)
+#
+# Usage:  python history.py [--dir saves] list [slot]
+#         python history.py restore <slot> <version> [--as other_slot]
+#         python history.py prune [slot] --keep 20
+#         python history.py stats
+# ============================
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import zlib
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:                 # Windows: no advisory locks (one process per save dir)
+    fcntl = None
+
+from storage import SlotStore, atomic_write, slot_summary
+
+HISTORY_DIR = ".history"
+LOG_EXT = ".log"
+LOCK_NAME = "lock"
+
+
+def _plain(value):
+    # 110.0 (read back from a .sav) and 110 (live state) are the same save
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    return value
+
+def canonical(value):
+    """Stable bytes for hashing: equal values always serialize the same way."""
+    return json.dumps(_plain(value), sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+class SaveHistory:
+    """
+    Versions per slot in `save_dir`/.history. record() adds a version (or
+    nothing, if it equals the newest one); get() rebuilds one; prune() drops
+    old versions and collect_garbage() the objects only they used. record()
+    writes its objects before the log line that refers to them, so all three
+    hold an exclusive flock on .history/lock: a collection running between
+    the two writes would delete a new version's objects.
+    """
+
+    def __init__(self, save_dir):
+        self.root = os.path.join(save_dir, HISTORY_DIR)
+        self.objects_dir = os.path.join(self.root, "objects")
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive lock on the whole history, across threads and processes."""
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(self.root, exist_ok=True)
+        fd = os.open(os.path.join(self.root, LOCK_NAME), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)   # releases the flock
+
+    # ---- Objects ----
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+
+    def put(self, value):
+        """Store `value` once; returns its hash."""
+        data = canonical(value)
+        digest = hashlib.sha256(data).hexdigest()[:32]
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            atomic_write(path, zlib.compress(data, 9))
+        return digest
+
+    def fetch(self, digest):
+        with open(self._object_path(digest), "rb") as f:
+            return json.loads(zlib.decompress(f.read()))
+
+    # ---- Versions ----
+    def log_path(self, slot):
+        return os.path.join(self.root, slot + LOG_EXT)
+
+    def slots(self):
+        """Slots with any history (including deleted ones)."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(fn[:-len(LOG_EXT)] for fn in os.listdir(self.root) if fn.endswith(LOG_EXT))
+
+    def versions(self, slot):
+        """[{"n", "time", "root", "label", "level", "area", "weapon"}, ...] oldest first."""
+        try:
+            with open(self.log_path(slot), "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return []
+        versions = []
+        for line in lines:
+            try:
+                versions.append(json.loads(line))
+            except ValueError:
+                break   # torn final line from a crash
+        return versions
+
+    def record(self, slot, snapshot, label="save"):
+        """Add `snapshot` as the slot's newest version. Returns its number, or None if unchanged."""
+        with self._locked():
+            return self._record(slot, snapshot, label)
+
+    def _record(self, slot, snapshot, label):
+        parts = {key: self.put(value) for key, value in snapshot.items() if isinstance(value, dict)}
+        scalars = {key: value for key, value in snapshot.items() if not isinstance(value, dict)}
+        root = self.put({"scalars": scalars, "parts": parts})
+        versions = self.versions(slot)
+        if versions and versions[-1]["root"] == root:
+            return None
+        n = versions[-1]["n"] + 1 if versions else 1
+        entry = {"n": n, "time": time.time(), "root": root, "label": label, **slot_summary(snapshot)}
+        os.makedirs(self.root, exist_ok=True)
+        with open(self.log_path(slot), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        return n
+
+    def get(self, slot, n):
+        """Snapshot of version n of `slot`."""
+        for entry in self.versions(slot):
+            if entry["n"] == n:
+                root = self.fetch(entry["root"])
+                snapshot = dict(root["scalars"])
+                for key, digest in root["parts"].items():
+                    snapshot[key] = self.fetch(digest)
+                return snapshot
+        raise KeyError(f"'{slot}' has no version {n}")
+
+    # ---- Pruning ----
+    def prune(self, slot, keep):
+        """Keep only the newest `keep` versions of `slot`. Returns how many were dropped."""
+        if keep < 0:
+            raise ValueError(f"keep must be 0 or more, not {keep}")
+        with self._locked():
+            return self._prune(slot, keep)
+
+    def _prune(self, slot, keep):
+        versions = self.versions(slot)
+        if len(versions) <= keep:
+            return 0
+        kept = versions[-keep:] if keep else []
+        if kept:
+            atomic_write(self.log_path(slot),
+                         "".join(json.dumps(e, separators=(",", ":")) + "\n" for e in kept).encode("utf-8"))
+        else:
+            os.remove(self.log_path(slot))
+        return len(versions) - len(kept)
+
+    def collect_garbage(self):
+        """Delete objects no version refers to. Returns (objects removed, bytes freed)."""
+        with self._locked():
+            return self._collect_garbage()
+
+    def _collect_garbage(self):
+        live = set()
+        for slot in self.slots():
+            for entry in self.versions(slot):
+                if entry["root"] not in live:
+                    live.add(entry["root"])
+                    live.update(self.fetch(entry["root"])["parts"].values())
+        removed = freed = 0
+        for digest, path, size in self._objects():
+            if digest not in live:
+                os.remove(path)
+                removed += 1
+                freed += size
+        return removed, freed
+
+    def _objects(self):
+        if not os.path.isdir(self.objects_dir):
+            return
+        for prefix in os.listdir(self.objects_dir):
+            folder = os.path.join(self.objects_dir, prefix)
+            for rest in os.listdir(folder):
+                if rest.endswith(".tmp"):
+                    continue
+                path = os.path.join(folder, rest)
+                yield prefix + rest, path, os.path.getsize(path)
+
+    def stats(self):
+        """{"slots", "versions", "objects", "bytes"} on disk."""
+        objects = list(self._objects())
+        return {
+            "slots": len(self.slots()),
+            "versions": sum(len(self.versions(s)) for s in self.slots()),
+            "objects": len(objects),
+            "bytes": sum(size for _, _, size in objects),
+        }
+
+
+# ===============================================
+# Entry
+# ===============================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List, restore and prune saved versions of each slot.")
+    parser.add_argument("--dir", default="saves", help="save directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("list", help="versions of one slot, or every slot with history")
+    p.add_argument("slot", nargs="?")
+    p = sub.add_parser("restore", help="write a version back into a slot")
+    p.add_argument("slot")
+    p.add_argument("version", type=int)
+    p.add_argument("--as", dest="target", help="restore into this slot instead")
+    p = sub.add_parser("prune", help="drop all but the newest versions")
+    p.add_argument("slot", nargs="?", help="default: every slot")
+    p.add_argument("--keep", type=int, required=True, help="0 drops the slot's whole history")
+    sub.add_parser("stats", help="disk usage of the history")
+    args = parser.parse_args(argv)
+    if args.command == "prune" and args.keep < 0:
+        parser.error("--keep must be 0 or more")
+    history = SaveHistory(args.dir)
+
+    if args.command == "list":
+        if args.slot is None:
+            for slot in history.slots():
+                versions = history.versions(slot)
+                print(f"{slot:<20} {len(versions):>4} versions, newest v{versions[-1]['n']}" if versions else slot)
+            return
+        versions = history.versions(args.slot)
+        if not versions:
+            sys.exit(f"No history for '{args.slot}'")
+        for e in versions:
+            when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(e["time"]))
+            print(f"v{e['n']:<4} {when}  Lv {e['level']}, {e['area']}, {e['weapon']}  [{e['label']}]")
+    elif args.command == "restore":
+        try:
+            snapshot = history.get(args.slot, args.version)
+        except KeyError as e:
+            sys.exit(str(e.args[0]))
+        target = args.target or args.slot
+        store = SlotStore(args.dir)
+        if store.exists(target):
+            history.record(target, store.load(target), "before restore")   # so the restore can be undone
+        store.save(target, snapshot)
+        history.record(target, snapshot, f"restored v{args.version}" +
+                       (f" of {args.slot}" if target != args.slot else ""))
+        print(f"✅ Restored '{args.slot}' v{args.version} into '{target}'.")
+    elif args.command == "prune":
+        dropped = sum(history.prune(slot, args.keep) for slot in ([args.slot] if args.slot else history.slots()))
+        removed, freed = history.collect_garbage()
+        print(f"Dropped {dropped} versions; removed {removed} unused objects ({freed:,} bytes).")
+    else:
+        s = history.stats()
+        print(f"{s['slots']} slots, {s['versions']} versions in {s['objects']} objects ({s['bytes']:,} bytes)")
+
+if __name__ == "__main__":
+    main()
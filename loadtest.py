@@ -0,0 +1,537 @@
+# ============================
+# LOADTEST.PY - Load test the hosted game
+# Starts a local api.py (or, with --workers > 1, prefork.py) instance and
+# plays thousands of scripted virtual players against it over keep-alive
+# HTTP. Players follow action mixes taken from the main() menu:
+#   explorer - mostly [3] Explore and [4] Search, now and then a status screen
+#   crafter  - [5] Craft and [6] Buildings (cook, traps) between gathering runs
+#   boss     - gears up, levels, pushes into new areas and attempts the Titan
+#              (it takes a few hundred actions to get there: raise --actions)
+# Every player answers fights, path questions and level-ups the way a real
+# one must. Reported: throughput, p50/p95/p99 latency per action, server
+# memory per session (PSS, so pages shared by forked workers count once)
+# and error rates. Each run is written as JSON for comparison over time.
+#
+# Usage:  python loadtest.py [--players 2000] [--actions 50] [--mix explorer=60,crafter=25,boss=15]
+#                            [--workers 1] [--client-procs N] [--think 0] [--url host:port]
+#                            [--out loadtests] [--compare loadtests/<earlier run>.json]
+# ============================
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from map import areas
+from engine import (
+    ADV_TRAP_COST,
+    CAMPFIRE_COST,
+    CRAFT_ARMOR_ADV,
+    CRAFT_WEAPONS_ADV,
+    CRAFT_WEAPONS_BASIC,
+    FINDABLE_WEAPONS,
+    ITEM_HEAL,
+    MAX_TRAPS_TOTAL,
+    TRAP_COST,
+    WORKBENCH_COST,
+)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+OUT_DIR = "loadtests"
+DEFAULT_MIX = "explorer=60,crafter=25,boss=15"
+REQUEST_TIMEOUT = 30.0          # seconds before a request counts as a timeout error
+CONNECTS_AT_ONCE = 200          # per client process, so the listen backlog never overflows
+SERVER_START_TIMEOUT = 15.0
+MEMORY_SAMPLE_EVERY = 0.25
+
+AREA_NAMES = [a["name"] for a in areas]
+MIN_LEVEL_FOR_AREA = {"Forest": 2, "Highlands": 4, "Jungle": 6, "City": 8}   # as sweep.py's player
+WEAPON_BONUS = {"Fists": 0, **{r["name"]: r["bonus"] for r in CRAFT_WEAPONS_BASIC + CRAFT_WEAPONS_ADV},
+                **{name: w["bonus"] for name, w in FINDABLE_WEAPONS.items()}}
+BUILDING_COSTS = {"Workbench": WORKBENCH_COST, "Campfire": CAMPFIRE_COST, "Trap": TRAP_COST,
+                  "Advanced Trap": ADV_TRAP_COST}
+# Events meaning the engine answered but refused the action
+REFUSED_EVENTS = {"invalid_action", "invalid_choice", "cannot_use", "missing_materials", "no_building",
+                  "already_built", "already_owned", "already_equipped", "trap_limit", "cook_failed",
+                  "cannot_run"}
+
+# What a player does when the game isn't asking anything (weights per main() menu choice)
+PROFILES = {
+    "explorer": {"explore": 55, "search": 25, "view": 15, "check_traps": 5},
+    "crafter": {"explore": 35, "search": 10, "craft": 30, "cook": 10, "check_traps": 5, "view": 10},
+    "boss": {"explore": 85, "craft": 15},
+}
+
+
+# ===============================================
+#               Virtual Players
+# ===============================================
+def have(bag, cost):
+    return all(bag.get(k, 0) >= v for k, v in cost.items())
+
+class VirtualPlayer:
+    """Picks the next request from the last state summary the API returned."""
+
+    def __init__(self, profile, seed):
+        self.profile = profile
+        self.seed = seed
+        self.rng = random.Random(seed)
+        choices = PROFILES[profile]
+        self.menu = list(choices)
+        self.weights = list(choices.values())
+        self.upgrades = 0
+
+    def next_action(self, s):
+        """(label, action dict), or ("view", None) for a status screen (a GET)."""
+        fight = s["fight"]
+        heals = [item for item in s["usable_items"] if item in ITEM_HEAL]
+        heal = max(heals, key=ITEM_HEAL.get) if heals else None
+        if fight is not None:
+            if heal and s["hp"] < s["max_hp"] * (0.45 if fight["boss"] else 0.35):
+                return "use_item", {"type": "use_item", "item": heal}
+            if fight["allow_run"] and s["hp"] < s["max_hp"] * 0.25:
+                return "run", {"type": "run"}
+            return "attack", {"type": "attack"}
+        if s["pending_area"]:
+            if self.profile == "boss":
+                nxt = AREA_NAMES[min(AREA_NAMES.index(s["area"]) + 1, len(AREA_NAMES) - 1)]
+                accept = s["level"] >= MIN_LEVEL_FOR_AREA.get(nxt, 1)
+            else:
+                accept = self.rng.random() < 0.3   # the casual player mostly stays put
+            return "advance", {"type": "advance", "accept": accept}
+        if s["level_up"]:
+            # Round-robin over the offered paths, like levelling evenly
+            path = s["level_up"][self.upgrades % len(s["level_up"])]["path"]
+            self.upgrades += 1
+            return "upgrade", {"type": "upgrade", "path": path}
+        if heal and s["hp"] < s["max_hp"] * 0.6:
+            return "use_item", {"type": "use_item", "item": heal}
+        best = max(s["weapons"], key=lambda w: WEAPON_BONUS.get(w, 0))
+        if WEAPON_BONUS.get(best, 0) > WEAPON_BONUS.get(s["weapon"], 0):
+            return "equip", {"type": "equip", "weapon": best}
+
+        choice = self.rng.choices(self.menu, self.weights)[0]
+        if choice == "view":
+            return "view", None
+        if choice == "craft":
+            recipe = self.pick_recipe(s)
+            if recipe is not None:
+                return "craft", {"type": "craft", "recipe": recipe}
+            choice = "explore"   # nothing worth trying: gather materials instead
+        if choice == "cook" and s["bag"].get("Meat", 0) < 5:
+            choice = "explore"   # nothing to cook: go hunting instead
+        return choice, {"type": choice}
+
+    def pick_recipe(self, s):
+        """Something affordable and useful. Otherwise the boss runner gives up (None) and the
+        crafter tries a random one anyway, like browsing the menu: the game lists what's missing."""
+        bag, buildings = s["bag"], s["buildings"]
+        recipes = CRAFT_WEAPONS_BASIC + (CRAFT_WEAPONS_ADV + CRAFT_ARMOR_ADV if buildings.get("Workbench") else [])
+        for rec in recipes:
+            if rec["name"] not in s["weapons"] and have(bag, rec["cost"]):
+                return rec["name"]
+        traps = buildings.get("Trap", 0) + buildings.get("Advanced Trap", 0)
+        for name, cost in BUILDING_COSTS.items():
+            wanted = traps < MAX_TRAPS_TOTAL if "Trap" in name else not buildings.get(name)
+            if wanted and have(bag, cost) and (name != "Advanced Trap" or buildings.get("Workbench")):
+                return name
+        if self.profile == "boss":
+            return None
+        names = [r["name"] for r in recipes] + [n for n in BUILDING_COSTS
+                                                if n != "Advanced Trap" or buildings.get("Workbench")]
+        return self.rng.choice(names)
+
+
+# ===============================================
+#                 Mergeable Stats
+# ===============================================
+class LoadStats:
+    """Latencies per action plus counters, mergeable across client processes."""
+
+    def __init__(self):
+        self.latencies = {}             # action label → [seconds, ...]
+        self.errors = {}                # "http 500" / "timeout" / "connection" → count
+        self.requests = 0
+        self.rejected = 0               # answered fine, but the engine refused the action
+        self.boss_fights = 0
+        self.boss_wins = 0
+        self.deaths = 0
+        self.first = None               # wall clock of the first / last gameplay request
+        self.last = None
+
+    def add(self, label, seconds):
+        self.requests += 1
+        self.latencies.setdefault(label, []).append(seconds)
+
+    def error(self, kind):
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def events(self, events):
+        for ev in events:
+            kind = ev["type"]
+            if kind in REFUSED_EVENTS:
+                self.rejected += 1
+            elif kind == "fight_start" and ev["boss"]:
+                self.boss_fights += 1
+            elif kind == "boss_defeated":
+                self.boss_wins += 1
+            elif kind == "death":
+                self.deaths += 1
+
+    def merge(self, other):
+        for label, values in other.latencies.items():
+            self.latencies.setdefault(label, []).extend(values)
+        for kind, n in other.errors.items():
+            self.errors[kind] = self.errors.get(kind, 0) + n
+        self.requests += other.requests
+        self.rejected += other.rejected
+        self.boss_fights += other.boss_fights
+        self.boss_wins += other.boss_wins
+        self.deaths += other.deaths
+        if other.first is not None:
+            self.first = other.first if self.first is None else min(self.first, other.first)
+            self.last = other.last if self.last is None else max(self.last, other.last)
+
+def percentiles(values):
+    values = sorted(values)
+    if not values:
+        return {"count": 0}
+    at = lambda q: round(values[min(len(values) - 1, int(len(values) * q))] * 1000, 3)
+    return {"count": len(values), "p50": at(0.50), "p95": at(0.95), "p99": at(0.99),
+            "max": round(values[-1] * 1000, 3), "mean": round(sum(values) / len(values) * 1000, 3)}
+
+
+# ===============================================
+#                 Client Process
+# ===============================================
+class Connection:
+    """One player's keep-alive HTTP/1.1 connection."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def open(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port, limit=1 << 20)
+
+    async def call(self, method, path, body=None):
+        """(status, JSON reply or None)."""
+        if self.writer is None:
+            await self.open()
+        data = b"" if body is None else json.dumps(body).encode("utf-8")
+        self.writer.write(f"{method} {path} HTTP/1.1\r\nHost: loadtest\r\nContent-Length: {len(data)}\r\n\r\n"
+                          .encode("latin-1") + data)
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        status = int(lines[0].split(" ")[1])
+        length = 0
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        payload = await self.reader.readexactly(length) if length else b""
+        return status, json.loads(payload) if payload else None
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+async def timed(stats, conn, label, method, path, body=None):
+    """One request, timed and classified. Returns the reply, or None on any error."""
+    began = time.perf_counter()
+    try:
+        status, reply = await asyncio.wait_for(conn.call(method, path, body), REQUEST_TIMEOUT)
+    except asyncio.TimeoutError:
+        stats.error("timeout")
+        conn.close()   # a late reply would answer the next request
+        return None
+    except (ConnectionError, OSError, asyncio.IncompleteReadError, ValueError):
+        stats.error("connection")
+        conn.close()
+        return None
+    stats.add(label, time.perf_counter() - began)
+    if status >= 400:
+        stats.error(f"http {status}")
+        return None
+    return reply if reply is not None else {}
+
+async def play(stats, host, port, player, actions, think, connects):
+    conn = Connection(host, port)
+    async with connects:
+        reply = await timed(stats, conn, "create", "POST", "/sessions", {"seed": player.seed})
+    if reply is None:
+        return
+    path = f"/sessions/{reply['session']}"
+    state = reply["state"]
+    for _ in range(actions):
+        if think:
+            await asyncio.sleep(player.rng.expovariate(1 / think))
+        label, action = player.next_action(state)
+        now = time.time()
+        stats.first = now if stats.first is None else min(stats.first, now)
+        if action is None:
+            reply = await timed(stats, conn, label, "GET", path)
+        else:
+            reply = await timed(stats, conn, label, "POST", path + "/actions", action)
+        stats.last = time.time()
+        if reply is None:
+            continue   # counted; the next request reconnects if needed
+        if "events" in reply:
+            stats.events(reply["events"])
+        state = reply["state"]
+    await timed(stats, conn, "close", "DELETE", path)
+    conn.close()
+
+def run_players(host, port, players, actions, think):
+    """Client process: play `players` ((profile, seed) pairs) concurrently. Returns LoadStats."""
+    async def run():
+        stats = LoadStats()
+        connects = asyncio.Semaphore(CONNECTS_AT_ONCE)
+        await asyncio.gather(*(play(stats, host, port, VirtualPlayer(profile, seed), actions, think, connects)
+                               for profile, seed in players))
+        return stats
+    return asyncio.run(run())
+
+
+# ===============================================
+#                 Local Server
+# ===============================================
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def launch_server(workers, save_dir):
+    """Start api.py (one process) or prefork.py (workers > 1) on a free port. Returns (process, port)."""
+    port = free_port()
+    if workers > 1:
+        cmd = ["prefork.py", "api", "--workers", str(workers), "--saves", save_dir]
+    else:
+        cmd = ["api.py", "--sessions", os.path.join(save_dir, ".sessions")]
+    proc = subprocess.Popen([sys.executable, *cmd, "--host", "127.0.0.1", "--port", str(port)],
+                            cwd=HERE, stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with status {proc.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return proc, port
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("server did not start listening in time")
+
+def process_tree_memory(pid):
+    """PSS of `pid` and its children in bytes (shared pages split between sharers); None off Linux."""
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            pids += [int(p) for p in f.read().split()]
+    except OSError:
+        return None
+    total = 0
+    for p in pids:
+        for name, key in ((f"/proc/{p}/smaps_rollup", "Pss:"), (f"/proc/{p}/status", "VmRSS:")):
+            try:
+                with open(name) as f:
+                    kb = next((int(line.split()[1]) for line in f if line.startswith(key)), None)
+            except OSError:
+                continue
+            if kb is not None:
+                total += kb * 1024
+                break
+    return total
+
+class MemorySampler(threading.Thread):
+    """Polls the server's memory in the background and keeps the peak."""
+
+    def __init__(self, pid):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.baseline = process_tree_memory(pid)
+        self.peak = self.baseline
+        self.done = threading.Event()
+
+    def run(self):
+        while not self.done.wait(MEMORY_SAMPLE_EVERY):
+            now = process_tree_memory(self.pid)
+            if now is not None and (self.peak is None or now > self.peak):
+                self.peak = now
+
+    def stop(self):
+        self.done.set()
+        self.join()
+
+
+# ===============================================
+#                   Runs
+# ===============================================
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in PROFILES:
+            raise ValueError(f"unknown profile '{name}' (have: {', '.join(PROFILES)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+def assign_profiles(players, mix, seed):
+    """(profile, seed) per player, in the mix's proportions (largest remainder, so counts add up)."""
+    total = sum(mix.values())
+    shares = {name: players * w / total for name, w in mix.items()}
+    counts = {name: int(share) for name, share in shares.items()}
+    for name in sorted(shares, key=lambda n: shares[n] - counts[n], reverse=True)[:players - sum(counts.values())]:
+        counts[name] += 1
+    profiles = [name for name, n in counts.items() for _ in range(n)]
+    random.Random(seed).shuffle(profiles)
+    return [(profile, seed * 1_000_003 + i) for i, profile in enumerate(profiles)], counts
+
+def run_load(players, actions, mix, workers, client_procs, think, seed, url=None):
+    """One load test; returns the results dict."""
+    assignments, counts = assign_profiles(players, mix, seed)
+    root = proc = sampler = None
+    if url:
+        host, _, port = url.rpartition(":")
+        host, port = host or "127.0.0.1", int(port)
+    else:
+        root = tempfile.mkdtemp(prefix="backwoods-loadtest-")
+        proc, port = launch_server(workers, root)
+        host = "127.0.0.1"
+        sampler = MemorySampler(proc.pid)
+        sampler.start()
+    try:
+        chunks = [assignments[i::client_procs] for i in range(client_procs)]
+        began = time.perf_counter()
+        stats = LoadStats()
+        with ProcessPoolExecutor(max_workers=client_procs) as pool:
+            for part in pool.map(run_players, [host] * client_procs, [port] * client_procs, chunks,
+                                 [actions] * client_procs, [think] * client_procs):
+                stats.merge(part)
+        elapsed = time.perf_counter() - began
+    finally:
+        if sampler is not None:
+            sampler.stop()
+        if proc is not None:
+            proc.terminate()
+            proc.wait(10)
+        if root is not None:
+            shutil.rmtree(root, ignore_errors=True)
+
+    gameplay = sum(len(v) for label, v in stats.latencies.items() if label not in ("create", "close"))
+    window = (stats.last - stats.first) if stats.first is not None else 0
+    errors = sum(stats.errors.values())
+    attempted = stats.requests + stats.errors.get("timeout", 0) + stats.errors.get("connection", 0)
+    memory = None
+    if sampler is not None and sampler.baseline is not None:
+        memory = {"baseline_bytes": sampler.baseline, "peak_bytes": sampler.peak,
+                  "per_session_bytes": round((sampler.peak - sampler.baseline) / players) if players else 0}
+    everything = [t for values in stats.latencies.values() for t in values]
+    return {
+        "run": {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "players": players, "actions": actions,
+                "mix": mix, "profiles": counts, "workers": workers, "client_procs": client_procs,
+                "think": think, "seed": seed, "target": url or f"local {'prefork.py' if workers > 1 else 'api.py'}",
+                "cpus": os.cpu_count(), "python": platform.python_version()},
+        "elapsed": round(elapsed, 3),
+        "requests": stats.requests,
+        "throughput": round(gameplay / window, 1) if window > 0 else None,
+        "errors": {"total": errors, "rate": round(errors / attempted, 6) if attempted else 0, **stats.errors},
+        "rejected_actions": stats.rejected,
+        "latency_ms": {"all": percentiles(everything),
+                       **{label: percentiles(values) for label, values in sorted(stats.latencies.items())}},
+        "memory": memory,
+        "game": {"boss_fights": stats.boss_fights, "boss_wins": stats.boss_wins, "deaths": stats.deaths},
+    }
+
+
+# ===============================================
+#                  Reporting
+# ===============================================
+def print_report(r, baseline=None):
+    run = r["run"]
+    mix = ", ".join(f"{name} {n:,}" for name, n in run["profiles"].items())
+    target = run["target"]
+    if run["workers"] > 1 and target.startswith("local"):
+        target += f" with {run['workers']} workers"
+    print(f"\n{run['players']:,} players ({mix}), {run['actions']} actions each, {target}, "
+          f"{run['client_procs']} client processes, {run['cpus']} CPUs")
+    tp = r["throughput"]
+    line = f"  {r['requests']:,} requests in {r['elapsed']:.1f}s: {tp:,.0f} actions/s" if tp else \
+           f"  {r['requests']:,} requests in {r['elapsed']:.1f}s"
+    if baseline and baseline.get("throughput") and tp:
+        line += f" ({(tp / baseline['throughput'] - 1) * 100:+.1f}% vs {baseline['run']['time']})"
+    print(line)
+    e = r["errors"]
+    detail = ", ".join(f"{k} {v:,}" for k, v in e.items() if k not in ("total", "rate"))
+    print(f"  errors {e['total']:,} ({e['rate'] * 100:.2f}%){f': {detail}' if detail else ''}; "
+          f"actions the game refused {r['rejected_actions']:,}")
+
+    print(f"\n  {'action':<12} {'count':>8} {'p50':>8} {'p95':>8} {'p99':>8}   ms")
+    old = (baseline or {}).get("latency_ms", {})
+    for label, p in r["latency_ms"].items():
+        if not p["count"]:
+            continue
+        row = f"  {label:<12} {p['count']:>8,} {p['p50']:>8.2f} {p['p95']:>8.2f} {p['p99']:>8.2f}"
+        if label in old and old[label].get("p99"):
+            row += f"   p99 {(p['p99'] / old[label]['p99'] - 1) * 100:+.0f}%"
+        print(row)
+
+    m = r["memory"]
+    if m:
+        print(f"\n  server memory {m['baseline_bytes'] / 1024**2:.1f} MB → peak {m['peak_bytes'] / 1024**2:.1f} MB, "
+              f"~{m['per_session_bytes'] / 1024:.1f} KB per session")
+    g = r["game"]
+    print(f"  boss fights {g['boss_fights']:,} (won {g['boss_wins']:,}), deaths {g['deaths']:,}")
+
+
+# ===============================================
+# Entry
+# ===============================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play many scripted players against a local Backwoods API.")
+    parser.add_argument("--players", type=int, default=2000)
+    parser.add_argument("--actions", type=int, default=50, help="per player")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"profile weights (profiles: {', '.join(PROFILES)})")
+    parser.add_argument("--workers", type=int, default=1, help="server processes (>1 runs prefork.py)")
+    parser.add_argument("--client-procs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--think", type=float, default=0.0, help="mean seconds between a player's actions")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--url", help="host:port of a running api.py / prefork.py instead of a local one")
+    parser.add_argument("--out", default=OUT_DIR, help="directory for the JSON results ('' to skip)")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = run_load(args.players, args.actions, mix, args.workers, max(1, args.client_procs),
+                       args.think, args.seed, args.url)
+    print_report(results, baseline)
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+        path = os.path.join(args.out, time.strftime("%Y%m%d-%H%M%S") + ".json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+# ============================
+# MIGRATE.PY - Bulk save conversion
+# Streams every slot of a save dir (or SQLite database) through a process
+# pool: load + migrate to the current format, check it the way
+# apply_state() will read it, then write it out as JSON, binary .sav or
+# SQLite rows. File outputs are written atomically, so an interrupted run
+# can be resumed with --resume and only redoes unfinished slots; the
+# .tmp<pid> files a killed run leaves in DST are swept on the next start.
+#
+# Usage:  python migrate.py SRC DST --to {json,binary,sqlite}
+#                           [--workers N] [--resume] [--report failures.json]
+#   SRC / DST: a save directory, or a .db file for SQLite
+# ============================
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import GameState
+from map import areas
+from saveformat import decode, encode, export_json
+from sqlstore import SQLiteSlotStore
+from storage import (
+    JOURNAL_EXT,
+    LEGACY_EXT,
+    SNAPSHOT_EXT,
+    atomic_write,
+    read_slot,
+    slot_name,
+)
+
+CHUNK = 200                     # slots per task
+OUTPUT_EXT = {"json": LEGACY_EXT, "binary": SNAPSHOT_EXT}
+TEMP_FILE = re.compile(r"\.tmp\d+$")   # atomic_write()'s "<path>.tmp<pid>"
+
+INT_FIELDS = ("xp", "hp", "max_hp", "att", "lv", "strength_level", "endurance_level",
+              "survival_level", "crit_chance", "current_area_index")
+BOOL_FIELDS = ("alive", "adrenaline_active")
+
+
+# ===============================================
+#                   Validation
+# ===============================================
+def validate(snapshot):
+    """Problems that would make apply_state() load a broken game ([] = fine)."""
+    problems = []
+    for key in INT_FIELDS:
+        if not isinstance(snapshot.get(key), int) or isinstance(snapshot.get(key), bool):
+            problems.append(f"{key} should be an int, got {snapshot.get(key)!r}")
+    for key in BOOL_FIELDS:
+        if not isinstance(snapshot.get(key), bool):
+            problems.append(f"{key} should be true/false, got {snapshot.get(key)!r}")
+    if not isinstance(snapshot.get("upgrade_amt"), (int, float)):
+        problems.append(f"upgrade_amt should be a number, got {snapshot.get('upgrade_amt')!r}")
+    index = snapshot.get("current_area_index")
+    if isinstance(index, int) and not 0 <= index < len(areas):
+        problems.append(f"current_area_index {index} is not an area")
+
+    weapons = snapshot.get("weapons_inventory")
+    if not isinstance(weapons, dict) or not weapons:
+        problems.append("weapons_inventory should be a non-empty object")
+    else:
+        for key, w in weapons.items():
+            if not isinstance(w, dict) or not isinstance(w.get("name"), str) or not isinstance(w.get("bonus"), int):
+                problems.append(f"weapon {key!r} should be {{name, bonus}}, got {w!r}")
+        if snapshot.get("current_weapon") not in weapons:
+            problems.append(f"current_weapon {snapshot.get('current_weapon')!r} is not in weapons_inventory")
+    for key, minimum in (("bag", 1), ("buildings", 0)):
+        table = snapshot.get(key)
+        if not isinstance(table, dict):
+            problems.append(f"{key} should be an object")
+            continue
+        for name, count in table.items():
+            if not isinstance(count, int) or isinstance(count, bool) or count < minimum:
+                problems.append(f"{key}[{name!r}] should be an int >= {minimum}, got {count!r}")
+
+    if not problems:
+        state = GameState()
+        state.apply(json.loads(json.dumps(snapshot)))
+        changed = sorted(k for k, v in state.to_dict().items() if snapshot.get(k) != v)
+        if changed:
+            problems.append(f"apply_state() would change: {', '.join(changed)}")
+    return problems
+
+
+# ===============================================
+#               Sources & Outputs
+# ===============================================
+def is_db(path):
+    return path.endswith(".db")
+
+def list_slots(src):
+    """Slot names in a save dir or database, sorted."""
+    if is_db(src):
+        conn = sqlite3.connect(f"file:{src}?mode=ro", uri=True)
+        try:
+            return [row[0] for row in conn.execute("SELECT name FROM slots ORDER BY name")]
+        finally:
+            conn.close()
+    names = set()
+    with os.scandir(src) as entries:
+        for entry in entries:
+            slot = slot_name(entry.name)
+            if slot is not None and not entry.name.endswith(JOURNAL_EXT):
+                names.add(slot)
+    return sorted(names)
+
+def source_mtime(src, slot, conn):
+    if conn is not None:
+        row = conn.execute("SELECT mtime FROM slots WHERE name = ?", (slot,)).fetchone()
+        return row[0] if row else 0.0
+    mtime = 0.0
+    for ext in (SNAPSHOT_EXT, LEGACY_EXT, JOURNAL_EXT):
+        try:
+            mtime = max(mtime, os.stat(os.path.join(src, slot + ext)).st_mtime)
+        except FileNotFoundError:
+            pass
+    return mtime
+
+def sweep_temp_files(dst):
+    """
+    Delete the half-written .tmp<pid> files a killed run left in `dst`.
+    Returns how many. Only safe while no other run writes to `dst`.
+    """
+    swept = 0
+    with os.scandir(dst) as entries:
+        for entry in entries:
+            if TEMP_FILE.search(entry.name) and entry.is_file():
+                os.remove(entry.path)
+                swept += 1
+    return swept
+
+def read_source(src, slot, conn):
+    """Current-version snapshot of `slot` (read-only: never repairs the source)."""
+    if conn is not None:
+        row = conn.execute("SELECT data FROM slots WHERE name = ?", (slot,)).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"no slot {slot!r}")
+        return decode(row[0])
+    return read_slot(src, slot)[0]
+
+
+# ===============================================
+#                    Workers
+# ===============================================
+def migrate_chunk(src, dst, fmt, slots, resume):
+    """
+    Convert `slots`. File formats are written here; SQLite rows are returned
+    to the parent, which owns the single database writer.
+    Returns {"done", "skipped", "failures": [(slot, error)], "rows": [(slot, snapshot)]}.
+    """
+    result = {"done": 0, "skipped": 0, "failures": [], "rows": []}
+    src_conn = sqlite3.connect(f"file:{src}?mode=ro", uri=True) if is_db(src) else None
+    try:
+        for slot in slots:
+            try:
+                if fmt != "sqlite":
+                    out = os.path.join(dst, slot + OUTPUT_EXT[fmt])
+                    if resume and os.path.exists(out) and os.stat(out).st_mtime >= source_mtime(src, slot, src_conn):
+                        result["skipped"] += 1
+                        continue
+                snapshot = read_source(src, slot, src_conn)
+                problems = validate(snapshot)
+                if problems:
+                    result["failures"].append((slot, "; ".join(problems)))
+                    continue
+                if fmt == "sqlite":
+                    result["rows"].append((slot, snapshot))
+                else:
+                    data = export_json(snapshot).encode("utf-8") if fmt == "json" else encode(snapshot)
+                    atomic_write(out, data)
+                result["done"] += 1
+            except Exception as e:
+                result["failures"].append((slot, f"{type(e).__name__}: {e}"))
+    finally:
+        if src_conn is not None:
+            src_conn.close()
+    return result
+
+def pending_sqlite(slots, src, db):
+    """For --resume into SQLite: drop slots the database already has at least as new."""
+    conn = sqlite3.connect(db)
+    try:
+        have = dict(conn.execute("SELECT name, mtime FROM slots"))
+    except sqlite3.OperationalError:
+        return slots, 0      # no table yet
+    finally:
+        conn.close()
+    src_conn = sqlite3.connect(f"file:{src}?mode=ro", uri=True) if is_db(src) else None
+    try:
+        todo = [s for s in slots if s not in have or have[s] < source_mtime(src, s, src_conn)]
+    finally:
+        if src_conn is not None:
+            src_conn.close()
+    return todo, len(slots) - len(todo)
+
+def migrate(src, dst, fmt, workers=None, resume=False, progress=None):
+    """Convert every slot in src. Returns totals {"slots", "done", "skipped", "failures", "swept"}."""
+    slots = list_slots(src)
+    totals = {"slots": len(slots), "done": 0, "skipped": 0, "failures": [], "swept": 0}
+    db = None
+    if fmt == "sqlite":
+        if resume and os.path.exists(dst):
+            slots, totals["skipped"] = pending_sqlite(slots, src, dst)
+        db = SQLiteSlotStore(dst)
+    else:
+        os.makedirs(dst, exist_ok=True)
+        totals["swept"] = sweep_temp_files(dst)
+
+    chunks = [slots[i:i + CHUNK] for i in range(0, len(slots), CHUNK)]
+    workers = workers or os.cpu_count() or 1
+
+    def merge(result):
+        totals["done"] += result["done"]
+        totals["skipped"] += result["skipped"]
+        totals["failures"] += result["failures"]
+        if db is not None and result["rows"]:
+            db.save_many(result["rows"])
+        if progress:
+            progress(totals)
+
+    try:
+        if workers == 1:
+            for chunk in chunks:
+                merge(migrate_chunk(src, dst, fmt, chunk, resume))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                # Keep a bounded number of chunks in flight so huge dirs stream through
+                in_flight = []
+                for chunk in chunks:
+                    in_flight.append(pool.submit(migrate_chunk, src, dst, fmt, chunk, resume))
+                    if len(in_flight) >= workers * 2:
+                        merge(in_flight.pop(0).result())
+                for future in in_flight:
+                    merge(future.result())
+    finally:
+        if db is not None:
+            db.close()
+    return totals
+
+
+# ===============================================
+# Entry
+# ===============================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate and convert every save slot in bulk.")
+    parser.add_argument("src", help="save directory or .db file")
+    parser.add_argument("dst", help="output directory (json/binary) or .db file (sqlite)")
+    parser.add_argument("--to", dest="fmt", choices=("json", "binary", "sqlite"), required=True)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--resume", action="store_true", help="skip slots already converted and up to date")
+    parser.add_argument("--report", help="write failures here as JSON")
+    args = parser.parse_args(argv)
+
+    if (args.fmt == "sqlite") != is_db(args.dst):
+        sys.exit("DST must be a .db file exactly when --to sqlite")
+
+    began = time.perf_counter()
+    last = [0.0]
+    def progress(totals):
+        now = time.perf_counter()
+        if now - last[0] >= 1.0:
+            last[0] = now
+            seen = totals["done"] + totals["skipped"] + len(totals["failures"])
+            print(f"  {seen:,}/{totals['slots']:,} slots  ({seen / (now - began):,.0f}/s, "
+                  f"{len(totals['failures'])} failed)", file=sys.stderr)
+
+    totals = migrate(args.src, args.dst, args.fmt, args.workers, args.resume, progress)
+    if totals["swept"]:
+        print(f"Removed {totals['swept']:,} temp files left by an interrupted run.")
+    elapsed = time.perf_counter() - began
+    print(f"{totals['done']:,} converted, {totals['skipped']:,} already up to date, "
+          f"{len(totals['failures']):,} failed of {totals['slots']:,} slots in {elapsed:.1f}s")
+    for slot, error in totals["failures"][:20]:
+        print(f"  ❌ {slot}: {error}")
+    if len(totals["failures"]) > 20:
+        print(f"  ... and {len(totals['failures']) - 20} more")
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump([{"slot": s, "error": e} for s, e in totals["failures"]], f, indent=2)
+        print(f"Failure report written to {args.report}")
+    sys.exit(1 if totals["failures"] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+# ============================
+# NARRATION.PY - Engine events as prose
+# Shared by every front end (terminal app, network server): turns the
+# event dicts from GameEngine.step() and the player's state into lines of
+# text. A number in the output is a dramatic pause (seconds) and a Typed
+# line is revealed one character at a time; presenter.py plays both at the
+# player's text speed, and text_only() drops them for clients that don't.
+# ============================
+
+from collections import namedtuple
+
+from map import areas
+from engine import ITEM_NAMES, RESOURCE_NAMES
+
+RESOURCE_ICONS = {"Wood": "🪵", "Stone": "🪨", "Rope": "🧵", "Fruit": "🍎", "Bones": "💀", "Scales": "🐍"}
+HEAL_VERBS = {"Fruit": "eat Fruit", "Food": "eat Food", "Medkit": "use a Medkit", "Bandage": "use a Bandage"}
+
+BOSS_CINEMATIC = [
+    "The ground trembles beneath your feet...",
+    "Somewhere in the darkness, gears begin to turn.",
+    "A low drone builds, pulsing like the heartbeat of a sleeping giant...",
+    "The iron doors shudder.",
+    "A presence stirs beyond the gate—older than memory, forged of metal and will...",
+]
+BOSS_TITLE = "THE RUINED TITAN"
+CHAR_DELAY = 0.15               # seconds per typed character at cinematic speed
+
+# A line typed out character by character (end="" leaves the cursor on the line)
+Typed = namedtuple("Typed", "text char_delay end", defaults=(CHAR_DELAY, "\n"))
+
+RESTART_SCRIPT = [Typed("Restarting game", 0, end=""), 1, Typed("...", 1)]
+
+
+def text_only(script):
+    """The lines of a script without pauses or typing."""
+    out, partial = [], ""
+    for item in script:
+        if isinstance(item, Typed):
+            if not item.end:
+                partial += item.text
+                continue
+            item = item.text
+        if isinstance(item, str):
+            out.append(partial + item)
+            partial = ""
+    if partial:
+        out.append(partial)
+    return out
+
+def boss_cinematic_script(clear_screen=True):
+    """The build-up before the final battle: typed lines, then the Titan's name letter by letter."""
+    out = []
+    for line in BOSS_CINEMATIC:
+        out += [Typed(line), 0.5 if "..." in line else 0.3]
+    out += ["", Typed(BOSS_TITLE, 0.3), ""]
+    return out + [1, "\n" * 20, "...", 1] if clear_screen else out
+
+
+# ===============================================
+#                    Events
+# ===============================================
+def narrate(ev, state):
+    """Lines (and pauses) describing one engine event."""
+    kind = ev["type"]
+    out = []
+
+    # ---- Explore & Search ----
+    if kind == "explore":
+        out.append(f"\nYou explore the {ev['area']}...")
+    elif kind == "encounter":
+        out.append(f"You encounter a {ev['enemy']}!")
+    elif kind == "search":
+        out += [f"\n=== Searching the {ev['area']} ===", 0.3]
+        if ev["area"] == "City":
+            out += ["You step deeper into the ruins...", 0.3]
+    elif kind == "search_result":
+        if ev["result"] == "animal":
+            out.append("You sense a powerful presence nearby...")
+        elif ev["result"] == "resource":
+            out.append("You search the area for resources...")
+        else:
+            out.append("You find nothing of value.")
+        out.append(0.3)
+    elif kind == "gather":
+        if ev["item"] is None:
+            out.append("You find no useful resources.")
+        else:
+            out.append(f"{RESOURCE_ICONS.get(ev['item'], '🎒')} You collected {ev['item']} x{ev['qty']}.")
+    elif kind == "weapon_found":
+        if ev["weapon"] is None:
+            out.append("You find some old debris, but no usable weapons.")
+        elif ev["new"]:
+            out.append(f"\n🗡️ You found a {ev['weapon']}! Added to your weapons.")
+        else:
+            out.append(f"\nYou spot a {ev['weapon']}, but you already own one.")
+    elif kind == "area_discovered":
+        out += [f"\n🌿 You discover a path to the {ev['area']}!", ev["description"]]
+    elif kind == "area_entered":
+        out.append(f"\nYou push forward... now entering the {ev['area']}!")
+    elif kind == "area_declined":
+        out.append("You decide to stay and prepare a bit longer.")
+    elif kind == "regen":
+        out.append(f"[Regen +{ev['amount']} HP]")
+
+    # ---- Traps ----
+    elif kind == "check_traps":
+        out.append("\n=== Checking Traps ===")
+    elif kind == "trap":
+        out += trap_lines(ev)
+
+    # ---- Combat ----
+    elif kind == "fight_start":
+        if ev["boss"]:
+            out += ["A towering figure of steel and vengeance stands before you.",
+                    "Its core glows with unstable power.", 0.3,
+                    f"\n⚔️ FINAL BATTLE: {ev['enemy']} has awakened!", "There is no escape..."]
+        else:
+            out.append(f"\n⚔️ You engage the {ev['enemy']} in battle!")
+    elif kind == "hit":
+        if ev["boss"]:
+            out.append(f"You strike the {ev['enemy']} for {ev['damage']} damage!" + (" [CRITICAL HIT!]" if ev["crit"] else ""))
+        else:
+            out.append(f"You hit the {ev['enemy']} for {ev['damage']} damage!" + (" [CRIT!]" if ev["crit"] else ""))
+    elif kind == "hesitate":
+        out.append("You hesitate and lose your attack!" if ev["boss"] else "You hesitate and lose your turn!")
+    elif kind == "enemy_hit":
+        out.append(f"The {ev['enemy']} hits you for {ev['damage']} damage!")
+    elif kind == "boss_attack":
+        if ev["attack"] == "plasma":
+            out.append(f"⚡ {ev['enemy']} fires a *Plasma Beam*! You take {ev['damage']} damage!")
+        else:
+            out += [f"🔥 {ev['enemy']} unleashes a *Thermal Surge*! You take {ev['damage']} damage and are now burning!",
+                    "[Burning -2 HP for 3 turns]"]
+    elif kind == "burn":
+        out.append(f"[Burning -{ev['damage']} HP] Your HP is now {ev['hp']}/{ev['max_hp']}")
+    elif kind == "cannot_run":
+        out.append("You cannot run from this foe!")
+    elif kind == "ran_away":
+        out.append("You run away and escape safely, but gain no XP.")
+    elif kind == "victory":
+        if ev["xp"] > 0:
+            out.append(f"\n🏆 You defeated the {ev['enemy']} and gained {ev['xp']} XP!")
+    elif kind == "death":
+        out += [f"\n💀 The {ev['enemy']} has defeated you!", f"You reached the {ev['area']} at Level {ev['level']}."]
+    elif kind == "boss_defeated":
+        out += ["\n===================================", 0.5,
+                f"🏆 {ev['enemy']} collapses in a storm of fire and shrapnel...", 1,
+                "The earth falls silent. The mechanical threat has been destroyed.", 1,
+                "You have survived The Backwoods.", 1.5,
+                "\n*** CONGRATULATIONS! YOU BEAT THE GAME ***\n", 1]
+
+    # ---- Items, Gear & Upgrades ----
+    elif kind == "healed":
+        out.append(f"You {HEAL_VERBS[ev['item']]} and heal {ev['amount']} HP.")
+    elif kind == "adrenaline":
+        out.append("You used an Adrenaline Shot! You feel stronger for your next fight.")
+    elif kind == "cannot_use":
+        out.append("That item cannot be used.")
+    elif kind == "equipped":
+        out.append(f"You equipped the {ev['weapon']}.")
+    elif kind == "already_equipped":
+        out.append(f"{ev['weapon']} is already equipped.")
+    elif kind == "upgraded":
+        out.append(f"You chose {ev['path']} Level {ev['level']}!")
+
+    # ---- Crafting & Buildings ----
+    elif kind == "crafted":
+        out.append(crafted_line(ev))
+    elif kind == "missing_materials":
+        out += ["❌ You do not have enough materials."] + missing_materials_lines(state, ev["cost"])
+    elif kind == "already_owned":
+        out.append("You already own that weapon.")
+    elif kind == "trap_limit":
+        if ev.get("all_advanced"):
+            out.append("All your traps are already advanced. You cannot build more.")
+        else:
+            out.append("You cannot build more traps (limit reached).")
+    elif kind == "already_built":
+        out.append(f"You already have a {ev['building']}.")
+    elif kind == "no_building":
+        if ev["building"] == "Campfire":
+            out.append("You don't have a Campfire.")
+        else:
+            out.append("You have no traps to check.")
+    elif kind == "cooked":
+        out.append("You cooked 5 Meat into 1 Food.")
+    elif kind == "cook_failed":
+        out.append(f"Not enough Meat to cook (need {ev['need']}).")
+    elif kind in ("invalid_choice", "invalid_action"):
+        out.append("Invalid choice.")
+    return out
+
+def trap_lines(ev):
+    catch = ev["catch"]
+    if ev["trap"] == "Trap":
+        if ev["passive"]:
+            return [f"🔔 (Passive Trap) Gained Meat x{catch['Meat']}, Fur x{catch['Fur']}"]
+        if catch:
+            return [f"Normal Trap caught something! +Meat x{catch['Meat']}, +Fur x{catch['Fur']}"]
+        return ["Normal Trap was empty."]
+    if not catch:
+        return ["Advanced Trap was empty."]
+    if ev["passive"]:
+        return [f"⚙️ (Passive Adv Trap) Gained {item} x{qty}" for item, qty in catch.items()]
+    return [f"🧩 Advanced Trap captured {item} x{qty}" for item, qty in catch.items()]
+
+def crafted_line(ev):
+    name = ev["recipe"]
+    if ev["kind"] == "weapon":
+        return f"✅ You crafted {name}."
+    if ev["kind"] == "armor":
+        return f"✅ You crafted {name}. Max HP increased by {ev['hp_bonus']}."
+    if name == "Trap":
+        return "✅ You built a Trap."
+    if name == "Advanced Trap":
+        if ev["replaced"]:
+            return "✅ You built an Advanced Trap. One normal trap was replaced."
+        return "✅ You built an Advanced Trap."
+    if name == "Campfire":
+        return "✅ You built a Campfire. You can cook 5 Meat → 1 Food in Buildings."
+    return "✅ You built a Workbench. Advanced crafting is now available."
+
+def missing_materials_lines(state, cost):
+    """A clear 'you need/have' breakdown for crafting."""
+    return ["Required:"] + [f" - {k}: {state.bag.get(k, 0)}/{v}" for k, v in cost.items()]
+
+
+# ===============================================
+#                 Status Screens
+# ===============================================
+def stats_lines(state):
+    return [
+        "==== Your Stats ====",
+        f"HP: {state.hp}/{state.max_hp}",
+        f"XP: {state.xp}/{int(state.upgrade_amt)}",
+        f"Attack: {state.total_attack()}",
+        f"Weapon: {state.current_weapon}",
+        f"Level: {state.lv}",
+        f"Current Area: {state.area_name()}",
+        "====================",
+    ]
+
+def map_lines(state):
+    out = ["\n===== MAP ====="]
+    for i, area in enumerate(areas):
+        marker = "<== You are here" if i == state.current_area_index else ""
+        out.append(f"{area['name']} {marker}")
+        if i < len(areas) - 1:
+            out.append("  |")
+    out.append("================\n")
+    return out
+
+def inventory_lines(state):
+    """Weapons (numbered, in weapons_inventory order), Items and Resources."""
+    out = ["\n===== INVENTORY =====", "\n-- Weapons --"]
+    for idx, w in enumerate(state.weapons_inventory.values(), start=1):
+        mark = " (Equipped)" if w["name"] == state.current_weapon else ""
+        out.append(f"[{idx}] {w['name']} - Attack: {state.att + w['bonus']}{mark}")
+    for title, names, empty in (("Items", ITEM_NAMES, "No items."), ("Resources", RESOURCE_NAMES, "No resources.")):
+        out.append(f"\n-- {title} --")
+        owned = [f"{name} x{state.bag[name]}" for name in sorted(names) if state.bag.get(name, 0) > 0]
+        out += owned or [empty]
+    out.append("=====================")
+    return out
@@ -0,0 +1,232 @@
+# ============================
+# PREFORK.PY - One server per core
+# A single Python process uses one core. This launcher imports the game
+# and its content tables (animals.py, map.py, engine's RESOURCE_TABLE and
+# crafting lists, the compiled samplers), takes them out of the garbage
+# collector's reach, then forks N workers that share those pages
+# copy-on-write. Every worker listens on its own SO_REUSEPORT socket bound
+# to the same port, so the kernel spreads connections over them, and runs
+# the ordinary api.py or server.py loop.
+#
+# Workers share one save directory: SlotStore(shared=True) takes a
+# per-slot flock around every write, and API sessions are written through
+# under a per-session flock, so consecutive requests may hit any worker.
+# The parent only supervises: it restarts crashed workers on the same
+# socket (queued connections wait for the replacement) and passes
+# SIGTERM / SIGINT on.
+#
+# Usage:  python prefork.py api [--workers N] [--host 0.0.0.0] [--port $PORT] [--saves saves]
+#         python prefork.py server [--workers N] ...
+# Bench:  python prefork.py bench [--workers 4] [--clients 64] [--requests 200]
+# ============================
+
+import argparse
+import asyncio
+import gc
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import api
+import server
+from map import areas
+from engine import RESOURCE_TABLE, encounter_sampler, resource_sampler, weapon_sampler
+from sessions import SessionManager
+
+FRONTS = {"api": api.DEFAULT_PORT, "server": server.DEFAULT_PORT}
+SAVE_DIR = "saves"
+RESPAWN_DELAY = 1.0             # seconds to wait before restarting a worker that died young
+
+
+def warm():
+    """Build every shared read-only table before forking, then freeze the heap."""
+    for area in areas:
+        name = area["name"]
+        if name in RESOURCE_TABLE:
+            resource_sampler(name)
+        weapon_sampler(name)
+        encounter_sampler(name)
+    gc.collect()
+    gc.freeze()   # a collection in a worker would otherwise write to (and so copy) every shared page
+
+def reuseport_socket(host, port):
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(server.BACKLOG)
+    sock.setblocking(False)
+    return sock
+
+
+# ===============================================
+#                    Workers
+# ===============================================
+async def serve_worker(front, sock, save_dir):
+    if front == "api":
+        sessions = SessionManager(os.path.join(save_dir, ".sessions"), shared=True)
+        app = api.HTTPServer(api.GameAPI(sessions))
+    else:
+        # A telnet connection stays on its worker, so only the save slots are shared
+        app = server.GameServer(save_dir, shared=True)
+    await app.start(sock=sock)
+    await app._server.serve_forever()
+
+class Supervisor:
+    """Binds the sockets, forks one worker per socket and keeps them running."""
+
+    def __init__(self, front, workers, host="0.0.0.0", port=None, save_dir=SAVE_DIR):
+        self.front = front
+        self.workers = workers
+        self.host = host
+        self.port = FRONTS[front] if port is None else port
+        self.save_dir = save_dir
+        self.sockets = []
+        self.children = {}              # pid → (worker index, start time)
+        self.stopping = False
+
+    def listen(self):
+        """Bind every worker's socket up front (so a busy port fails here, once). Returns the port."""
+        for _ in range(self.workers):
+            sock = reuseport_socket(self.host, self.port)
+            self.port = sock.getsockname()[1]   # port 0: the rest join the first one's port
+            self.sockets.append(sock)
+        return self.port
+
+    def start(self):
+        for i in range(self.workers):
+            self.spawn(i)
+
+    def spawn(self, i):
+        pid = os.fork()
+        if pid:
+            self.children[pid] = (i, time.monotonic())
+            return
+        code = 0
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+            for j, sock in enumerate(self.sockets):
+                if j != i:
+                    sock.close()
+            asyncio.run(serve_worker(self.front, self.sockets[i], self.save_dir))
+        except KeyboardInterrupt:
+            pass
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            os._exit(code)   # never fall back into the parent's code
+
+    def serve_forever(self):
+        signal.signal(signal.SIGTERM, self._on_signal)
+        signal.signal(signal.SIGINT, self._on_signal)
+        while self.children:
+            pid, status = os.wait()
+            if pid not in self.children:
+                continue
+            i, began = self.children.pop(pid)
+            if self.stopping:
+                continue
+            print(f"worker {i} (pid {pid}) exited with status {os.waitstatus_to_exitcode(status)}; restarting",
+                  file=sys.stderr)
+            if time.monotonic() - began < RESPAWN_DELAY:
+                time.sleep(RESPAWN_DELAY)   # don't spin on a worker that dies at startup
+            self.spawn(i)
+
+    def _on_signal(self, signum, frame):
+        self.stop(wait=False)
+
+    def stop(self, wait=True):
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        if wait:
+            for pid in list(self.children):
+                os.waitpid(pid, 0)
+            self.children.clear()
+        for sock in self.sockets:
+            sock.close()
+
+
+# ===============================================
+#                   Benchmark
+# ===============================================
+def client_batch(port, clients, requests):
+    """One client process: `clients` keep-alive API clients. Returns their latencies."""
+    async def run():
+        latencies = []
+        await asyncio.gather(*(api.bench_client(port, requests, latencies) for _ in range(clients)))
+        return latencies
+    return asyncio.run(run())
+
+def bench(max_workers, clients, requests):
+    """The same API load against 1, 2, 4, ... workers."""
+    counts = sorted({1, max_workers} | {n for n in (2, 4, 8, 16, 32) if n < max_workers})
+    procs = max(1, min(max_workers, clients))
+    print(f"{clients} keep-alive API clients in {procs} processes, {requests} requests each, "
+          f"{os.cpu_count()} CPUs")
+    baseline = None
+    for n in counts:
+        root = tempfile.mkdtemp(prefix="backwoods-prefork-")
+        supervisor = Supervisor("api", n, "127.0.0.1", 0, root)
+        port = supervisor.listen()
+        supervisor.start()
+        try:
+            began = time.perf_counter()
+            with ProcessPoolExecutor(max_workers=procs) as pool:
+                shares = [clients // procs + (i < clients % procs) for i in range(procs)]
+                latencies = [t for part in pool.map(client_batch, [port] * procs, shares, [requests] * procs)
+                             for t in part]
+            elapsed = time.perf_counter() - began
+        finally:
+            supervisor.stop()
+            shutil.rmtree(root, ignore_errors=True)
+        latencies.sort()
+        p = lambda q: latencies[min(len(latencies) - 1, int(len(latencies) * q))] * 1000
+        rate = clients * requests / elapsed
+        baseline = baseline or rate
+        print(f"  {n:>2} workers: {rate:>8,.0f} requests/s ({rate / baseline:.2f}x), "
+              f"p50 {p(0.5):.2f} ms, p99 {p(0.99):.2f} ms")
+
+
+# ===============================================
+# Entry
+# ===============================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run api.py or server.py on every core.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for front in FRONTS:
+        p = sub.add_parser(front, help=f"pre-forked {front}.py workers on one port")
+        p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        p.add_argument("--host", default="0.0.0.0")
+        p.add_argument("--port", type=int, default=int(os.environ.get("PORT", FRONTS[front])))
+        p.add_argument("--saves", default=SAVE_DIR, help="save directory shared by every worker")
+    p = sub.add_parser("bench", help="API throughput against 1..N workers")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    p.add_argument("--clients", type=int, default=64)
+    p.add_argument("--requests", type=int, default=200, help="per client")
+    args = parser.parse_args(argv)
+
+    warm()
+    if args.command == "bench":
+        bench(args.workers, args.clients, args.requests)
+        return
+    supervisor = Supervisor(args.command, args.workers, args.host, args.port, args.saves)
+    port = supervisor.listen()
+    supervisor.start()
+    print(f"The Backwoods {args.command} on {args.host}:{port}, {args.workers} workers (parent pid {os.getpid()})")
+    supervisor.serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+# ============================
+# PRESENTER.PY - Text at the player's speed
+# Plays narration scripts (lines, pauses and Typed lines, see narration.py)
+# at a per-session text speed, without a sleeping thread per player:
+#   steps(script, speed)        [(seconds to wait, text to write), ...]
+#   Reveal(...).start(loop)     the steps driven by asyncio timers, so one
+#                               event loop plays any number of cinematics
+#   present(script, speed)      the terminal: waits between steps, and any
+#                               key skips straight to the end
+# Speeds: instant (no delays), fast (a quarter of them), cinematic (all).
+#
+# Bench:  python presenter.py bench [--sessions 5000] [--speed fast]
+# ============================
+
+import argparse
+import asyncio
+import os
+import select
+import sys
+import time
+from collections import deque
+
+try:
+    import termios
+    import tty
+except ImportError:                 # Windows
+    termios = tty = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+from narration import Typed, boss_cinematic_script
+
+SPEEDS = {"instant": 0.0, "fast": 0.25, "cinematic": 1.0}   # multiplier on every delay
+DEFAULT_SPEED = "cinematic"
+FRAME = 0.01                    # steps due this close together share one write
+KEY_POLL = 0.02                 # seconds between key checks where we can only poll (Windows)
+
+
+def steps(script, speed):
+    """
+    The script as (delay, text) steps: wait `delay` seconds, then write `text`.
+    Text with no delay in between is merged, so "instant" is a single write.
+    """
+    scale = SPEEDS[speed]
+    out = []
+    wait, text = 0.0, ""
+    for item in script:
+        if isinstance(item, Typed):
+            for ch in item.text:
+                text += ch
+                if item.char_delay * scale > 0:
+                    out.append((wait, text))
+                    wait, text = item.char_delay * scale, ""
+            text += item.end
+        elif isinstance(item, str):
+            text += item + "\n"
+        elif item * scale > 0:
+            if text:
+                out.append((wait, text))
+                wait, text = 0.0, ""
+            wait += item * scale
+    if text or wait:
+        out.append((wait, text))   # a trailing pause still holds back whatever comes next
+    return out
+
+def duration(script, speed):
+    return sum(delay for delay, _ in steps(script, speed))
+
+
+# ===============================================
+#              Timers (many sessions)
+# ===============================================
+class Reveal:
+    """
+    One script playing on an asyncio loop: each step is a loop timer, so
+    nothing blocks. skip() writes the rest at once; cancel() drops it.
+    """
+
+    def __init__(self, script, speed, write, on_done=None):
+        self.steps = deque(steps(script, speed))
+        self.write = write
+        self.on_done = on_done
+        self.done = False
+        self._loop = None
+        self._timer = None
+        self._due = 0.0                 # loop time the last written step was due
+
+    def start(self, loop=None):
+        self._loop = loop or asyncio.get_running_loop()
+        self._due = self._loop.time()
+        self._advance()
+        return self
+
+    def _advance(self):
+        # Deadlines are on the script's own clock, so a late timer never delays the rest;
+        # when the loop falls behind, everything already due goes out in one write
+        self._timer = None
+        horizon = self._loop.time() + FRAME
+        text = ""
+        while self.steps and self._due + self.steps[0][0] <= horizon:
+            delay, chunk = self.steps.popleft()
+            self._due += delay
+            text += chunk
+        if text:
+            self.write(text)
+        if self.steps:
+            self._timer = self._loop.call_at(self._due + self.steps[0][0], self._advance)
+        else:
+            self._finish()
+
+    def skip(self):
+        """Show everything left right now (the player pressed a key)."""
+        if self.done:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        text = "".join(chunk for _, chunk in self.steps)
+        self.steps.clear()
+        if text:
+            self.write(text)
+        self._finish()
+
+    def cancel(self):
+        """Stop without writing anything more (the player left)."""
+        if self._timer is not None:
+            self._timer.cancel()
+        self.steps.clear()
+        self.done = True
+
+    def _finish(self):
+        self.done = True
+        if self.on_done is not None:
+            self.on_done()
+
+
+# ===============================================
+#                 Terminal
+# ===============================================
+class KeyWatcher:
+    """
+    Context manager whose wait(seconds) sleeps, but returns True as soon as a
+    key is pressed (and swallows the key). Needs a real terminal: cbreak mode
+    + select() on Unix, msvcrt on Windows; anywhere else it just sleeps.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.fd = None
+        self.saved = None
+
+    def __enter__(self):
+        if self.enabled and termios is not None and sys.stdin.isatty():
+            self.fd = sys.stdin.fileno()
+            self.saved = termios.tcgetattr(self.fd)
+            tty.setcbreak(self.fd)   # keys arrive one by one, without Enter
+        return self
+
+    def __exit__(self, *exc):
+        if self.saved is not None:
+            termios.tcsetattr(self.fd, termios.TCSADRAIN, self.saved)
+            self.saved = None
+
+    def wait(self, seconds):
+        if self.saved is not None:
+            ready, _, _ = select.select([self.fd], [], [], seconds)
+            if ready:
+                os.read(self.fd, 1024)
+            return bool(ready)
+        if self.enabled and msvcrt is not None and sys.stdin.isatty():
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                if msvcrt.kbhit():
+                    msvcrt.getwch()
+                    return True
+                time.sleep(min(KEY_POLL, max(0.0, deadline - time.monotonic())))
+            return False
+        time.sleep(seconds)
+        return False
+
+def present(script, speed=DEFAULT_SPEED, out=None):
+    """Play a script on the terminal at `speed`; a key press shows the rest at once."""
+    out = out or sys.stdout
+    plan = steps(script, speed)
+    if not any(delay for delay, _ in plan):
+        text = "".join(text for _, text in plan)   # nothing to wait for (instant speed, a plain or empty script)
+        if text:
+            out.write(text)
+            out.flush()
+        return
+    with KeyWatcher() as keys:
+        skipping = False
+        for delay, text in plan:
+            if delay and not skipping:
+                skipping = keys.wait(delay)
+            if text:
+                out.write(text)
+                out.flush()
+
+
+# ===============================================
+#                   Benchmark
+# ===============================================
+async def bench(sessions, speed):
+    """Every session plays the boss cinematic at once, on one thread."""
+    script = boss_cinematic_script()
+    length = duration(script, speed)
+    loop = asyncio.get_running_loop()
+    lateness, writes = [], [0]
+    finished = asyncio.Event()
+    left = [sessions]
+
+    def session(started):
+        def write(text):
+            writes[0] += 1
+        def done():
+            lateness.append(loop.time() - started - length)
+            left[0] -= 1
+            if not left[0]:
+                finished.set()
+        return write, done
+
+    began = time.perf_counter()
+    for _ in range(sessions):
+        write, done = session(loop.time())
+        Reveal(script, speed, write, done).start(loop)
+    await finished.wait()
+    elapsed = time.perf_counter() - began
+    lateness.sort()
+    p = lambda q: lateness[min(len(lateness) - 1, int(len(lateness) * q))] * 1000
+    print(f"{sessions:,} boss cinematics at '{speed}' speed ({length:.1f}s, {len(steps(script, speed))} steps each) "
+          f"on one thread: all done in {elapsed:.1f}s, {writes[0]:,} writes")
+    print(f"  each finished late by p50 {p(0.5):.0f} ms, p99 {p(0.99):.0f} ms")
+
+
+# ===============================================
+# Entry
+# ===============================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Text presentation tools.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("bench", help="many concurrent cinematics on one event loop")
+    p.add_argument("--sessions", type=int, default=5000)
+    p.add_argument("--speed", choices=[s for s in SPEEDS if SPEEDS[s]], default="fast")
+    p = sub.add_parser("demo", help="play the boss cinematic here (any key skips)")
+    p.add_argument("--speed", choices=list(SPEEDS), default=DEFAULT_SPEED)
+    args = parser.parse_args(argv)
+
+    if args.command == "bench":
+        asyncio.run(bench(args.sessions, args.speed))
+    else:
+        present(boss_cinematic_script(), args.speed)
+
+if __name__ == "__main__":
+    main()
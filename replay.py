@@ -0,0 +1,171 @@
+# ============================
+# REPLAY.PY - Session recording & fast replay
+# A recorded session is the seed of its RNG plus every engine action the
+# player sent, one compact command per line (the same syntax batch.py
+# reads). Anything that changed the game outside the engine - loading a
+# save, restarting, dev commands - is written as a "=" snapshot line.
+#
+# Record:  python app.py --record session.log [--seed N]
+# Replay:  python replay.py session.log [--repeat N] [--events]
+# ============================
+
+import argparse
+import copy
+import json
+import random
+import sys
+import time
+
+from batch import ARG_KEYS, parse_command
+from engine import GameEngine, GameState
+
+LOG_VERSION = 1
+HEADER = "#backwoods-replay"
+VERB_FOR_TYPE = {"use_item": "use", "craft": "craft", "equip": "equip", "upgrade": "upgrade"}
+
+
+def format_command(action):
+    """Engine action → one log line that parse_command() turns back into the same action."""
+    if isinstance(action, str):
+        action = {"type": action}
+    kind = action.get("type")
+    verb = VERB_FOR_TYPE.get(kind)
+    if len(action) == 1 and isinstance(kind, str) and kind.isidentifier() and kind != "state":
+        return kind
+    if verb and len(action) == 2:
+        arg = action.get(ARG_KEYS[verb])
+        if arg is None:
+            return verb
+        if isinstance(arg, str) and arg == arg.strip() and "\n" not in arg:
+            if parse_command(f"{verb} {arg}") == action:
+                return f"{verb} {arg}"
+    if kind == "advance" and len(action) == 2 and isinstance(action.get("accept"), bool):
+        return "advance y" if action["accept"] else "advance n"
+    return json.dumps(action, separators=(",", ":"))
+
+
+def capture(state):
+    """Everything a replay needs to continue from here, including a fight in progress."""
+    return {"state": state.to_dict(), "fight": copy.deepcopy(state.fight), "pending_area": state.pending_area}
+
+def restore(state, snap):
+    state.apply(copy.deepcopy(snap["state"]))
+    state.fight = copy.deepcopy(snap["fight"])
+    state.pending_area = snap["pending_area"]
+
+
+# ===============================================
+#                    Recording
+# ===============================================
+class SessionRecorder:
+    """
+    Appends a session to `path`. Call before(state, action) / after(state)
+    around every engine.step(); close(state) writes the final snapshot.
+    """
+
+    def __init__(self, path, seed):
+        self.file = open(path, "w", encoding="utf-8")
+        self.file.write(f"{HEADER} {LOG_VERSION} seed={seed}\n")
+        self.expected = None     # capture() right after the last recorded action
+
+    def _sync(self, state):
+        snap = capture(state)
+        if snap != self.expected:
+            self.file.write("=" + json.dumps(snap, separators=(",", ":")) + "\n")
+            self.expected = snap
+
+    def before(self, state, action):
+        self._sync(state)
+        self.file.write(format_command(action) + "\n")
+
+    def after(self, state):
+        self.expected = capture(state)
+
+    def close(self, state):
+        if self.file.closed:
+            return
+        self._sync(state)
+        self.file.write("#final " + json.dumps(state.to_dict(), separators=(",", ":")) + "\n")
+        self.file.close()
+
+
+# ===============================================
+#                     Replay
+# ===============================================
+def read_log(path):
+    """(seed, entries, final snapshot or None). Entries are actions or ("=", snapshot)."""
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    if not lines or not lines[0].startswith(HEADER + " "):
+        raise ValueError(f"{path} is not a recorded session")
+    fields = dict(part.split("=", 1) for part in lines[0].split()[2:] if "=" in part)
+    if int(lines[0].split()[1]) != LOG_VERSION:
+        raise ValueError(f"unsupported session log version: {lines[0].split()[1]}")
+
+    entries, final = [], None
+    for line in lines[1:]:
+        if line.startswith("="):
+            entries.append(("=", json.loads(line[1:])))
+        elif line.startswith("#final "):
+            final = json.loads(line[len("#final "):])
+        else:
+            action = parse_command(line)
+            if action is not None:
+                entries.append(action)
+    return int(fields["seed"]), entries, final
+
+def replay(seed, entries, engine=None, on_events=None):
+    """Run entries on a fresh GameState seeded like the original session. Returns the state."""
+    engine = engine or GameEngine()
+    state = GameState(random.Random(seed))
+    step = engine.step
+    for entry in entries:
+        if type(entry) is tuple:
+            restore(state, entry[1])
+            continue
+        events = step(state, entry)
+        if on_events is not None:
+            on_events(events)
+    return state
+
+def diff_snapshots(got, want):
+    """Keys whose values differ between two serialize_state() snapshots."""
+    return sorted(k for k in set(got) | set(want) if got.get(k) != want.get(k))
+
+
+# ===============================================
+# Entry
+# ===============================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded session and check its final state.")
+    parser.add_argument("log", help="session log written by app.py --record")
+    parser.add_argument("--repeat", type=int, default=1, help="replay N times (engine benchmark)")
+    parser.add_argument("--events", action="store_true", help="print the replayed events as JSON lines")
+    args = parser.parse_args(argv)
+
+    seed, entries, final = read_log(args.log)
+    actions = sum(1 for e in entries if type(e) is not tuple)
+    on_events = None
+    if args.events:
+        def on_events(events):
+            for ev in events:
+                print(json.dumps(ev, separators=(",", ":"), ensure_ascii=False))
+
+    began = time.perf_counter()
+    for _ in range(args.repeat):
+        state = replay(seed, entries, on_events=on_events)
+    elapsed = time.perf_counter() - began
+
+    rate = actions * args.repeat / elapsed if elapsed else float("inf")
+    print(f"Replayed {actions} actions × {args.repeat} in {elapsed:.3f}s ({rate:,.0f} actions/s)", file=sys.stderr)
+    if final is None:
+        print("Log has no final snapshot (session did not exit cleanly); nothing to check.", file=sys.stderr)
+        return
+    mismatched = diff_snapshots(state.to_dict(), final)
+    if mismatched:
+        print(f"❌ Final state differs from the recording: {', '.join(mismatched)}", file=sys.stderr)
+        sys.exit(1)
+    print("✅ Final state matches the recording.", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
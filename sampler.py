@@ -0,0 +1,233 @@
+# ============================
+# SAMPLER.PY - O(1) weighted draws (Walker/Vose alias method)
+# Tables are compiled once and cached by name; a cached table is
+# rebuilt when its key is bound to a different list/dict, or when any
+# tracked() content table has been edited in place since it was built.
+# ============================
+
+import random
+
+_edits = 0  # bumped by every in-place edit of a tracked() container
+
+
+def edit_count():
+    """How many in-place edits tracked() containers have seen so far."""
+    return _edits
+
+
+def _bump():
+    global _edits
+    _edits += 1
+
+
+class AliasTable:
+    """Weighted picker over [(key, weight), ...]: O(n) to build, one rng.random() per draw."""
+
+    def __init__(self, pairs):
+        pairs = list(pairs)
+        if not pairs:
+            raise ValueError("AliasTable needs at least one (key, weight) pair")
+        self.keys = [key for key, _ in pairs]
+        n = len(pairs)
+        total = sum(w for _, w in pairs)
+
+        if total <= 0:
+            # Same fallback as weighted_choice(): nothing has weight, so the last key wins
+            self.keys = [pairs[-1][0]]
+            self.prob = [1.0]
+            self.alias = [0]
+            return
+
+        scaled = [w * n / total for _, w in pairs]
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Leftovers are 1.0 up to float error; prob stays 1.0 for them
+
+    def sample(self, rng=random):
+        u = rng.random() * len(self.keys)
+        i = int(u)
+        return self.keys[i] if u - i < self.prob[i] else self.keys[self.alias[i]]
+
+    def draw(self, n, rng=random):
+        """n independent picks as a list."""
+        keys, prob, alias = self.keys, self.prob, self.alias
+        size = len(keys)
+        rand = rng.random
+        out = []
+        for _ in range(n):
+            u = rand() * size
+            i = int(u)
+            out.append(keys[i] if u - i < prob[i] else keys[alias[i]])
+        return out
+
+
+# ===============================================
+#          Edit-tracked content tables
+# ===============================================
+class TrackedDict(dict):
+    """dict that bumps edit_count() on every in-place change."""
+
+    def __setitem__(self, key, value):
+        _bump()
+        dict.__setitem__(self, key, tracked(value))
+
+    def __delitem__(self, key):
+        _bump()
+        dict.__delitem__(self, key)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            _bump()
+        return dict.setdefault(self, key, tracked(default))
+
+    def update(self, *args, **kwargs):
+        _bump()
+        dict.update(self, {key: tracked(value) for key, value in dict(*args, **kwargs).items()})
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def pop(self, *args):
+        _bump()
+        return dict.pop(self, *args)
+
+    def popitem(self):
+        _bump()
+        return dict.popitem(self)
+
+    def clear(self):
+        _bump()
+        dict.clear(self)
+
+
+class TrackedList(list):
+    """list that bumps edit_count() on every in-place change."""
+
+    def __setitem__(self, index, value):
+        _bump()
+        if isinstance(index, slice):
+            value = [tracked(item) for item in value]
+        else:
+            value = tracked(value)
+        list.__setitem__(self, index, value)
+
+    def __delitem__(self, index):
+        _bump()
+        list.__delitem__(self, index)
+
+    def append(self, value):
+        _bump()
+        list.append(self, tracked(value))
+
+    def insert(self, index, value):
+        _bump()
+        list.insert(self, index, tracked(value))
+
+    def extend(self, values):
+        _bump()
+        list.extend(self, [tracked(value) for value in values])
+
+    def __iadd__(self, values):
+        self.extend(values)
+        return self
+
+    def __imul__(self, n):
+        _bump()
+        return list.__imul__(self, n)
+
+    def pop(self, *args):
+        _bump()
+        return list.pop(self, *args)
+
+    def remove(self, value):
+        _bump()
+        list.remove(self, value)
+
+    def clear(self):
+        _bump()
+        list.clear(self)
+
+    def sort(self, *args, **kwargs):
+        _bump()
+        list.sort(self, *args, **kwargs)
+
+    def reverse(self):
+        _bump()
+        list.reverse(self)
+
+
+class TrackedSet(set):
+    """set that bumps edit_count() on every in-place change."""
+
+
+def _bumping(name):
+    method = getattr(set, name)
+
+    def edit(self, *args):
+        _bump()
+        result = method(self, *args)
+        return self if name.startswith("__i") else result
+    edit.__name__ = name
+    return edit
+
+for _name in ("add", "discard", "remove", "pop", "clear", "update", "difference_update",
+              "intersection_update", "symmetric_difference_update",
+              "__ior__", "__iand__", "__isub__", "__ixor__"):
+    setattr(TrackedSet, _name, _bumping(_name))
+del _name
+
+
+def tracked(value):
+    """
+    Deep-convert dicts/lists/sets to their Tracked* versions (other values are
+    returned as they are). Values stored into a tracked container later are
+    converted too, so nested edits like table[area][i] = (...) are seen.
+    """
+    if isinstance(value, (TrackedDict, TrackedList, TrackedSet)):
+        return value
+    if isinstance(value, dict):
+        converted = TrackedDict()
+        dict.update(converted, {key: tracked(item) for key, item in value.items()})
+        return converted
+    if isinstance(value, list):
+        return TrackedList(tracked(item) for item in value)
+    if isinstance(value, set):
+        return TrackedSet(value)
+    return value
+
+
+class TableCache:
+    """
+    Compiled tables by key. get(key, source) returns the cached table while
+    `source` is the same object it was built from and no tracked() container
+    has been edited since, and rebuilds it (build(key, source)) otherwise.
+    Both checks are O(1), so a draw never walks the source. Plain (untracked)
+    sources edited in place need an explicit invalidate().
+    """
+
+    def __init__(self, build):
+        self.build = build
+        self._entries = {}  # key → (source, edit_count() at build, table)
+
+    def get(self, key, source):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] is not source or entry[1] != _edits:
+            entry = (source, _edits, self.build(key, source))
+            self._entries[key] = entry
+        return entry[2]
+
+    def invalidate(self, key=None):
+        """Drop one key's table, or every table."""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
@@ -0,0 +1,304 @@
+# ============================
+# SAVEFORMAT.PY - Compact binary save files (.sav)
+# A versioned struct-packed encoding of serialize_state() snapshots.
+# Item, weapon and building names are written as 2-byte ids into an
+# interned name table; names outside the built-in table are stored once
+# per file. Anything the packed layout can't hold exactly (a float or huge
+# stat, a name over 255 bytes, a count or bonus outside 32 bits, more than
+# 65535 entries, unknown keys) goes into a JSON trailer instead, so every
+# JSON-able snapshot round-trips. Older formats (including the original
+# pretty-printed JSON saves) are upgraded through registered migrations on load.
+#
+# Usage:  python saveformat.py export <file.sav> [-o out.json]
+#         python saveformat.py import <file.json> [-o out.sav]
+#         python saveformat.py bench [save_dir]
+# ============================
+
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+
+MAGIC = b"BWSV"
+FORMAT_VERSION = 2              # 1 = the original JSON saves (no tiers, no version field)
+
+# Built-in name ids. Append-only: a file written today must decode tomorrow.
+NAME_TABLE = (
+    "Fists", "Wooden Sword", "Spear", "Bone Spear", "Dagger", "Rusty Sword", "Bow", "Axe",
+    "Wood", "Stone", "Rope", "Fur", "Bones", "Scales", "Meat",
+    "Fruit", "Food", "Medkit", "Bandage", "Adrenaline Shot",
+    "Campfire", "Trap", "Advanced Trap", "Workbench",
+    "Scale Armor", "Fur Cloak",
+)
+NAME_IDS = {name: i for i, name in enumerate(NAME_TABLE)}
+
+HEADER = struct.Struct("<4sH")                  # magic, version
+SCALARS = struct.Struct("<iiiiiH??BBBBB")       # see SCALAR_FIELDS
+SCALAR_FIELDS = (
+    ("xp", int), ("upgrade_amt", int), ("hp", int), ("max_hp", int), ("att", int), ("lv", int),
+    ("alive", bool), ("adrenaline_active", bool), ("strength_level", int), ("endurance_level", int),
+    ("survival_level", int), ("crit_chance", int), ("current_area_index", int),
+)
+COUNT = struct.Struct("<H")
+NAME_ID = struct.Struct("<H")
+NAMED_INT = struct.Struct("<Hi")                 # bag / building entry
+WEAPON = struct.Struct("<HHi")                   # key id, name id, bonus
+MAX_COUNT = 2**16 - 1                            # entries per table, local names
+MAX_NAME_BYTES = 2**8 - 1
+EXTRA_LEN = struct.Struct("<I")
+CRC = struct.Struct("<I")
+KNOWN_KEYS = {name for name, _ in SCALAR_FIELDS} | {"current_weapon", "weapons_inventory", "bag", "buildings"}
+
+
+class SaveFormatError(ValueError):
+    """The bytes are not a save file this version can read."""
+
+
+# ===============================================
+#                 Migrations
+# ===============================================
+MIGRATIONS = {}   # from_version → function(snapshot) returning the next version's snapshot
+
+def migration(from_version):
+    """Register a snapshot upgrade from `from_version` to `from_version + 1`."""
+    def register(fn):
+        MIGRATIONS[from_version] = fn
+        return fn
+    return register
+
+@migration(1)
+def _add_upgrade_tiers(snapshot):
+    """v1 JSON saves predate the Strength/Endurance/Survival tiers; start them at 0."""
+    for key in ("strength_level", "endurance_level", "survival_level", "crit_chance"):
+        snapshot.setdefault(key, 0)
+    return snapshot
+
+def migrate(snapshot, version):
+    """Run every registered migration from `version` up to FORMAT_VERSION."""
+    while version < FORMAT_VERSION:
+        if version not in MIGRATIONS:
+            raise SaveFormatError(f"no migration registered from save version {version}")
+        snapshot = MIGRATIONS[version](snapshot)
+        version += 1
+    return snapshot
+
+
+# ===============================================
+#                 Encode / Decode
+# ===============================================
+def _fits(value, kind):
+    if kind is float:
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    if kind is bool:
+        return isinstance(value, bool)
+    return isinstance(value, int) and not isinstance(value, bool) and -2**31 <= value < 2**31
+
+def _name_fits(name):
+    return isinstance(name, str) and len(name.encode("utf-8")) <= MAX_NAME_BYTES
+
+def _table_fits(table, key):
+    """True if every entry of a bag / buildings / weapons table packs losslessly."""
+    if not isinstance(table, dict) or len(table) > MAX_COUNT:
+        return False
+    if key == "weapons_inventory":
+        return all(_name_fits(k) and isinstance(w, dict) and w.keys() == {"name", "bonus"}
+                   and _name_fits(w["name"]) and _fits(w["bonus"], int) for k, w in table.items())
+    return all(_name_fits(name) and _fits(count, int) for name, count in table.items())
+
+def encode(snapshot):
+    """serialize_state() snapshot → bytes (current FORMAT_VERSION). Lossless for any JSON-able snapshot."""
+    extra = {k: v for k, v in snapshot.items() if k not in KNOWN_KEYS}
+    scalars = []
+    for (name, kind), code in zip(SCALAR_FIELDS, SCALARS.format[1:]):
+        value = snapshot.get(name, 0)
+        limit = {"H": 2**16, "B": 2**8}.get(code)
+        if _fits(value, kind) and (limit is None or 0 <= value < limit):
+            scalars.append(kind(value))
+        else:
+            scalars.append(kind(0))
+            extra[name] = value   # odd values (dev-mode edits, hand-edited saves) ride in the trailer
+
+    tables = {}
+    for key in ("weapons_inventory", "bag", "buildings"):
+        table = snapshot.get(key, {})
+        if _table_fits(table, key):
+            tables[key] = table
+        else:
+            tables[key] = {}
+            extra[key] = table
+    current = snapshot.get("current_weapon", "Fists")
+    if not _name_fits(current):
+        extra["current_weapon"] = current
+        current = "Fists"
+
+    local = []                    # names not in NAME_TABLE, stored once in this file
+    local_ids = {}
+    def intern(name):
+        if name in NAME_IDS:
+            return NAME_IDS[name]
+        if name not in local_ids:
+            local_ids[name] = len(NAME_TABLE) + len(local)
+            local.append(name)
+        return local_ids[name]
+
+    names = {current, *tables["bag"], *tables["buildings"]}
+    for key, w in tables["weapons_inventory"].items():
+        names.update((key, w["name"]))
+    if len(names - NAME_IDS.keys()) > MAX_COUNT - len(NAME_TABLE):
+        for key in tables:   # more distinct names than 2-byte ids: keep the tables as JSON
+            extra[key], tables[key] = tables[key], {}
+
+    body = [COUNT.pack(0)]        # placeholder for the local name count
+    body.append(NAME_ID.pack(intern(current)))
+    body.append(COUNT.pack(len(tables["weapons_inventory"])))
+    for key, w in tables["weapons_inventory"].items():
+        body.append(WEAPON.pack(intern(key), intern(w["name"]), w["bonus"]))
+    for table in (tables["bag"], tables["buildings"]):
+        body.append(COUNT.pack(len(table)))
+        for name, count in table.items():
+            body.append(NAMED_INT.pack(intern(name), count))
+
+    names = b"".join(struct.pack("<B", len(n.encode("utf-8"))) + n.encode("utf-8") for n in local)
+    body[0] = COUNT.pack(len(local)) + names
+    extra_bytes = json.dumps(extra, separators=(",", ":")).encode("utf-8") if extra else b""
+
+    data = b"".join([HEADER.pack(MAGIC, FORMAT_VERSION), SCALARS.pack(*scalars)] + body
+                    + [EXTRA_LEN.pack(len(extra_bytes)), extra_bytes])
+    return data + CRC.pack(zlib.crc32(data))
+
+def _decode_v2(data, offset):
+    values = SCALARS.unpack_from(data, offset)
+    offset += SCALARS.size
+    snapshot = {name: value for (name, _), value in zip(SCALAR_FIELDS, values)}
+
+    (n_local,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    names = list(NAME_TABLE) if n_local else NAME_TABLE
+    for _ in range(n_local):
+        size = data[offset]
+        names.append(data[offset + 1:offset + 1 + size].decode("utf-8"))
+        offset += 1 + size
+
+    (weapon_id,) = NAME_ID.unpack_from(data, offset)
+    offset += NAME_ID.size
+    snapshot["current_weapon"] = names[weapon_id]
+
+    (n,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    weapons = {}
+    for key_id, name_id, bonus in WEAPON.iter_unpack(data[offset:offset + n * WEAPON.size]):
+        weapons[names[key_id]] = {"name": names[name_id], "bonus": bonus}
+    offset += n * WEAPON.size
+    snapshot["weapons_inventory"] = weapons
+
+    for key in ("bag", "buildings"):
+        (n,) = COUNT.unpack_from(data, offset)
+        offset += COUNT.size
+        snapshot[key] = {names[i]: count for i, count in NAMED_INT.iter_unpack(data[offset:offset + n * NAMED_INT.size])}
+        offset += n * NAMED_INT.size
+
+    (n,) = EXTRA_LEN.unpack_from(data, offset)
+    offset += EXTRA_LEN.size
+    if n:
+        snapshot.update(json.loads(data[offset:offset + n]))
+    return snapshot
+
+DECODERS = {2: _decode_v2}   # binary layout per version; older layouts stay registered here
+
+def decode(data):
+    """Bytes from encode() (any registered version) → current-version snapshot."""
+    if len(data) < HEADER.size + CRC.size or data[:4] != MAGIC:
+        raise SaveFormatError("not a binary save file")
+    (crc,) = CRC.unpack_from(data, len(data) - CRC.size)
+    if zlib.crc32(data[:-CRC.size]) != crc:
+        raise SaveFormatError("save file is corrupt (checksum mismatch)")
+    _, version = HEADER.unpack_from(data)
+    if version not in DECODERS:
+        raise SaveFormatError(f"unsupported save version {version}")
+    try:
+        snapshot = DECODERS[version](data, HEADER.size)
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise SaveFormatError(f"save file is truncated or malformed: {e}") from None
+    return migrate(snapshot, version)
+
+def load_json_save(text):
+    """An original JSON save (or a JSON export) → current-version snapshot."""
+    snapshot = json.loads(text)
+    return migrate(snapshot, snapshot.pop("version", 1))
+
+def export_json(snapshot):
+    """Readable JSON for debugging; carries its version so it can be imported back."""
+    return json.dumps({"version": FORMAT_VERSION, **snapshot}, indent=2)
+
+
+# ===============================================
+# Entry
+# ===============================================
+def bench(save_dir, rounds=2000):
+    """Size and encode/decode speed of every JSON save in save_dir, vs json."""
+    snapshots = []
+    for fn in sorted(os.listdir(save_dir)):
+        if fn.lower().endswith(".json"):
+            with open(os.path.join(save_dir, fn), "r", encoding="utf-8") as f:
+                snapshots.append(load_json_save(f.read()))
+    if not snapshots:
+        sys.exit(f"No JSON saves in {save_dir}")
+
+    json_size = sum(len(json.dumps(s, indent=2).encode("utf-8")) for s in snapshots)
+    bin_size = sum(len(encode(s)) for s in snapshots)
+    timings = {}
+    for label, dump, load in (("json", lambda s: json.dumps(s, indent=2), json.loads), ("binary", encode, decode)):
+        blobs = [dump(s) for s in snapshots]
+        began = time.perf_counter()
+        for _ in range(rounds):
+            for s in snapshots:
+                dump(s)
+        saved = time.perf_counter() - began
+        began = time.perf_counter()
+        for _ in range(rounds):
+            for b in blobs:
+                load(b)
+        timings[label] = (saved, time.perf_counter() - began)
+
+    n = rounds * len(snapshots)
+    print(f"{len(snapshots)} saves: JSON {json_size:,} bytes → binary {bin_size:,} bytes "
+          f"({bin_size / json_size:.0%})")
+    for label, (saved, loaded) in timings.items():
+        print(f"  {label:<7} save {n / saved:>10,.0f}/s   load {n / loaded:>10,.0f}/s")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert and inspect binary save files.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("export", help="binary .sav → JSON")
+    p.add_argument("path")
+    p.add_argument("-o", "--out", help="default: stdout")
+    p = sub.add_parser("import", help="JSON save/export → binary .sav")
+    p.add_argument("path")
+    p.add_argument("-o", "--out", help="default: same name with .sav")
+    p = sub.add_parser("bench", help="compare sizes and speed against JSON")
+    p.add_argument("save_dir", nargs="?", default="saves")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        with open(args.path, "rb") as f:
+            text = export_json(decode(f.read()))
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+        else:
+            print(text)
+    elif args.command == "import":
+        with open(args.path, "r", encoding="utf-8") as f:
+            data = encode(load_json_save(f.read()))
+        out = args.out or os.path.splitext(args.path)[0] + ".sav"
+        with open(out, "wb") as f:
+            f.write(data)
+        print(f"{args.path} → {out} ({len(data)} bytes)")
+    else:
+        bench(args.save_dir)
+
+if __name__ == "__main__":
+    main()
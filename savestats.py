@@ -0,0 +1,288 @@
+# ============================
+# SAVESTATS.PY - Analytics over every player save
+# Slots are hashed by name into buckets of about CHUNK slots. A process
+# pool reads each bucket's slots (snapshot + journal) and reduces them to
+# partial totals that the parent merges, so no per-save rows are kept.
+# Each bucket's totals are cached (as JSON) next to a digest of its files'
+# names, mtimes and sizes, so a re-run only parses buckets that changed,
+# and memory follows the item vocabulary, not the number of saves.
+#
+# Usage:  python savestats.py [save_dir] [--workers N] [--json report.json] [--no-cache]
+# ============================
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from map import areas
+from storage import JOURNAL_EXT, read_slot, slot_name
+
+CACHE_DIR = os.path.join("cache", "savestats")
+CACHE_VERSION = 2               # bump when SaveStats changes shape
+CHUNK = 250                     # slots per bucket (and per task), roughly
+
+AREA_NAMES = [a["name"] for a in areas]
+
+
+def summarize(snapshot):
+    """The few fields the report needs from one save."""
+    index = snapshot.get("current_area_index", 0)
+    return {
+        "lv": snapshot.get("lv", 1),
+        "area": AREA_NAMES[index] if 0 <= index < len(AREA_NAMES) else "?",
+        "weapon": snapshot.get("current_weapon", "Fists"),
+        "weapons": sorted(snapshot.get("weapons_inventory", {})),
+        "bag": dict(snapshot.get("bag", {})),
+        "buildings": dict(snapshot.get("buildings", {})),
+    }
+
+
+# ===============================================
+#                   Aggregates
+# ===============================================
+class SaveStats:
+    """Running totals only, so workers can merge without shipping every save."""
+
+    TABLES = ("levels", "areas", "equipped", "owned", "bag_totals", "bag_owners",
+              "building_totals", "building_owners")
+
+    def __init__(self):
+        self.slots = 0
+        self.failed = 0
+        self.level_sum = 0
+        self.levels = {}              # level → saves
+        self.areas = {}               # area name → saves currently there
+        self.equipped = {}            # weapon → saves wielding it
+        self.owned = {}               # weapon → saves owning it
+        self.bag_totals = {}          # item → total across saves
+        self.bag_owners = {}          # item → saves holding any
+        self.building_totals = {}
+        self.building_owners = {}
+
+    def add(self, row):
+        self.slots += 1
+        self.level_sum += row["lv"]
+        for table, key in ((self.levels, row["lv"]), (self.areas, row["area"]), (self.equipped, row["weapon"])):
+            table[key] = table.get(key, 0) + 1
+        for name in row["weapons"]:
+            self.owned[name] = self.owned.get(name, 0) + 1
+        for totals, owners, counts in ((self.bag_totals, self.bag_owners, row["bag"]),
+                                       (self.building_totals, self.building_owners, row["buildings"])):
+            for name, n in counts.items():
+                totals[name] = totals.get(name, 0) + n
+                if n > 0:
+                    owners[name] = owners.get(name, 0) + 1
+
+    def merge(self, other):
+        self.slots += other.slots
+        self.failed += other.failed
+        self.level_sum += other.level_sum
+        for name in self.TABLES:
+            mine = getattr(self, name)
+            for key, n in getattr(other, name).items():
+                mine[key] = mine.get(key, 0) + n
+        return self
+
+    def to_json(self):
+        """Plain JSON data; tables are [key, n] pairs so keys keep their type."""
+        return {"slots": self.slots, "failed": self.failed, "level_sum": self.level_sum,
+                **{name: list(getattr(self, name).items()) for name in self.TABLES}}
+
+    @classmethod
+    def from_json(cls, data):
+        stats = cls()
+        stats.slots, stats.failed, stats.level_sum = data["slots"], data["failed"], data["level_sum"]
+        for name in cls.TABLES:
+            setattr(stats, name, {key: n for key, n in data[name]})
+        return stats
+
+    def report(self):
+        def ranked(table):
+            return dict(sorted(table.items(), key=lambda kv: (-kv[1], str(kv[0]))))
+        return {
+            "slots": self.slots,
+            "failed": self.failed,
+            "mean_level": round(self.level_sum / self.slots, 2) if self.slots else None,
+            "levels": {str(lv): self.levels[lv] for lv in sorted(self.levels)},
+            "areas": {name: self.areas.get(name, 0) for name in AREA_NAMES + sorted(set(self.areas) - set(AREA_NAMES))},
+            "equipped": ranked(self.equipped),
+            "owned": ranked(self.owned),
+            "bag": {name: {"total": n, "saves": self.bag_owners.get(name, 0)}
+                    for name, n in ranked(self.bag_totals).items()},
+            "buildings": {name: {"total": n, "saves": self.building_owners.get(name, 0)}
+                          for name, n in ranked(self.building_totals).items()},
+        }
+
+
+# ===============================================
+#                    Scanning
+# ===============================================
+def bucket_of(slot, buckets):
+    return int.from_bytes(hashlib.blake2b(slot.encode("utf-8"), digest_size=8).digest(), "big") % buckets
+
+def bucket_count(save_dir):
+    """Power of two giving about CHUNK slots per bucket, so it rarely changes as saves come and go."""
+    with os.scandir(save_dir) as entries:
+        files = sum(1 for _ in entries)
+    buckets = 1
+    while buckets * CHUNK < files:
+        buckets *= 2
+    return buckets
+
+def bucket_digests(save_dir, buckets):
+    """[digest per bucket]: XOR of a hash of every save file's (name, mtime, size), from one pass."""
+    digests = [0] * buckets
+    with os.scandir(save_dir) as entries:
+        for entry in entries:
+            slot = slot_name(entry.name)
+            if slot is None or not entry.is_file():
+                continue
+            st = entry.stat()
+            h = hashlib.blake2b(f"{entry.name}\0{st.st_mtime_ns}\0{st.st_size}".encode("utf-8"), digest_size=16)
+            digests[bucket_of(slot, buckets)] ^= int.from_bytes(h.digest(), "big")
+    return [f"{d:032x}" for d in digests]
+
+def bucket_slots(save_dir, buckets, wanted):
+    """{bucket: [slot, ...]} for the buckets in `wanted`, from a second pass."""
+    found = {}                        # slot → True once a snapshot (not just a journal) is seen
+    with os.scandir(save_dir) as entries:
+        for entry in entries:
+            slot = slot_name(entry.name)
+            if slot is None or not entry.is_file() or bucket_of(slot, buckets) not in wanted:
+                continue
+            found[slot] = found.get(slot, False) or not entry.name.endswith(JOURNAL_EXT)
+    slots = {b: [] for b in wanted}
+    for slot, has_snapshot in found.items():
+        if has_snapshot:   # a lone journal has no snapshot to replay onto; it isn't a slot
+            slots[bucket_of(slot, buckets)].append(slot)
+    return slots
+
+def scan_chunk(save_dir, slots):
+    """Worker: SaveStats for `slots`; unreadable saves only bump `failed`."""
+    stats = SaveStats()
+    for slot in slots:
+        try:
+            row = summarize(read_slot(save_dir, slot)[0])
+        except Exception:
+            stats.failed += 1
+            continue
+        stats.add(row)
+    return stats
+
+def cache_path(save_dir):
+    key = hashlib.sha256(os.path.abspath(save_dir).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f"{key}.json")
+
+def load_cache(path, buckets):
+    """{bucket: (digest, SaveStats)} from a cache made with the same bucket count, else {}."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        if cache.get("version") != CACHE_VERSION or cache.get("buckets") != buckets:
+            return {}
+        return {int(b): (digest, SaveStats.from_json(stats)) for b, (digest, stats) in cache["entries"].items()}
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+
+def save_cache(path, buckets, entries):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": CACHE_VERSION, "buckets": buckets,
+                   "entries": {str(b): [digest, stats.to_json()] for b, (digest, stats) in entries.items()}},
+                  f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+def scan(save_dir, workers=None, use_cache=True):
+    """Aggregate every save in save_dir. Returns (SaveStats, slots parsed this run)."""
+    buckets = bucket_count(save_dir)
+    digests = bucket_digests(save_dir, buckets)
+    path = cache_path(save_dir)
+    cached = load_cache(path, buckets) if use_cache else {}
+    total = SaveStats()
+    entries = {}                      # bucket → (digest, its SaveStats) for the next cache
+    changed = []
+    for b, digest in enumerate(digests):
+        hit = cached.get(b)
+        if hit is not None and hit[0] == digest:
+            entries[b] = hit
+            total.merge(hit[1])
+        else:
+            changed.append(b)
+
+    tasks = bucket_slots(save_dir, buckets, set(changed)) if changed else {}
+    parsed = sum(len(slots) for slots in tasks.values())
+    def merge(b, stats):
+        total.merge(stats)
+        entries[b] = (digests[b], stats)
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) <= 1:
+        for b, slots in tasks.items():
+            merge(b, scan_chunk(save_dir, slots))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Bounded number of buckets in flight, so memory stays flat however big the dir is
+            in_flight = []
+            for b, slots in tasks.items():
+                in_flight.append((b, pool.submit(scan_chunk, save_dir, slots)))
+                if len(in_flight) >= workers * 2:
+                    b, future = in_flight.pop(0)
+                    merge(b, future.result())
+            for b, future in in_flight:
+                merge(b, future.result())
+
+    if use_cache and (changed or len(entries) != len(cached)):
+        save_cache(path, buckets, entries)
+    return total, parsed
+
+
+# ===============================================
+# Entry
+# ===============================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aggregate statistics across every save slot.")
+    parser.add_argument("save_dir", nargs="?", default="saves")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--json", dest="json_out", help="also write the full report here")
+    parser.add_argument("--no-cache", action="store_true", help="parse every slot, and don't update the cache")
+    args = parser.parse_args(argv)
+    if not os.path.isdir(args.save_dir):
+        sys.exit(f"No save directory at {args.save_dir}")
+
+    began = time.perf_counter()
+    stats, parsed = scan(args.save_dir, args.workers, use_cache=not args.no_cache)
+    elapsed = time.perf_counter() - began
+    report = stats.report()
+
+    print(f"{report['slots']:,} saves ({report['failed']} unreadable) in {elapsed:.2f}s, "
+          f"{parsed:,} parsed, {report['slots'] + report['failed'] - parsed:,} from cache")
+    if not report["slots"]:
+        return
+    print(f"Mean level {report['mean_level']}   levels: "
+          + "  ".join(f"{lv}:{n}" for lv, n in report["levels"].items()))
+    print("Area reached:")
+    for name, n in report["areas"].items():
+        print(f"  {name:<10} {n:>7,}  ({n / report['slots']:.1%})")
+    print("Weapons (owned / equipped):")
+    for name, n in report["owned"].items():
+        print(f"  {name:<16} {n:>7,} / {report['equipped'].get(name, 0):,}")
+    print("Bag totals (saves holding any):")
+    for name, entry in report["bag"].items():
+        print(f"  {name:<16} {entry['total']:>9,}  ({entry['saves']:,})")
+    if report["buildings"]:
+        print("Buildings:")
+        for name, entry in report["buildings"].items():
+            print(f"  {name:<16} {entry['total']:>9,}  ({entry['saves']:,})")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, separators=(",", ":"))
+        print(f"Report written to {args.json_out}")
+
+if __name__ == "__main__":
+    main()
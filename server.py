@@ -0,0 +1,377 @@
+# ============================
+# SERVER.PY - Multiplayer TCP / telnet server
+# One asyncio process hosts every connected player. Each connection gets
+# its own GameState (kept by sessions.SessionManager, which hibernates
+# idle ones), reads are awaited lines and each reply is written in one
+# buffered write. Players type the batch.py commands (explore, attack,
+# use Medkit, craft Spear, ...) plus help / stats / inv / map / save /
+# load / new / quit; replies use the terminal app's prose. Each connection
+# gets a random player key and its save slots live under players/<key>/,
+# so nobody can list, load or overwrite anyone else's saves; 'key <key>'
+# reaches the same saves again from a later connection. 'speed fast' or
+# 'speed cinematic' plays scenes with the terminal's pauses and typing, on
+# the event loop's timers (presenter.Reveal); any input skips the scene.
+#
+# Usage:  python server.py [--host 0.0.0.0] [--port 4000]    then: telnet host 4000
+# Bench:  python server.py bench [--clients 1000] [--commands 50]
+# ============================
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import secrets
+import shutil
+import tempfile
+import time
+
+from batch import parse_command
+from engine import GameEngine
+from narration import (
+    RESTART_SCRIPT,
+    boss_cinematic_script,
+    inventory_lines,
+    map_lines,
+    narrate,
+    stats_lines,
+    text_only,
+)
+from presenter import SPEEDS, Reveal
+from sessions import SessionManager
+from storage import SlotStore
+
+DEFAULT_PORT = 4000
+SAVE_DIR = "saves"
+PROMPT = "\r\n> "
+MAX_LINE = 4096
+BACKLOG = 1024                  # pending connections the OS queues before refusing
+SWEEP_EVERY = 5.0               # seconds between hibernation sweeps
+TEXT_SPEED = "instant"          # until a player picks another with 'speed'
+UPGRADE_KEYS = {"1": "Strength", "2": "Endurance", "3": "Survival"}
+PLAYER_DIR = "players"
+PLAYER_KEY = re.compile(r"[0-9a-f]{16}")
+TELNET_COMMAND = re.compile(rb"\xff[\xfb-\xfe].|\xff[\xf0-\xfa]|\xff\xff")
+
+WELCOME = [
+    "===== THE BACKWOODS =====",
+    "----- Welcome To The Backwoods -----",
+    "Type 'help' for commands.",
+]
+HELP = [
+    "Commands:",
+    "  explore | search | stats | inv | map",
+    "  craft <recipe> | equip <weapon> | use <item> | cook | check_traps",
+    "  in a fight: attack | use <item> | run",
+    "  save <name> | load <name> | slots | key [<key>] | new | quit",
+    "  speed instant|fast|cinematic (any input skips a scene)",
+]
+
+
+def clean_line(raw):
+    """A received line without telnet negotiation bytes or line endings."""
+    return TELNET_COMMAND.sub(b"", raw).decode("utf-8", errors="replace").strip()
+
+def telnet_text(text):
+    return text.replace("\n", "\r\n").replace("\r\r\n", "\r\n").encode("utf-8")
+
+def safe_slot_name(name):
+    return "".join(ch for ch in name if ch.isalnum() or ch in "-_")
+
+
+class GameServer:
+    """Accepts connections; every connection plays its own game through `sessions`."""
+
+    def __init__(self, save_dir=SAVE_DIR, sessions=None, shared=False):
+        self.engine = GameEngine()
+        self.save_dir = save_dir
+        self.shared = shared            # other processes save to the same slots
+        self.sessions = sessions or SessionManager(os.path.join(save_dir, ".sessions"))
+        self.connections = 0
+        self.peak_connections = 0
+        self.commands = 0
+        self.reveals = {}               # sid → presenter.Reveal still playing
+        self._server = None
+        self._sweeper = None
+
+    async def start(self, host="0.0.0.0", port=DEFAULT_PORT, sock=None):
+        """Listen on host:port, or on an already bound `sock` (prefork.py's workers). Returns the port."""
+        if sock is not None:
+            host = port = None
+        self._server = await asyncio.start_server(self.handle_connection, host, port, sock=sock, limit=MAX_LINE,
+                                                  backlog=BACKLOG)
+        self._sweeper = asyncio.create_task(self._sweep_loop())
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self._sweeper.cancel()
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(SWEEP_EVERY)
+            self.sessions.sweep()
+
+    # ---- One connection ----
+    async def handle_connection(self, reader, writer):
+        sid = self.sessions.create(data={"slot": None, "player": secrets.token_hex(8)})
+        self.connections += 1
+        self.peak_connections = max(self.peak_connections, self.connections)
+        try:
+            await self.send(writer, WELCOME)
+            while True:
+                try:
+                    raw = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    await self.send(writer, ["Line too long."])
+                    continue
+                if not raw:
+                    break
+                line = clean_line(raw)
+                reveal = self.reveals.pop(sid, None)
+                if reveal is not None and not reveal.done:
+                    reveal.skip()   # any input finishes the scene at once
+                    if not line:
+                        continue
+                if line.lower() in ("quit", "exit"):
+                    writer.write(b"Goodbye.\r\n")
+                    break
+                self.commands += 1
+                out = await self.handle_command(sid, line)
+                with self.sessions.session(sid) as session:
+                    speed = session.data.get("speed", TEXT_SPEED)
+                await self.send(writer, out, sid, speed)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            reveal = self.reveals.pop(sid, None)
+            if reveal is not None:
+                reveal.cancel()
+            self.connections -= 1
+            self.sessions.close(sid)
+            writer.close()
+
+    async def send(self, writer, script, sid=None, speed=TEXT_SPEED):
+        """
+        A reply ending with the prompt: all in one write, or, at a slower speed and
+        with pauses to play, revealed on loop timers (this coroutine doesn't wait).
+        """
+        if speed == "instant" or all(isinstance(item, str) for item in script):
+            writer.write(telnet_text("\n".join(text_only(script)) + PROMPT))
+            await writer.drain()
+            return
+        self.reveals[sid] = Reveal(script, speed, lambda text: writer.write(telnet_text(text)),
+                                   lambda: writer.write(PROMPT.lstrip("\r\n").encode())).start()
+
+    async def handle_command(self, sid, line):
+        """Reply script for one input line: lines, plus narration's pauses and typed lines."""
+        with self.sessions.session(sid) as session:
+            state = session.state
+            word, _, rest = line.partition(" ")
+            word = word.lower()
+            rest = rest.strip()
+
+            # ---- Answers to the open question, if any ----
+            if state.pending_area is not None and word in ("y", "yes", "n", "no"):
+                return self.step(session, {"type": "advance", "accept": word in ("y", "yes")})
+            if state.fight is None and state.can_level_up() and (word in UPGRADE_KEYS or word.capitalize() in UPGRADE_KEYS.values()):
+                return self.step(session, {"type": "upgrade", "path": UPGRADE_KEYS.get(word, word.capitalize())})
+            if word in ("use", "item") and not rest:
+                owned = state.usable_items()
+                return ["Usable items: " + ", ".join(owned) if owned else "You have no items to use."] \
+                    + self.status(state)
+
+            # ---- Screens & saves ----
+            if word in ("", "look"):
+                return self.status(state) or ["What now? ('help' for commands)"]
+            if word in ("help", "?", "cmnd", "commands"):
+                return HELP + self.status(state)
+            if word == "stats":
+                return stats_lines(state) + self.status(state)
+            if word in ("inv", "inventory"):
+                return inventory_lines(state) + self.status(state)
+            if word == "map":
+                return map_lines(state) + self.status(state)
+            if word == "slots":
+                store = self.store(session)
+                return ["Saves: " + (", ".join(store.list()) or "none")]
+            if word in ("save", "load"):
+                return await self.save_or_load(session, word, rest)
+            if word == "key":
+                if not rest:
+                    return [f"Your player key is {session.data['player']}. "
+                            "Type 'key <key>' on a later visit to reach these saves."]
+                if not PLAYER_KEY.fullmatch(rest.lower()):
+                    return ["❌ That is not a player key."]
+                session.data["player"] = rest.lower()
+                session.data["slot"] = None
+                return ["✅ Using that player's saves now ('slots' lists them)."]
+            if word == "speed":
+                if rest.lower() in SPEEDS:
+                    session.data["speed"] = rest.lower()
+                    return [f"Text speed set to '{rest.lower()}'."]
+                return [f"Text speed is '{session.data.get('speed', TEXT_SPEED)}'. "
+                        f"Use: speed {' | '.join(SPEEDS)}"]
+            if word in ("new", "restart"):
+                state.reset()
+                session.data["slot"] = None
+                return ["Restarting game...", "----- Welcome To The Backwoods -----"]
+
+            try:
+                action = parse_command(line)
+            except ValueError as e:
+                return [f"❌ {e}"]
+            if action is None:
+                return []
+            if action == "state":
+                return [json.dumps(state.to_dict())]
+            return self.step(session, action)
+
+    def step(self, session, action):
+        state = session.state
+        events = self.engine.step(state, action)
+        if [ev.get("reason") for ev in events] == ["unknown"]:
+            return ["Unknown command ('help' lists them)."] + self.status(state)
+        out = []
+        for ev in events:
+            if ev["type"] == "fight_start" and ev["boss"]:
+                out += boss_cinematic_script(clear_screen=False)
+            out += narrate(ev, state)
+            if ev["type"] == "death":   # the engine already restarted the character, bag/buildings kept
+                out += RESTART_SCRIPT + ["----- Welcome To The Backwoods -----"]
+            elif ev["type"] == "boss_defeated":
+                out.append("Type 'new' to play again, or 'quit'.")
+        return out + self.status(state)
+
+    def status(self, state):
+        """What the game is waiting for: the fight, the path question, or a level-up."""
+        if state.fight is not None:
+            fight = state.fight
+            ask = "Do you ATTACK, USE <item>, or RUN?" if fight["allow_run"] else "Do you ATTACK or USE <item>?"
+            return [f"\nYour HP: {state.hp}/{state.max_hp}", f"{fight['enemy']['name']} HP: {fight['enemy_hp']}", ask]
+        if state.pending_area is not None:
+            return ["Do you want to continue into this area? It looks more dangerous. (y/n)"]
+        if state.can_level_up():
+            keys = {path: key for key, path in UPGRADE_KEYS.items()}
+            return ["\n=== LEVEL UP! ==="] + [f"[{keys[path]}] {path} {tier} {desc}"
+                                            for path, tier, desc in state.upgrade_choices()]
+        return []
+
+    def store(self, session):
+        """This player's own save slots."""
+        return SlotStore(os.path.join(self.save_dir, PLAYER_DIR, session.data["player"]), shared=self.shared)
+
+    async def save_or_load(self, session, word, rest):
+        name = safe_slot_name(rest) or session.data.get("slot")
+        if not name:
+            return [f"Usage: {word} <name> (letters, numbers, '-' or '_')"]
+        store = self.store(session)
+        loop = asyncio.get_running_loop()
+        try:
+            if word == "save":
+                if session.state.fight is not None or session.state.pending_area is not None:
+                    return ["❌ Finish what you're doing first."]
+                first = not os.path.isdir(store.save_dir)
+                await loop.run_in_executor(None, store.save, name, session.state.to_dict())
+                session.data["slot"] = name
+                reply = [f"✅ Game saved successfully as '{name}'."]
+                if first:
+                    reply.append(f"Your player key is {session.data['player']}; "
+                                 "type 'key <key>' on a later visit to load your saves.")
+                return reply
+            snapshot = await loop.run_in_executor(None, store.load, name)
+        except FileNotFoundError:
+            return [f"❌ No save named '{name}'."]
+        except Exception as e:
+            return [f"❌ Failed to {word}: {e}"]
+        session.state.apply(snapshot)   # still resident: a busy session is never hibernated
+        session.data["slot"] = name
+        return [f"✅ Loaded save '{name}'."] + self.status(session.state)
+
+
+# ===============================================
+#                   Benchmark
+# ===============================================
+async def bench_client(host, port, commands, latencies, connected, go):
+    reader, writer = await asyncio.open_connection(host, port, limit=1 << 20)
+    reply = await reader.readuntil(PROMPT.encode())
+    connected()
+    await go.wait()
+    rotation = ("explore", "search", "stats", "inv", "explore", "check_traps")
+    for i in range(commands):
+        text = reply.decode("utf-8", errors="replace")
+        if "ATTACK" in text:
+            command = "attack"
+        elif "(y/n)" in text:
+            command = "y"
+        elif "LEVEL UP" in text:
+            command = "1"
+        else:
+            command = rotation[i % len(rotation)]
+        began = time.perf_counter()
+        writer.write(command.encode() + b"\r\n")
+        reply = await reader.readuntil(PROMPT.encode())
+        latencies.append(time.perf_counter() - began)
+    writer.write(b"quit\r\n")
+    await writer.drain()
+    writer.close()
+
+async def bench(clients, commands):
+    root = tempfile.mkdtemp(prefix="backwoods-server-")
+    server = GameServer(root)
+    port = await server.start("127.0.0.1", 0)
+    latencies = []
+    go = asyncio.Event()
+    waiting = [clients]
+    def connected():
+        # Every connection is open before any client plays, so all sessions are live at once
+        waiting[0] -= 1
+        if not waiting[0]:
+            go.set()
+    tasks = [asyncio.create_task(bench_client("127.0.0.1", port, commands, latencies, connected, go))
+             for _ in range(clients)]
+    await go.wait()
+    began = time.perf_counter()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - began
+    await server.close()
+    shutil.rmtree(root, ignore_errors=True)
+    latencies.sort()
+    p = lambda q: latencies[min(len(latencies) - 1, int(len(latencies) * q))] * 1000
+    print(f"{clients:,} concurrent sessions (peak {server.peak_connections:,}), {server.commands:,} commands "
+          f"in {elapsed:.2f}s: {server.commands / elapsed:,.0f} commands/s (clients in the same process)")
+    print(f"  reply latency p50 {p(0.5):.1f} ms, p99 {p(0.99):.1f} ms; "
+          f"sessions hibernated {server.sessions.hibernated:,}")
+
+
+# ===============================================
+# Entry
+# ===============================================
+async def serve(host, port, save_dir):
+    server = GameServer(save_dir)
+    port = await server.start(host, port)
+    print(f"The Backwoods server on {host}:{port} (telnet {host} {port})")
+    await server._server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Host many Backwoods games over TCP/telnet.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", DEFAULT_PORT)))
+    parser.add_argument("--saves", default=SAVE_DIR, help="save directory")
+    sub = parser.add_subparsers(dest="command")
+    p = sub.add_parser("bench", help="many concurrent clients against an in-process server")
+    p.add_argument("--clients", type=int, default=1000)
+    p.add_argument("--commands", type=int, default=50, help="per client")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "bench":
+            asyncio.run(bench(args.clients, args.commands))
+        else:
+            asyncio.run(serve(args.host, args.port, args.saves))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
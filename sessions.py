@@ -0,0 +1,334 @@
+# ============================
+# SESSIONS.PY - Many hosted games, few in memory
+# A SessionManager owns every connected player's game. Sessions idle past
+# `idle_timeout`, or the least recently used ones once resident sessions
+# exceed `memory_budget`, are hibernated: their state (serialize_state()
+# plus any fight in progress and the RNG position) goes to a small JSON
+# file and the GameState is dropped. The next command rehydrates it, so
+# memory follows the active players, not the connected ones.
+#
+# Usage:  with manager.session(sid) as s:
+#             events = engine.step(s.state, action)
+#         manager.sweep()          # now and then, e.g. once a second
+#
+# Bench:  python sessions.py bench [--sessions 20000] [--active 200]
+# ============================
+
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:                 # Windows: no advisory locks, so no shared session dirs
+    fcntl = None
+
+from engine import GameEngine, GameState
+from replay import capture, restore
+
+SESSION_DIR = os.path.join("saves", ".sessions")
+IDLE_TIMEOUT = 300.0            # seconds without a command before a session hibernates
+MEMORY_BUDGET = 64 * 1024**2    # rough bytes of resident sessions before LRU eviction
+SESSION_OVERHEAD = 8 * 1024     # GameState + Random (its state alone is 625 ints) + bookkeeping
+ENTRY_BYTES = 160               # per bag / building / weapon entry
+
+
+class Session:
+    """One player's game. `data` is free for the host (bound slot, name, ...) and must be JSON."""
+
+    def __init__(self, sid, seed, state=None, data=None):
+        self.sid = sid
+        self.seed = seed
+        self.state = state              # GameState, or None while hibernated
+        self.data = data if data is not None else {}
+        self.last_active = time.monotonic()
+        self.busy = 0                   # commands running right now; never hibernated while > 0
+        self.size = 0
+
+    def estimate_size(self):
+        s = self.state
+        return SESSION_OVERHEAD + ENTRY_BYTES * (len(s.bag) + len(s.buildings) + len(s.weapons_inventory))
+
+
+class SessionManager:
+    """
+    Sessions by id, resident ones in LRU order. session(sid) is the only way in:
+    it rehydrates, marks the session busy for the block, and rebalances after.
+
+    shared=True lets several processes serve the same sessions (pre-forked
+    workers behind one port): session(sid) holds an flock on <sid>.lock, reloads
+    the file if another process wrote it since, and writes the state back after.
+    The lock file holds a generation number bumped by every write, so "did
+    anyone else write it" is one 8-byte read.
+    """
+
+    def __init__(self, session_dir=SESSION_DIR, idle_timeout=IDLE_TIMEOUT, memory_budget=MEMORY_BUDGET,
+                 shared=False):
+        if shared and fcntl is None:
+            raise RuntimeError("shared session dirs need fcntl (Unix)")
+        self.session_dir = session_dir
+        self.shared = shared
+        self._generations = {}          # sid → generation of our resident copy (shared only)
+        self.idle_timeout = idle_timeout
+        self.memory_budget = memory_budget
+        self.lock = threading.RLock()
+        self.sessions = {}              # sid → Session (resident or hibernated)
+        self.resident = OrderedDict()   # sid → Session, least recently used first
+        self.resident_bytes = 0
+        self.hibernated = 0
+        self.rehydrated = 0
+        os.makedirs(session_dir, exist_ok=True)
+
+    # ---- Lifecycle ----
+    def create(self, seed=None, data=None):
+        """Start a fresh game; returns its session id."""
+        seed = int.from_bytes(os.urandom(4), "big") if seed is None else seed
+        with self.lock:
+            sid = uuid.uuid4().hex
+            session = Session(sid, seed, GameState(random.Random(seed)), data)
+            self.sessions[sid] = session
+            self._make_resident(session)
+            if self.shared:
+                fd = os.open(self._lock_path(sid), os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    self._write_through(session, fd, 0)   # visible to the other workers from the start
+                finally:
+                    os.close(fd)
+            self._enforce_budget()
+        return sid
+
+    def close(self, sid):
+        """Forget a session (the player left) and its hibernation file."""
+        with self.lock:
+            session = self.sessions.pop(sid, None)
+            if session is not None and sid in self.resident:
+                del self.resident[sid]
+                self.resident_bytes -= session.size
+            self._generations.pop(sid, None)
+        if session is None and not self.shared:
+            return
+        fd = None
+        if self.shared:
+            fd = os.open(self._lock_path(sid), os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            os.pwrite(fd, bytes(8), 0)   # generation 0: a worker waiting on this lock sees it's gone
+        try:
+            for path in (self._path(sid), self._lock_path(sid)):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        finally:
+            if fd is not None:
+                os.close(fd)
+
+    def __contains__(self, sid):
+        if self.shared:
+            return os.path.exists(self._path(sid))   # another worker may have started or closed it
+        return sid in self.sessions
+
+    def __len__(self):
+        return len(self.sessions)
+
+    @contextmanager
+    def session(self, sid):
+        """Yield the live Session for sid (KeyError if unknown), rehydrating it if needed."""
+        if not self.shared:
+            with self._use(sid) as session:
+                yield session
+            return
+        fd = os.open(self._lock_path(sid), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)   # held for microseconds: one request's engine step
+            generation = int.from_bytes(os.pread(fd, 8, 0), "big")
+            if not generation:
+                try:
+                    os.remove(self._lock_path(sid))   # left by this probe for an unknown / closed session
+                except FileNotFoundError:
+                    pass
+            with self._use(sid, generation) as session:
+                yield session
+                with self.lock:
+                    self._write_through(session, fd, generation)   # the next request may hit another worker
+        finally:
+            os.close(fd)   # releases the flock
+
+    @contextmanager
+    def _use(self, sid, generation=None):
+        with self.lock:
+            session = self.sessions.get(sid)
+            if generation is not None:
+                if not generation:   # never created, or closed by another worker
+                    if session is not None:
+                        del self.sessions[sid]
+                        if session.state is not None:
+                            self._evict(session)
+                    raise KeyError(sid)
+                if session is None:
+                    session = self.sessions[sid] = Session(sid, None)   # started by another worker
+                elif session.state is not None and self._generations.get(sid) != generation:
+                    self._evict(session)   # another worker played it since; our copy is stale
+            if session is None:
+                raise KeyError(sid)
+            if session.state is None:
+                self._rehydrate(session, generation)
+            else:
+                self.resident.move_to_end(sid)
+            session.busy += 1
+        try:
+            yield session
+        finally:
+            with self.lock:
+                session.busy -= 1
+                session.last_active = time.monotonic()
+                if sid in self.resident:
+                    self.resident_bytes -= session.size
+                    session.size = session.estimate_size()
+                    self.resident_bytes += session.size
+                self._enforce_budget()
+
+    def sweep(self, now=None):
+        """Hibernate every session idle longer than idle_timeout. Returns how many."""
+        now = time.monotonic() if now is None else now
+        count = 0
+        with self.lock:
+            # LRU order: once a session is recent enough, every later one is too
+            for session in list(self.resident.values()):
+                if now - session.last_active < self.idle_timeout:
+                    break
+                if not session.busy:
+                    self._hibernate(session)
+                    count += 1
+        return count
+
+    def stats(self):
+        with self.lock:
+            return {"sessions": len(self.sessions), "resident": len(self.resident),
+                    "resident_bytes": self.resident_bytes, "hibernated": self.hibernated,
+                    "rehydrated": self.rehydrated}
+
+    # ---- Hibernation ----
+    def _path(self, sid):
+        return os.path.join(self.session_dir, sid + ".json")
+
+    def _lock_path(self, sid):
+        return os.path.join(self.session_dir, sid + ".lock")
+
+    def _make_resident(self, session):
+        session.size = session.estimate_size()
+        self.resident[session.sid] = session
+        self.resident_bytes += session.size
+
+    def _enforce_budget(self):
+        if self.resident_bytes <= self.memory_budget:
+            return   # the common case: no walk over the resident sessions
+        for session in list(self.resident.values()):
+            if self.resident_bytes <= self.memory_budget:
+                break
+            if not session.busy:
+                self._hibernate(session)
+
+    def _encode(self, session):
+        state = session.state
+        version, internal, gauss = state.rng.getstate()
+        payload = {"seed": session.seed, "data": session.data, "rng": [version, list(internal), gauss],
+                   **capture(state)}
+        return json.dumps(payload, separators=(",", ":")).encode("utf-8")   # dumps() is the C encoder
+
+    def _write(self, session):
+        path = self._path(session.sid)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(self._encode(session))
+        os.replace(tmp, path)   # no fsync: a hibernated session doesn't outlive the server anyway
+
+    def _write_through(self, session, lock_fd, generation):
+        # In place, under the session's flock: nobody can read it half-written, and unlike
+        # tmp + rename over an existing file, ext4 doesn't flush it to disk on every request
+        data = self._encode(session)
+        fd = os.open(self._path(session.sid), os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+            os.ftruncate(fd, len(data))
+        finally:
+            os.close(fd)
+        os.pwrite(lock_fd, (generation + 1).to_bytes(8, "big"), 0)
+        self._generations[session.sid] = generation + 1
+
+    def _evict(self, session):
+        del self.resident[session.sid]
+        self.resident_bytes -= session.size
+        session.state = None
+        session.data = None
+
+    def _hibernate(self, session):
+        if not self.shared:
+            self._write(session)   # a shared session's file is already current
+        self._evict(session)
+        self.hibernated += 1
+
+    def _rehydrate(self, session, generation=None):
+        with open(self._path(session.sid), "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        version, internal, gauss = payload["rng"]
+        rng = random.Random()
+        rng.setstate((version, tuple(internal), gauss))
+        state = GameState(rng)
+        restore(state, payload)   # apply_state() plus the fight / pending path
+        session.state = state
+        session.seed = payload["seed"]
+        session.data = payload["data"]
+        self._make_resident(session)
+        if generation is not None:
+            self._generations[session.sid] = generation
+        self.rehydrated += 1
+
+
+# ===============================================
+# Entry
+# ===============================================
+def bench(sessions, active, commands, budget):
+    """Many connected sessions, a few active: resident memory stays near the active set."""
+    engine = GameEngine()
+    root = tempfile.mkdtemp(prefix="backwoods-sessions-")
+    try:
+        manager = SessionManager(root, idle_timeout=1e9, memory_budget=budget)
+        sids = [manager.create(seed=i) for i in range(sessions)]
+        rng = random.Random(1)
+        hot = sids[:active]
+        began = time.perf_counter()
+        for i in range(commands):
+            # 95% of commands from the active players, the rest wake a random idle one
+            sid = rng.choice(hot) if rng.random() < 0.95 else rng.choice(sids)
+            with manager.session(sid) as s:
+                engine.step(s.state, "explore" if s.state.fight is None else "attack")
+        elapsed = time.perf_counter() - began
+        s = manager.stats()
+        print(f"{sessions:,} sessions, {active} active, {commands:,} commands in {elapsed:.2f}s "
+              f"({commands / elapsed:,.0f}/s)")
+        print(f"  resident {s['resident']:,} (~{s['resident_bytes'] / 1024**2:.1f} MB of "
+              f"{budget / 1024**2:.0f} MB budget), hibernated {s['hibernated']:,}, rehydrated {s['rehydrated']:,}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hosted session manager tools.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("bench", help="hibernation under many mostly-idle sessions")
+    p.add_argument("--sessions", type=int, default=20000)
+    p.add_argument("--active", type=int, default=200)
+    p.add_argument("--commands", type=int, default=50000)
+    p.add_argument("--budget-mb", type=float, default=4)
+    args = parser.parse_args(argv)
+    bench(args.sessions, args.active, args.commands, int(args.budget_mb * 1024**2))
+
+if __name__ == "__main__":
+    main()
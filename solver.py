@@ -0,0 +1,356 @@
+# ============================
+# SOLVER.PY - Exact fight odds (no sampling)
+# A regular fight() where the player always attacks is a small Markov chain
+# over (player hp, enemy hp). Solving it directly gives the true win chance
+# and expected damage taken, memoized so repeat queries cost a dict lookup.
+# The Titan fight adds burn and the choice between attacking, healing
+# (with which item) and an Adrenaline Shot; its optimal policy is solved
+# once per loadout and cached on disk.
+#
+# Usage:  python solver.py fight <enemy name> [--hp 60] [--attack 6] [--crit 0] [--weapon Fists] [--adrenaline]
+#         python solver.py boss [--hp 60] [--max-hp 60] [--attack 6] [--crit 0] [--items Medkit,Fruit,...]
+# ============================
+
+import argparse
+import hashlib
+import os
+import pickle
+import sys
+from functools import lru_cache
+
+from animals import boss
+from engine import AREA_ANIMALS, BOW_ENEMY_ATK_REDUCTION, FLYING_ENEMIES, ITEM_HEAL, STRONG_ANIMALS
+
+BOSS_CACHE_DIR = os.path.join("cache", "boss")
+PLASMA_DAMAGE = range(10, 14)      # fight_boss(): 50% Plasma Beam 10–13
+THERMAL_DAMAGE = range(8, 11)      #               50% Thermal Surge 8–10, then burn
+BURN_TURNS = 3
+BURN_DAMAGE = 2
+
+
+# ===============================================
+#               Damage Distributions
+# ===============================================
+@lru_cache(maxsize=None)
+def player_damage_dist(attack, crit_chance):
+    """((damage, probability), ...) for one swing: attack ±2 (min 1), crits double."""
+    low, high = max(1, attack - 2), attack + 2
+    p_roll = 1 / (high - low + 1)
+    p_crit = crit_chance / 100 if crit_chance > 0 else 0.0
+    dist = {}
+    for base in range(low, high + 1):
+        dist[base] = dist.get(base, 0.0) + p_roll * (1 - p_crit)
+        if p_crit:
+            dist[base * 2] = dist.get(base * 2, 0.0) + p_roll * p_crit
+    return tuple(sorted(dist.items()))
+
+@lru_cache(maxsize=None)
+def enemy_damage_dist(enemy_attack, reduction):
+    """((damage, probability), ...) for one enemy hit: attack ±1, minus the Bow reduction."""
+    dist = {}
+    for roll in range(enemy_attack - 1, enemy_attack + 2):
+        dmg = max(0, roll - reduction) if reduction else roll
+        dist[dmg] = dist.get(dmg, 0.0) + 1 / 3
+    return tuple(sorted(dist.items()))
+
+
+# ===============================================
+#               Regular Fights
+# ===============================================
+@lru_cache(maxsize=None)
+def _solve(hp, enemy_hp, attack, crit_chance, enemy_attack, reduction):
+    """(win probability, expected HP lost, expected turns) from this exact position."""
+    win = lost = turns = 0.0
+    enemy_hits = enemy_damage_dist(enemy_attack, reduction)
+    for dmg, p in player_damage_dist(attack, crit_chance):
+        if enemy_hp - dmg <= 0:
+            win += p
+            turns += p
+            continue
+        for taken, q in enemy_hits:
+            pq = p * q
+            if hp - taken <= 0:
+                lost += pq * hp
+                turns += pq
+            else:
+                w, l, t = _solve(hp - taken, enemy_hp - dmg, attack, crit_chance, enemy_attack, reduction)
+                win += pq * w
+                lost += pq * (taken + l)
+                turns += pq * (1 + t)
+    return win, lost, turns
+
+def bow_reduction(weapon, enemy_name):
+    return BOW_ENEMY_ATK_REDUCTION if weapon == "Bow" and enemy_name not in FLYING_ENEMIES else 0
+
+@lru_cache(maxsize=4096)
+def solve_fight(hp, attack, crit_chance, weapon, enemy_name, enemy_hp, enemy_attack, adrenaline=False):
+    """
+    Exact outcome of fighting to the end (always ATTACK) from `hp` against a
+    fresh enemy. `attack` is total_attack() (base + weapon bonus).
+    Returns {"win": p, "expected_hp_lost": x, "expected_turns": t}.
+    """
+    if adrenaline:
+        attack += 2
+    win, lost, turns = _solve(hp, enemy_hp, attack, crit_chance, enemy_attack,
+                              bow_reduction(weapon, enemy_name))
+    return {"win": win, "expected_hp_lost": lost, "expected_turns": turns}
+
+def fight_odds(state, enemy):
+    """Odds for `state` fighting `enemy` right now (what an in-game UI would show)."""
+    return solve_fight(state.hp, state.total_attack(), state.crit_chance, state.current_weapon,
+                       enemy["name"], enemy["hp"], enemy["attack"], state.adrenaline_active)
+
+def find_enemy(name, area=None):
+    """Look up a regular or Search enemy by name (first match unless `area` is given)."""
+    for area_name, pool in AREA_ANIMALS.items():
+        if area and area_name.lower() != area.lower():
+            continue
+        for enemy in pool:
+            if enemy["name"].lower() == name.lower():
+                return enemy
+    for area_name, enemy in STRONG_ANIMALS.items():
+        if enemy["name"].lower() == name.lower() and (not area or area_name.lower() == area.lower()):
+            return enemy
+    return None
+
+
+# ===============================================
+#               The Ruined Titan
+# ===============================================
+ADRENALINE = "Adrenaline Shot"
+ADRENALINE_BONUS = 2               # boss_turn_start(): +2 attack for the turn after the shot
+
+class BossSolution:
+    """
+    Optimal policy for one loadout over every decision point: hp, boss hp,
+    burn turns left, the items still held and whether an Adrenaline Shot is
+    boosting this turn's swing. Items that heal the same amount are
+    interchangeable, so the held items are counted per heal amount (plus
+    Adrenaline Shots) and each move names which one to use.
+    """
+
+    def __init__(self, max_hp, attack, crit_chance, heals, counts, policy, start_values):
+        self.max_hp = max_hp
+        self.attack = attack
+        self.crit_chance = crit_chance
+        self.heals = heals                  # distinct heal amounts, ascending
+        self.counts = counts                # how many of each, then Adrenaline Shots
+        self.policy = policy                # bytearray: 0 = attack, j + 1 = heal heals[j], len(heals) + 1 = adrenaline
+        self.start_values = start_values    # [plain, boosted]: survival at full boss HP, no burn, all items, by hp
+
+    def _config(self, items):
+        """Mixed-radix index of a held-items multiset (item names; None = the full loadout)."""
+        if items is None:
+            held = self.counts
+        else:
+            held = [sum(1 for name in items if ITEM_HEAL.get(name) == amount) for amount in self.heals]
+            held.append(sum(1 for name in items if name == ADRENALINE))
+        config, stride = 0, 1
+        for n, most in zip(held, self.counts):
+            config += min(n, most) * stride
+            stride *= most + 1
+        return config
+
+    def _index(self, hp, boss_hp, burn_turns, config, boosted):
+        configs = 1
+        for most in self.counts:
+            configs *= most + 1
+        return ((((boss_hp - 1) * configs + config) * 2 + boosted) * (BURN_TURNS + 1) + burn_turns) \
+            * self.max_hp + (hp - 1)
+
+    def action(self, hp, boss_hp, burn_turns=0, items=None, boosted=False):
+        """
+        'attack', or the name of the item to use, at this decision point.
+        `items` lists the item names still held (default: the whole loadout);
+        `boosted` is True while an Adrenaline Shot powers this turn's swing.
+        """
+        hp = max(1, min(hp, self.max_hp))
+        move = self.policy[self._index(hp, boss_hp, burn_turns, self._config(items), int(boosted))]
+        if move == 0:
+            return "attack"
+        if move > len(self.heals):
+            return ADRENALINE
+        amount = self.heals[move - 1]
+        names = [name for name in (items or ITEM_HEAL) if ITEM_HEAL.get(name) == amount]
+        return names[0]
+
+    def survival(self, hp=None, boosted=False):
+        """Chance to beat the Titan from the start of the fight with `hp` (default: full);
+        boosted if an Adrenaline Shot was active when the fight began."""
+        hp = self.max_hp if hp is None else max(0, min(hp, self.max_hp))
+        return self.start_values[int(boosted)][hp]
+
+def solve_boss(max_hp, attack, crit_chance=0, items=(), use_cache=True):
+    """
+    Solve the Titan fight for this loadout (attack = total_attack(); items may
+    include healing items and Adrenaline Shots). Every move either lowers the
+    boss's HP or uses up an item, so one backward sweep in that order is
+    already the fixed point of value iteration.
+    """
+    amounts = [ITEM_HEAL[name] for name in items if name in ITEM_HEAL]
+    heals = tuple(sorted(set(amounts)))
+    counts = tuple(amounts.count(amount) for amount in heals) + (sum(1 for name in items if name == ADRENALINE),)
+    rules = (boss["hp"], tuple(PLASMA_DAMAGE), tuple(THERMAL_DAMAGE), BURN_TURNS, BURN_DAMAGE, ADRENALINE_BONUS)
+    key = hashlib.sha256(repr((max_hp, attack, crit_chance, heals, counts, rules)).encode("utf-8")).hexdigest()[:24]
+    path = os.path.join(BOSS_CACHE_DIR, f"{key}.pkl")
+    if use_cache and os.path.exists(path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    solution = _solve_boss(max_hp, attack, crit_chance, heals, counts)
+    if use_cache:
+        os.makedirs(BOSS_CACHE_DIR, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(solution, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    return solution
+
+def _solve_boss(max_hp, attack, crit_chance, heals, counts):
+    H, B = max_hp, boss["hp"]
+    swings = (player_damage_dist(attack, crit_chance),
+              player_damage_dist(attack + ADRENALINE_BONUS, crit_chance))
+    max_swing = swings[1][-1][0]
+    p_plasma = 0.5 / len(PLASMA_DAMAGE)
+    p_thermal = 0.5 / len(THERMAL_DAMAGE)
+
+    # Item moves per held-items config: (move code, config after, heal amount or None for adrenaline).
+    # Using an item lowers the config index, so configs are solved in ascending order.
+    strides = [1]
+    for most in counts:
+        strides.append(strides[-1] * (most + 1))
+    C = strides[-1]
+    moves = []
+    for config in range(C):
+        options = []
+        for j, stride in enumerate(strides[:-1]):
+            if config // stride % (counts[j] + 1):
+                options.append((j + 1, config - stride, heals[j] if j < len(heals) else None))
+        moves.append(options)
+    policy = bytearray(B * C * 2 * (BURN_TURNS + 1) * H)
+
+    # values[config][boosted][burn][hp] at the current boss HP; replies[b][config][burn][hp] =
+    # chance after the boss answers an attack that left it at b (kept for the last `max_swing` b)
+    replies = {}
+    values = None
+
+    for b in range(1, B + 1):
+        values = [[[[0.0] * (H + 1) for _ in range(BURN_TURNS + 1)] for _ in range(2)] for _ in range(C)]
+        for config in range(C):
+            for burn in range(BURN_TURNS + 1):
+                for hp in range(1, H + 1):
+                    # Items (then the next turn starts: burn ticks, no boss attack)
+                    item_best, item_move = -1.0, 0
+                    for move, after, amount in moves[config]:
+                        if amount is None:      # Adrenaline: next turn's swing is boosted
+                            value = _turn_start(values[after][1], hp, burn)
+                        else:
+                            value = _turn_start(values[after][0], min(H, hp + amount), burn)
+                        if value > item_best:
+                            item_best, item_move = value, move
+                    # Attack (a boosted swing needs an Adrenaline Shot, or one taken before the fight)
+                    for boosted in (0, 1) if counts[-1] or b == B else (0,):
+                        best = 0.0
+                        for dmg, p in swings[boosted]:
+                            if dmg >= b:
+                                best += p
+                            else:
+                                best += p * replies[b - dmg][config][burn][hp]
+                        move = 0
+                        if item_best > best:
+                            best, move = item_best, item_move
+                        values[config][boosted][burn][hp] = best
+                        policy[((((b - 1) * C + config) * 2 + boosted) * (BURN_TURNS + 1) + burn) * H
+                               + (hp - 1)] = move
+
+        # Chance of surviving the boss's reply at this boss HP, for attacks that leave it here
+        reply = []
+        for config in range(C):
+            vk = values[config][0]
+            per_burn = []
+            for burn in range(BURN_TURNS + 1):
+                row = [0.0] * (H + 1)
+                for hp in range(1, H + 1):
+                    total = 0.0
+                    for dmg in PLASMA_DAMAGE:
+                        total += p_plasma * _turn_start(vk, hp - dmg, burn)
+                    for dmg in THERMAL_DAMAGE:
+                        total += p_thermal * _turn_start(vk, hp - dmg, BURN_TURNS)
+                    row[hp] = total
+                per_burn.append(row)
+            reply.append(per_burn)
+        replies[b] = reply
+        replies.pop(b - max_swing, None)
+
+    start_values = [list(values[C - 1][0][0]), list(values[C - 1][1][0])]
+    return BossSolution(max_hp, attack, crit_chance, heals, counts, policy, start_values)
+
+def _turn_start(values_k, hp, burn):
+    """Value entering a new boss-fight turn: burn ticks first, then the player decides."""
+    if hp <= 0:
+        return 0.0
+    if burn > 0:
+        hp -= BURN_DAMAGE
+        if hp <= 0:
+            return 0.0
+        return values_k[burn - 1][hp]
+    return values_k[0][hp]
+
+def boss_odds(state):
+    """Survival chance against the Titan for this state's current loadout, playing optimally."""
+    items = [name for name in (*ITEM_HEAL, ADRENALINE) for _ in range(state.bag.get(name, 0))]
+    solution = solve_boss(state.max_hp, state.total_attack(), state.crit_chance, items)
+    return solution.survival(state.hp, state.adrenaline_active)
+
+
+# ===============================================
+# Entry
+# ===============================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exact fight odds and the optimal Titan policy.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    fight = sub.add_parser("fight", help="win chance for a regular fight")
+    fight.add_argument("enemy")
+    fight.add_argument("--area", help="pick the enemy from this area (e.g. two Wild Apes exist)")
+    fight.add_argument("--hp", type=int, default=60)
+    fight.add_argument("--attack", type=int, default=6, help="total attack incl. weapon bonus")
+    fight.add_argument("--crit", type=int, default=0, help="crit chance in percent")
+    fight.add_argument("--weapon", default="Fists")
+    fight.add_argument("--adrenaline", action="store_true")
+
+    titan = sub.add_parser("boss", help="optimal policy and survival chance vs The Ruined Titan")
+    titan.add_argument("--hp", type=int, default=None, help="starting HP (default: max HP)")
+    titan.add_argument("--max-hp", type=int, default=60)
+    titan.add_argument("--attack", type=int, default=6, help="total attack incl. weapon bonus")
+    titan.add_argument("--crit", type=int, default=0, help="crit chance in percent")
+    titan.add_argument("--items", default="",
+                       help="comma-separated healing items and Adrenaline Shots, e.g. Medkit,Fruit,Adrenaline Shot")
+    titan.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.command == "boss":
+        items = [name.strip() for name in args.items.split(",") if name.strip()]
+        unknown = [name for name in items if name not in ITEM_HEAL and name != ADRENALINE]
+        if unknown:
+            sys.exit(f"Not boss-fight items: {', '.join(unknown)}")
+        solution = solve_boss(args.max_hp, args.attack, args.crit, items, use_cache=not args.no_cache)
+        hp = args.max_hp if args.hp is None else args.hp
+        print(f"{boss['name']} vs HP {hp}/{args.max_hp}, ATK {args.attack}, crit {args.crit}%, "
+              f"items: {', '.join(items) or 'none'}")
+        print(f"Survival chance (optimal play): {solution.survival(hp):.4%}")
+        return
+
+    enemy = find_enemy(args.enemy, args.area)
+    if enemy is None:
+        sys.exit(f"Unknown enemy: {args.enemy}")
+    odds = solve_fight(args.hp, args.attack, args.crit, args.weapon,
+                       enemy["name"], enemy["hp"], enemy["attack"], args.adrenaline)
+    print(f"{enemy['name']} (HP {enemy['hp']}, ATK {enemy['attack']}) vs HP {args.hp}, ATK {args.attack}, "
+          f"crit {args.crit}%, {args.weapon}{' + Adrenaline' if args.adrenaline else ''}")
+    print(f"Win chance:        {odds['win']:.4%}")
+    print(f"Expected HP lost:  {odds['expected_hp_lost']:.2f}")
+    print(f"Expected turns:    {odds['expected_turns']:.2f}")
+
+if __name__ == "__main__":
+    main()
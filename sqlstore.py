@@ -0,0 +1,303 @@
+# ============================
+# SQLSTORE.PY - SQLite save backend
+# Drop-in alternative to storage.SlotStore for servers with many players:
+# every slot is one row (binary .sav encoding plus catalog columns) in a
+# WAL-mode database. Reads come from a small connection pool; writes go
+# through one writer connection and are committed in batches, which a
+# background thread closes once they are COMMIT_INTERVAL seconds old.
+#
+# Play:    python app.py --db saves.db
+# Import:  python sqlstore.py import [saves_dir] [--db saves.db]
+# Bench:   python sqlstore.py bench [--slots 2000]
+# ============================
+
+import argparse
+import os
+import queue
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from engine import GameState
+from saveformat import decode, encode
+from storage import SlotStore, slot_summary
+
+DEFAULT_DB = os.path.join("saves", "saves.db")
+POOL_SIZE = 4
+BATCH_SIZE = 64                 # appends per commit...
+COMMIT_INTERVAL = 0.5           # ...or seconds since the batch opened, whichever comes first
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS slots (
+    name   TEXT PRIMARY KEY,
+    data   BLOB NOT NULL,
+    level  INTEGER,
+    area   TEXT,
+    weapon TEXT,
+    mtime  REAL NOT NULL,
+    size   INTEGER NOT NULL
+)
+"""
+# Fixed SQL text so sqlite3's statement cache prepares each one once per connection
+UPSERT = ("INSERT INTO slots (name, data, level, area, weapon, mtime, size) VALUES (?, ?, ?, ?, ?, ?, ?) "
+          "ON CONFLICT(name) DO UPDATE SET data = excluded.data, level = excluded.level, area = excluded.area, "
+          "weapon = excluded.weapon, mtime = excluded.mtime, size = excluded.size")
+SELECT_DATA = "SELECT data FROM slots WHERE name = ?"
+SELECT_EXISTS = "SELECT 1 FROM slots WHERE name = ?"
+SELECT_CATALOG = "SELECT name, level, area, weapon, mtime, size FROM slots ORDER BY name COLLATE NOCASE"
+DELETE = "DELETE FROM slots WHERE name = ?"
+
+
+def connect(path):
+    conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False, cached_statements=64)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")   # WAL + NORMAL: a crash never corrupts, a commit survives the app dying
+    conn.execute("PRAGMA busy_timeout=5000")
+    return conn
+
+
+class ConnectionPool:
+    """Reusable read connections; get one with `with pool.connection() as conn:`."""
+
+    def __init__(self, path, size=POOL_SIZE):
+        self.path = path
+        self._idle = queue.LifoQueue()
+        for _ in range(size):
+            self._idle.put(connect(path))
+        self.size = size
+
+    @contextmanager
+    def connection(self):
+        conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        for _ in range(self.size):
+            self._idle.get().close()
+
+
+# ===============================================
+#                  SQLite Store
+# ===============================================
+class SQLiteSlotStore:
+    """
+    Same interface as storage.SlotStore. save() and delete() commit at once;
+    append() - called after every action - joins the open batch, which is
+    committed after BATCH_SIZE appends, by the committer thread once it is
+    COMMIT_INTERVAL seconds old (even if no append follows), and by
+    flush()/close(). A crash loses at most the appends of the last
+    COMMIT_INTERVAL seconds, and the write lock is never held longer.
+    """
+
+    def __init__(self, path=DEFAULT_DB, pool_size=POOL_SIZE, batch_size=BATCH_SIZE,
+                 commit_interval=COMMIT_INTERVAL):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.batch_size = batch_size
+        self.commit_interval = commit_interval
+        self._writer = connect(path)
+        self._writer.execute(SCHEMA)
+        self._lock = threading.Lock()
+        self._batch_due = threading.Condition(self._lock)
+        self._batch_started = None      # time the open transaction began, or None
+        self._batch_count = 0
+        self._pending = {}              # slot → snapshot written in the open batch
+        self._closed = False
+        self.pool = ConnectionPool(path, pool_size)
+        self._committer = threading.Thread(target=self._run_committer, name="sqlstore-commit", daemon=True)
+        self._committer.start()
+
+    # ---- Writes ----
+    def _write(self, slot, snapshot):
+        data = encode(snapshot)
+        summary = slot_summary(snapshot)
+        if self._batch_started is None:
+            self._writer.execute("BEGIN IMMEDIATE")
+            self._batch_started = time.monotonic()
+            self._batch_due.notify()
+        self._writer.execute(UPSERT, (slot, data, summary["level"], summary["area"], summary["weapon"],
+                                      time.time(), len(data)))
+        self._pending[slot] = snapshot
+        self._batch_count += 1
+
+    def _commit(self):
+        if self._batch_started is not None:
+            self._writer.execute("COMMIT")
+            self._batch_started = None
+            self._batch_count = 0
+            self._pending.clear()
+
+    def _run_committer(self):
+        """Commit each batch once it is commit_interval old, so the last appends don't wait for a next one."""
+        with self._lock:
+            while not self._closed:
+                if self._batch_started is None:
+                    self._batch_due.wait()
+                    continue
+                wait = self._batch_started + self.commit_interval - time.monotonic()
+                if wait > 0:
+                    self._batch_due.wait(wait)
+                else:
+                    self._commit()
+
+    def save(self, slot, snapshot):
+        with self._lock:
+            self._write(slot, snapshot)
+            self._commit()
+
+    def append(self, slot, snapshot):
+        with self._lock:
+            self._write(slot, snapshot)
+            if self._batch_count >= self.batch_size or \
+                    time.monotonic() - self._batch_started >= self.commit_interval:
+                self._commit()
+
+    def save_many(self, items):
+        """[(slot, snapshot), ...] in one transaction (importer, bulk tools)."""
+        with self._lock:
+            for slot, snapshot in items:
+                self._write(slot, snapshot)
+            self._commit()
+
+    def flush(self):
+        with self._lock:
+            self._commit()
+
+    def delete(self, slot):
+        with self._lock:
+            self._commit()
+            if self._writer.execute(DELETE, (slot,)).rowcount == 0:
+                raise FileNotFoundError(f"no save named '{slot}'")
+
+    # ---- Reads ----
+    def load(self, slot):
+        with self._lock:
+            if slot in self._pending:
+                return decode(encode(self._pending[slot]))   # a private copy, as if read back
+        with self.pool.connection() as conn:
+            row = conn.execute(SELECT_DATA, (slot,)).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"no save named '{slot}'")
+        return decode(row[0])
+
+    def exists(self, slot):
+        with self._lock:
+            if slot in self._pending:
+                return True
+        with self.pool.connection() as conn:
+            return conn.execute(SELECT_EXISTS, (slot,)).fetchone() is not None
+
+    def catalog(self, verify=False):
+        """Entries like SlotStore.catalog(); the columns are always current, so verify is a no-op."""
+        self.flush()
+        with self.pool.connection() as conn:
+            rows = conn.execute(SELECT_CATALOG).fetchall()
+        return [{"name": n, "level": lv, "area": area, "weapon": weapon, "mtime": mtime, "size": size}
+                for n, lv, area, weapon, mtime, size in rows]
+
+    def list(self):
+        return [entry["name"] for entry in self.catalog()]
+
+    def search(self, text):
+        text = text.lower()
+        return [e for e in self.catalog()
+                if text in e["name"].lower() or text in str(e["area"]).lower() or text in str(e["weapon"]).lower()]
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._batch_due.notify()
+        self._committer.join()
+        self.flush()
+        self._writer.close()
+        self.pool.close()
+
+
+# ===============================================
+#             Import & Benchmark
+# ===============================================
+def import_slots(save_dir, db_path):
+    """Copy every slot in a file-backed save dir into the database. Returns (imported, failures)."""
+    files = SlotStore(save_dir)
+    db = SQLiteSlotStore(db_path)
+    items, failures = [], []
+    for slot in files.list():
+        try:
+            items.append((slot, files.load(slot)))
+        except Exception as e:
+            failures.append((slot, str(e)))
+    db.save_many(items)
+    db.close()
+    return len(items), failures
+
+def bench(slots, snapshot):
+    """Save / load / list throughput of both backends over `slots` slots in a temp dir."""
+    results = {}
+    root = tempfile.mkdtemp(prefix="backwoods-bench-")
+    try:
+        for label, store in (("files", SlotStore(os.path.join(root, "files"))),
+                             ("sqlite", SQLiteSlotStore(os.path.join(root, "saves.db")))):
+            names = [f"slot{i:05d}" for i in range(slots)]
+            began = time.perf_counter()
+            for name in names:
+                store.save(name, snapshot)
+            save_s = time.perf_counter() - began
+
+            began = time.perf_counter()
+            for name in names:
+                store.append(name, dict(snapshot, xp=snapshot["xp"] + 1))
+            if hasattr(store, "flush"):
+                store.flush()
+            append_s = time.perf_counter() - began
+
+            began = time.perf_counter()
+            for name in names:
+                store.load(name)
+            load_s = time.perf_counter() - began
+
+            began = time.perf_counter()
+            for _ in range(20):
+                store.list()
+            list_s = (time.perf_counter() - began) / 20
+
+            results[label] = (save_s, append_s, load_s, list_s)
+            if hasattr(store, "close"):
+                store.close()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    print(f"{slots} slots            save/s    append/s     load/s    list (ms)")
+    for label, (save_s, append_s, load_s, list_s) in results.items():
+        print(f"  {label:<8} {slots / save_s:>12,.0f} {slots / append_s:>11,.0f} {slots / load_s:>10,.0f}"
+              f" {list_s * 1000:>12.2f}")
+
+
+# ===============================================
+# Entry
+# ===============================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SQLite save backend tools.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("import", help="copy JSON/.sav slots into the database")
+    p.add_argument("save_dir", nargs="?", default="saves")
+    p.add_argument("--db", default=DEFAULT_DB)
+    p = sub.add_parser("bench", help="compare with the file backend")
+    p.add_argument("--slots", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        imported, failures = import_slots(args.save_dir, args.db)
+        print(f"Imported {imported} slots from {args.save_dir} into {args.db}")
+        for slot, error in failures:
+            print(f"  ❌ {slot}: {error}")
+    else:
+        bench(args.slots, GameState().to_dict())
+
+if __name__ == "__main__":
+    main()
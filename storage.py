@@ -0,0 +1,499 @@
+# ============================
+# STORAGE.PY - Crash-safe save slots
+# Each slot is a binary snapshot (<slot>.sav, see saveformat.py) plus
+# an append-only journal (<slot>.journal) of small state deltas, one JSON
+# line per action. Loading replays snapshot + journal. Every so often the
+# journal is compacted into a fresh snapshot written to a temp file,
+# fsync'd and atomically renamed over the old one. Slots still in the
+# original <slot>.json format load fine and are converted on their next save.
+#
+# Every snapshot carries a generation number and every journal line the
+# generation it applies to. A full save bumps it, so journal lines left
+# behind by a crash between writing a snapshot and removing the old journal
+# are recognised as stale and skipped instead of replayed over the new state.
+#
+# A sidecar catalog (.catalog) keeps each slot's level, area, weapon, mtime
+# and size so menus can list slots without opening any of them.
+# ============================
+
+import copy
+import functools
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:                 # Windows: no advisory locks, so no shared stores
+    fcntl = None
+
+from map import areas
+from saveformat import decode, encode, load_json_save
+
+SNAPSHOT_EXT = ".sav"
+LEGACY_EXT = ".json"
+JOURNAL_EXT = ".journal"
+CATALOG_NAME = ".catalog"
+LOCK_DIR = ".locks"
+GENERATION_KEY = "journal_gen"  # in the snapshot's trailer (saveformat.py keeps unknown keys there)
+COMPACT_EVERY = 200             # journal entries before folding them into the snapshot
+COMPACT_BYTES = 256 * 1024      # ...or journal size, whichever comes first
+
+
+# ===============================================
+#                 State Deltas
+# ===============================================
+def diff_state(old, new):
+    """
+    Smallest delta turning snapshot `old` into `new`, or None if equal:
+    {"set": {key: value}, "patch": {dict_key: {sub_key: value or None}}}.
+    Values are absolute (never increments), so replaying a delta twice is harmless.
+    """
+    changed, patched = {}, {}
+    for key, value in new.items():
+        prev = old.get(key)
+        if prev == value and key in old:
+            continue
+        if isinstance(value, dict) and isinstance(prev, dict):
+            changes = {k: v for k, v in value.items() if prev.get(k) != v or k not in prev}
+            changes.update({k: None for k in prev if k not in value})
+            patched[key] = changes
+        else:
+            changed[key] = value
+    for key in old:
+        if key not in new:
+            changed[key] = None
+    if not changed and not patched:
+        return None
+    delta = {}
+    if changed:
+        delta["set"] = changed
+    if patched:
+        delta["patch"] = patched
+    return delta
+
+def apply_delta(snapshot, delta):
+    """Apply a diff_state() delta to `snapshot` in place."""
+    for key, value in delta.get("set", {}).items():
+        if value is None:
+            snapshot.pop(key, None)
+        else:
+            snapshot[key] = copy.deepcopy(value)
+    for key, changes in delta.get("patch", {}).items():
+        target = snapshot.get(key)
+        if not isinstance(target, dict):
+            target = snapshot[key] = {}
+        for k, v in changes.items():
+            if v is None:
+                target.pop(k, None)
+            else:
+                target[k] = copy.deepcopy(v)
+    return snapshot
+
+
+# ===============================================
+#                 Atomic Files
+# ===============================================
+def fsync_dir(path):
+    """Make a rename in `path` durable (no-op where directories can't be opened)."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def atomic_write(path, data):
+    """Write bytes to `path` so readers see either the old file or the new one, never half."""
+    tmp = f"{path}.tmp{os.getpid()}"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    fsync_dir(os.path.dirname(os.path.abspath(path)))
+
+
+# ===============================================
+#                 Reading Slots
+# ===============================================
+def read_slot(save_dir, slot, repair=False):
+    """
+    (snapshot, journal entries applied, generation) for a slot: its .sav (or
+    legacy .json) plus every complete journal line of the snapshot's
+    generation (0 for saves from before generations). A torn final line from
+    a crash is skipped, and with repair=True also cut off the journal file,
+    as is a journal holding only stale lines.
+    """
+    base = os.path.join(save_dir, slot)
+    try:
+        with open(base + SNAPSHOT_EXT, "rb") as f:
+            snapshot = decode(f.read())
+    except FileNotFoundError:
+        with open(base + LEGACY_EXT, "r", encoding="utf-8") as f:
+            snapshot = load_json_save(f.read())
+    generation = snapshot.pop(GENERATION_KEY, 0)
+    entries = stale = 0
+    try:
+        with open(base + JOURNAL_EXT, "r+b" if repair else "rb") as f:
+            good = 0
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("torn write")
+                    delta = json.loads(line)
+                except ValueError:
+                    if repair:
+                        f.truncate(good)   # later appends start on a clean line
+                    break
+                good += len(line)
+                if delta.pop("gen", 0) != generation:
+                    stale += 1   # written against an older snapshot
+                    continue
+                apply_delta(snapshot, delta)
+                entries += 1
+            if repair and stale and not entries:
+                f.truncate(0)
+    except FileNotFoundError:
+        pass
+    return snapshot, entries, generation
+
+
+# ===============================================
+#                 Slot Catalog
+# ===============================================
+def slot_summary(snapshot):
+    """The catalog fields that come from the save itself."""
+    index = snapshot.get("current_area_index", 0)
+    return {
+        "level": snapshot.get("lv", 1),
+        "area": areas[index]["name"] if 0 <= index < len(areas) else "?",
+        "weapon": snapshot.get("current_weapon", "Fists"),
+    }
+
+def slot_name(filename):
+    """Slot a file in the save dir belongs to, or None."""
+    for ext in (SNAPSHOT_EXT, LEGACY_EXT, JOURNAL_EXT):
+        if filename.lower().endswith(ext):
+            return filename[:-len(ext)]
+    return None
+
+
+# ===============================================
+#                  Slot Store
+# ===============================================
+def synchronized(method):
+    """Run a SlotStore method under the store's lock (the autosave thread shares it)."""
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return locked
+
+def slot_locked(method):
+    """Like synchronized, plus (for a shared store) the slot's lock file, so other processes wait too."""
+    @functools.wraps(method)
+    def locked(self, slot, *args, **kwargs):
+        with self.lock, self._slot_lock(slot):
+            return method(self, slot, *args, **kwargs)
+    return locked
+
+class SlotStore:
+    """
+    Save slots in `save_dir`. save() writes a full snapshot; append() journals
+    just what changed since the slot's last write and is cheap enough to call
+    after every action. shared=True is for several processes on one save dir:
+    writes to a slot hold an flock on .locks/<slot>.lock, and cached state is
+    re-checked against the files before it is trusted.
+    """
+
+    def __init__(self, save_dir, durable=True, shared=False):
+        if shared and fcntl is None:
+            raise RuntimeError("shared save dirs need fcntl (Unix)")
+        self.save_dir = save_dir
+        self.durable = durable          # fsync every journal append
+        self.shared = shared
+        self.lock = threading.RLock()
+        self._last = {}                 # slot → snapshot as of its last write
+        self._entries = {}              # slot → journal entries since the last compaction
+        self._generations = {}          # slot → generation of the snapshot on disk
+        self._stamps = {}               # slot → _file_stats() right after our last read/write (shared only)
+        self._lock_fds = {}             # slot → (fd, depth) of a held slot lock
+        self._catalog = None            # {"dir_mtime": ns, "slots": {slot: entry}, "lines": n}, loaded lazily
+
+    def snapshot_path(self, slot):
+        return os.path.join(self.save_dir, slot + SNAPSHOT_EXT)
+
+    def journal_path(self, slot):
+        return os.path.join(self.save_dir, slot + JOURNAL_EXT)
+
+    def legacy_path(self, slot):
+        return os.path.join(self.save_dir, slot + LEGACY_EXT)
+
+    @contextmanager
+    def _slot_lock(self, slot):
+        """Exclusive advisory lock on `slot` across processes; reentrant (compact → save)."""
+        if not self.shared:
+            yield
+            return
+        fd, depth = self._lock_fds.get(slot, (None, 0))
+        if fd is None:
+            os.makedirs(os.path.join(self.save_dir, LOCK_DIR), exist_ok=True)
+            fd = os.open(os.path.join(self.save_dir, LOCK_DIR, slot + ".lock"), os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        self._lock_fds[slot] = (fd, depth + 1)
+        try:
+            yield
+        finally:
+            if depth:
+                self._lock_fds[slot] = (fd, depth)
+            else:
+                del self._lock_fds[slot]
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+
+    def _stamp(self, slot):
+        if self.shared:
+            self._stamps[slot] = self._file_stats(slot)
+
+    @synchronized
+    def exists(self, slot):
+        return os.path.exists(self.snapshot_path(slot)) or os.path.exists(self.legacy_path(slot))
+
+    @synchronized
+    def list(self):
+        """Slot names, sorted case-insensitively."""
+        return [entry["name"] for entry in self.catalog()]
+
+    # ---- Catalog ----
+    @synchronized
+    def catalog(self, verify=False):
+        """
+        Catalog entries sorted by name: {"name", "level", "area", "weapon",
+        "mtime", "size"}. Trusted as-is while the save dir's mtime is unchanged
+        (no slot created, replaced or deleted); otherwise - or with verify=True,
+        which also catches journal appends by other processes - every file is
+        stat'ed and only slots whose mtime/size moved are re-read.
+        """
+        cat = self._load_catalog()
+        # Other processes sharing the dir append without touching its mtime: always verify
+        if verify or self.shared or cat["dir_mtime"] != self._dir_mtime():
+            self._rescan(cat)
+        return sorted(cat["slots"].values(), key=lambda e: e["name"].lower())
+
+    @synchronized
+    def search(self, text):
+        """Catalog entries whose name, area or weapon contains `text` (case-insensitive)."""
+        text = text.lower()
+        return [e for e in self.catalog()
+                if text in e["name"].lower() or text in str(e["area"]).lower() or text in str(e["weapon"]).lower()]
+
+    def _dir_mtime(self):
+        os.makedirs(self.save_dir, exist_ok=True)
+        return os.stat(self.save_dir).st_mtime_ns
+
+    # The catalog file is JSON lines of {"dir_mtime", "slot", "entry"} (entry None =
+    # deleted); later lines win. Updates append one line and the file is rewritten
+    # once it holds too many superseded lines. It is written in place, never
+    # renamed, so it doesn't bump the dir mtime it records; a torn catalog is
+    # only a cache miss and gets rebuilt.
+    def _load_catalog(self):
+        if self._catalog is None:
+            cat = {"dir_mtime": None, "slots": {}, "lines": 0}
+            try:
+                with open(os.path.join(self.save_dir, CATALOG_NAME), "r", encoding="utf-8") as f:
+                    for line in f:
+                        record = json.loads(line)
+                        cat["dir_mtime"] = record["dir_mtime"]
+                        if record.get("slot") is not None:
+                            if record["entry"] is None:
+                                cat["slots"].pop(record["slot"], None)
+                            else:
+                                cat["slots"][record["slot"]] = record["entry"]
+                        cat["lines"] += 1
+            except (OSError, ValueError, KeyError, TypeError):
+                cat = {"dir_mtime": None, "slots": {}, "lines": 0}   # missing or damaged: rebuild
+            self._catalog = cat
+        return self._catalog
+
+    def _write_catalog(self, changed=None):
+        """Persist the catalog: append lines for `changed` slots, or rewrite it all."""
+        cat = self._catalog
+        path = os.path.join(self.save_dir, CATALOG_NAME)
+        if not os.path.exists(path):
+            open(path, "w").close()
+            changed = None
+        cat["dir_mtime"] = self._dir_mtime()
+        if changed is None or cat["lines"] + len(changed) > 2 * len(cat["slots"]) + 64:
+            slots = list(cat["slots"]) or [None]
+            mode = "w"
+            cat["lines"] = 0
+        else:
+            slots = changed
+            mode = "a"
+        lines = [json.dumps({"dir_mtime": cat["dir_mtime"], "slot": slot,
+                             "entry": cat["slots"].get(slot) if slot is not None else None},
+                            separators=(",", ":")) + "\n" for slot in slots]
+        with open(path, mode, encoding="utf-8") as f:
+            f.write("".join(lines))
+        cat["lines"] += len(lines)
+
+    def _file_stats(self, slot):
+        stats = {}
+        for path in (self.snapshot_path(slot), self.legacy_path(slot), self.journal_path(slot)):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            stats[os.path.basename(path)] = [st.st_mtime_ns, st.st_size]
+        return stats
+
+    def _catalog_entry(self, slot, summary, stats):
+        return {"name": slot, **summary,
+                "mtime": max(m for m, _ in stats.values()) / 1e9 if stats else 0.0,
+                "size": sum(s for _, s in stats.values()),
+                "files": stats}
+
+    def _rescan(self, cat):
+        found = {}
+        for entry in os.scandir(self.save_dir):
+            slot = slot_name(entry.name)
+            if slot is not None and entry.is_file():
+                st = entry.stat()
+                found.setdefault(slot, {})[entry.name] = [st.st_mtime_ns, st.st_size]
+
+        slots = {}
+        for slot, stats in found.items():
+            if not os.path.exists(self.snapshot_path(slot)) and not os.path.exists(self.legacy_path(slot)):
+                continue   # an orphaned journal is not a slot
+            old = cat["slots"].get(slot)
+            if old is not None and old["files"] == stats:
+                slots[slot] = old
+                continue
+            try:
+                summary = slot_summary(self.load(slot))
+            except Exception as e:
+                summary = {"level": None, "area": None, "weapon": None, "error": str(e)}
+            slots[slot] = self._catalog_entry(slot, summary, self._file_stats(slot))
+        cat["slots"] = slots
+        self._write_catalog()
+
+    def _catalog_current(self):
+        """True if nobody has touched the save dir since the catalog was written."""
+        return self._load_catalog()["dir_mtime"] == self._dir_mtime()
+
+    def _catalog_update(self, slot, snapshot, was_current):
+        """Record our own write (snapshot None = deleted); rescan if others wrote too."""
+        cat = self._load_catalog()
+        if snapshot is None:
+            cat["slots"].pop(slot, None)
+        else:
+            cat["slots"][slot] = self._catalog_entry(slot, slot_summary(snapshot), self._file_stats(slot))
+        if was_current:
+            self._write_catalog([slot])
+        else:
+            self._rescan(cat)
+
+    def _generation(self, slot):
+        if self.shared and self._stamps.get(slot) != self._file_stats(slot):
+            self._generations.pop(slot, None)   # another process may have saved it since
+        if slot not in self._generations:
+            try:
+                self._generations[slot] = read_slot(self.save_dir, slot)[2]
+            except FileNotFoundError:
+                self._generations[slot] = 0
+        return self._generations[slot]
+
+    @slot_locked
+    def save(self, slot, snapshot):
+        """Full save: new snapshot on disk (atomically), journal emptied."""
+        os.makedirs(self.save_dir, exist_ok=True)
+        was_current = self._catalog_current()
+        generation = self._generation(slot) + 1
+        atomic_write(self.snapshot_path(slot), encode({**snapshot, GENERATION_KEY: generation}))
+        if os.path.exists(self.legacy_path(slot)):
+            os.remove(self.legacy_path(slot))   # now superseded by the .sav
+        # A crash before this leaves the old journal next to the new snapshot; its
+        # lines carry the old generation, so loading skips them.
+        if os.path.exists(self.journal_path(slot)):
+            os.remove(self.journal_path(slot))
+        self._generations[slot] = generation
+        self._last[slot] = copy.deepcopy(snapshot)
+        self._entries[slot] = 0
+        self._catalog_update(slot, snapshot, was_current)
+        self._stamp(slot)
+
+    @slot_locked
+    def append(self, slot, snapshot):
+        """Journal the difference between `snapshot` and what the slot holds now."""
+        if self.shared and self._stamps.get(slot) != self._file_stats(slot):
+            self._last.pop(slot, None)   # another process wrote it since: diff against the files
+        last = self._last.get(slot)
+        if last is None:
+            if not self.exists(slot):
+                self.save(slot, snapshot)
+                return
+            last = self.load(slot)
+        delta = diff_state(last, snapshot)
+        if delta is None:
+            return
+
+        line = json.dumps({"gen": self._generations[slot], **delta}, separators=(",", ":")) + "\n"
+        first = not os.path.exists(self.journal_path(slot))
+        was_current = self._catalog_current()
+        with open(self.journal_path(slot), "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            if self.durable:
+                os.fsync(f.fileno())
+            size = f.tell()
+        apply_delta(last, delta)
+        self._entries[slot] = self._entries.get(slot, 0) + 1
+        self._stamp(slot)
+        # Level, area and weapon rarely change; only then (or when the journal file is
+        # new) does the catalog get a line. Stats for plain appends catch up on verify.
+        entry = self._catalog["slots"].get(slot)
+        summary = slot_summary(last)
+        if was_current and (first or entry is None or any(entry.get(k) != v for k, v in summary.items())):
+            self._catalog["slots"][slot] = self._catalog_entry(slot, summary, self._file_stats(slot))
+            self._write_catalog([slot])
+
+        if self._entries[slot] >= COMPACT_EVERY or size >= COMPACT_BYTES:
+            self.compact(slot)
+
+    @slot_locked
+    def compact(self, slot):
+        """Fold the journal into a fresh snapshot."""
+        self.save(slot, self.load(slot))
+
+    @slot_locked
+    def load(self, slot):
+        """Snapshot with every complete journal entry replayed on top."""
+        snapshot, entries, generation = read_slot(self.save_dir, slot, repair=True)
+        self._last[slot] = copy.deepcopy(snapshot)
+        self._entries[slot] = entries
+        self._generations[slot] = generation
+        self._stamp(slot)
+        return snapshot
+
+    @slot_locked
+    def delete(self, slot):
+        paths = [p for p in (self.snapshot_path(slot), self.legacy_path(slot), self.journal_path(slot))
+                 if os.path.exists(p)]
+        if not paths:
+            raise FileNotFoundError(f"no save named '{slot}'")
+        was_current = self._catalog_current()
+        for path in paths:
+            os.remove(path)
+        self._last.pop(slot, None)
+        self._entries.pop(slot, None)
+        self._generations.pop(slot, None)
+        self._stamps.pop(slot, None)
+        self._catalog_update(slot, None, was_current)
@@ -0,0 +1,279 @@
+# ============================
+# SWEEP.PY - Monte Carlo playthrough sweeper
+# Plays many complete scripted games (Camp → City boss) on every CPU core
+# with the real engine rules, and reports how long the game takes.
+#
+# Usage:  python sweep.py [--runs 20000] [--workers N] [--seed 1] [--max-steps 5000] [--json report.json]
+# ============================
+
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from map import areas
+from engine import (
+    ADV_TRAP_COST,
+    CAMPFIRE_COST,
+    ITEM_HEAL,
+    MAX_TRAPS_TOTAL,
+    TRAP_COST,
+    WORKBENCH_COST,
+    GameEngine,
+    GameState,
+)
+
+AREA_NAMES = [a["name"] for a in areas]
+MIN_LEVEL_FOR_AREA = {"Forest": 2, "Highlands": 4, "Jungle": 6, "City": 8}
+CURVE_EVERY = 50                 # sample the bag every N actions
+CURVE_RESOURCES = ("Wood", "Stone", "Rope", "Fur", "Bones", "Scales", "Meat", "Fruit", "Food")
+BUCKET = 25                      # time-to-boss histogram bucket width (actions)
+
+engine = GameEngine()
+
+
+# ===============================================
+#                 Scripted Player
+# ===============================================
+def best_heal(state):
+    """Biggest healing item we own, or None."""
+    owned = [name for name in ITEM_HEAL if state.bag.get(name, 0) > 0]
+    return max(owned, key=ITEM_HEAL.get) if owned else None
+
+def next_gear(state):
+    """First affordable recipe that improves us: better weapon or armor we lack."""
+    best_bonus = max(w["bonus"] for w in state.weapons_inventory.values())
+    for kind, rec in state.gear_recipes():
+        if not state.have_in_bag(rec["cost"]):
+            continue
+        if kind == "weapon" and rec["bonus"] > best_bonus and rec["name"] not in state.weapons_inventory:
+            return rec["name"]
+        if kind == "armor" and state.max_hp < 200:
+            return rec["name"]
+    return None
+
+def scripted_action(state):
+    """A reasonable, deterministic player: heal when low, gear up, level evenly, push areas."""
+    fight = state.fight
+    if fight is not None:
+        heal = best_heal(state)
+        if heal and state.hp < state.max_hp * (0.45 if fight["boss"] else 0.35):
+            return {"type": "use_item", "item": heal}
+        if fight["allow_run"] and not fight["boss"] and state.hp < state.max_hp * 0.25:
+            return {"type": "run"}
+        return {"type": "attack"}
+
+    if state.pending_area is not None:
+        needed = MIN_LEVEL_FOR_AREA.get(AREA_NAMES[state.pending_area], 1)
+        return {"type": "advance", "accept": state.lv >= needed}
+
+    if state.can_level_up():
+        tiers = {"Strength": state.strength_level, "Endurance": state.endurance_level,
+                 "Survival": state.survival_level}
+        options = [path for path, _, _ in state.upgrade_choices()]
+        return {"type": "upgrade", "path": min(options, key=lambda p: (tiers[p], options.index(p)))}
+
+    # Equip the strongest weapon we own
+    strongest = max(state.weapons_inventory.values(), key=lambda w: w["bonus"])["name"]
+    if state.weapons_inventory[strongest]["bonus"] > state.weapons_inventory[state.current_weapon]["bonus"]:
+        return {"type": "equip", "weapon": strongest}
+
+    heal = best_heal(state)
+    if heal and state.hp < state.max_hp * 0.6:
+        return {"type": "use_item", "item": heal}
+
+    gear = next_gear(state)
+    if gear:
+        return {"type": "craft", "recipe": gear}
+    if state.buildings.get("Workbench", 0) == 0 and state.have_in_bag(WORKBENCH_COST):
+        return {"type": "craft", "recipe": "Workbench"}
+    if state.buildings.get("Campfire", 0) == 0 and state.have_in_bag(CAMPFIRE_COST):
+        return {"type": "craft", "recipe": "Campfire"}
+    if state.buildings.get("Campfire", 0) and state.bag.get("Meat", 0) >= 5:
+        return {"type": "cook"}
+    traps = state.buildings.get("Trap", 0) + state.buildings.get("Advanced Trap", 0)
+    if state.buildings.get("Workbench", 0) and state.have_in_bag(ADV_TRAP_COST) and \
+            (traps < MAX_TRAPS_TOTAL or state.buildings.get("Trap", 0)):
+        return {"type": "craft", "recipe": "Advanced Trap"}
+    if traps < MAX_TRAPS_TOTAL and state.have_in_bag(TRAP_COST):
+        return {"type": "craft", "recipe": "Trap"}
+
+    return {"type": "explore"}
+
+
+# ===============================================
+#                 Mergeable Stats
+# ===============================================
+class SweepStats:
+    """Running totals only, so workers can merge without shipping individual runs."""
+
+    def __init__(self):
+        self.runs = 0
+        self.wins = 0
+        self.actions = 0
+        self.to_boss_hist = {}        # bucket start → runs that first met the boss there
+        self.to_win_hist = {}         # bucket start → runs that won there
+        self.to_win_sum = 0
+        self.deaths = {name: 0 for name in AREA_NAMES}
+        self.fights = {name: 0 for name in AREA_NAMES}
+        self.curve_sums = {}          # sample index → {resource: total}
+        self.curve_counts = {}        # sample index → runs still playing
+
+    def add_run(self, result):
+        self.runs += 1
+        self.actions += result["actions"]
+        if result["to_boss"] is not None:
+            bucket = result["to_boss"] // BUCKET * BUCKET
+            self.to_boss_hist[bucket] = self.to_boss_hist.get(bucket, 0) + 1
+        if result["won_at"] is not None:
+            self.wins += 1
+            self.to_win_sum += result["won_at"]
+            bucket = result["won_at"] // BUCKET * BUCKET
+            self.to_win_hist[bucket] = self.to_win_hist.get(bucket, 0) + 1
+        for area, n in result["deaths"].items():
+            self.deaths[area] += n
+        for area, n in result["fights"].items():
+            self.fights[area] += n
+        for i, sample in enumerate(result["curve"]):
+            totals = self.curve_sums.setdefault(i, dict.fromkeys(CURVE_RESOURCES, 0))
+            for name in CURVE_RESOURCES:
+                totals[name] += sample.get(name, 0)
+            self.curve_counts[i] = self.curve_counts.get(i, 0) + 1
+
+    def merge(self, other):
+        self.runs += other.runs
+        self.wins += other.wins
+        self.actions += other.actions
+        self.to_win_sum += other.to_win_sum
+        for mine, theirs in ((self.to_boss_hist, other.to_boss_hist), (self.to_win_hist, other.to_win_hist),
+                             (self.deaths, other.deaths), (self.fights, other.fights),
+                             (self.curve_counts, other.curve_counts)):
+            for key, n in theirs.items():
+                mine[key] = mine.get(key, 0) + n
+        for i, totals in other.curve_sums.items():
+            mine = self.curve_sums.setdefault(i, dict.fromkeys(CURVE_RESOURCES, 0))
+            for name, n in totals.items():
+                mine[name] += n
+        return self
+
+    def report(self):
+        return {
+            "runs": self.runs,
+            "win_rate": self.wins / self.runs if self.runs else 0.0,
+            "mean_actions_to_win": self.to_win_sum / self.wins if self.wins else None,
+            "actions_to_first_boss": percentiles(self.to_boss_hist),
+            "actions_to_win": percentiles(self.to_win_hist),
+            "death_rate_per_fight": {area: (self.deaths[area] / self.fights[area] if self.fights[area] else 0.0)
+                                     for area in AREA_NAMES},
+            "deaths_per_run": {area: self.deaths[area] / self.runs if self.runs else 0.0 for area in AREA_NAMES},
+            "resource_curve": [
+                {"action": i * CURVE_EVERY, "runs": self.curve_counts[i],
+                 **{name: round(total / self.curve_counts[i], 2) for name, total in self.curve_sums[i].items()}}
+                for i in sorted(self.curve_sums)
+            ],
+        }
+
+def percentiles(hist, points=(50, 90, 99)):
+    """Approximate percentiles (bucket starts) from a histogram."""
+    total = sum(hist.values())
+    if not total:
+        return None
+    out = {}
+    for p in points:
+        target = total * p / 100
+        seen = 0
+        for bucket in sorted(hist):
+            seen += hist[bucket]
+            if seen >= target:
+                out[f"p{p}"] = bucket
+                break
+    return out
+
+
+# ===============================================
+#                 Playthroughs
+# ===============================================
+def play_once(seed, run_index, max_steps):
+    """One scripted game on its own RNG stream. Returns a small per-run summary."""
+    state = GameState(random.Random(f"backwoods-{seed}-{run_index}"))
+    result = {"actions": 0, "to_boss": None, "won_at": None,
+              "deaths": {}, "fights": {}, "curve": []}
+
+    for step in range(max_steps):
+        if step % CURVE_EVERY == 0:
+            result["curve"].append({name: state.bag.get(name, 0) for name in CURVE_RESOURCES})
+        area = state.area_name()
+        events = engine.step(state, scripted_action(state))
+        result["actions"] = step + 1
+
+        for ev in events:
+            kind = ev["type"]
+            if kind == "fight_start":
+                result["fights"][area] = result["fights"].get(area, 0) + 1
+                if ev["boss"] and result["to_boss"] is None:
+                    result["to_boss"] = step + 1
+            elif kind == "death":
+                result["deaths"][ev["area"]] = result["deaths"].get(ev["area"], 0) + 1
+            elif kind == "boss_defeated":
+                result["won_at"] = step + 1
+        if result["won_at"] is not None:
+            break
+    return result
+
+def run_chunk(seed, start, count, max_steps):
+    """Worker entry: play runs [start, start + count) and return merged stats only."""
+    stats = SweepStats()
+    for run_index in range(start, start + count):
+        stats.add_run(play_once(seed, run_index, max_steps))
+    return stats
+
+def sweep(runs, workers=None, seed=1, max_steps=5000, chunk=250):
+    workers = workers or os.cpu_count() or 1
+    total = SweepStats()
+    starts = range(0, runs, chunk)
+    if workers == 1:
+        for start in starts:
+            total.merge(run_chunk(seed, start, min(chunk, runs - start), max_steps))
+        return total
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_chunk, seed, start, min(chunk, runs - start), max_steps) for start in starts]
+        for future in futures:
+            total.merge(future.result())
+    return total
+
+
+# ===============================================
+# Entry
+# ===============================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo sweep of complete scripted playthroughs.")
+    parser.add_argument("--runs", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--max-steps", type=int, default=5000, help="give up on a run after this many actions")
+    parser.add_argument("--json", dest="json_out", help="also write the full report here")
+    args = parser.parse_args(argv)
+
+    began = time.perf_counter()
+    stats = sweep(args.runs, args.workers, args.seed, args.max_steps)
+    elapsed = time.perf_counter() - began
+    report = stats.report()
+    report["seconds"] = round(elapsed, 2)
+
+    print(f"{report['runs']} runs in {elapsed:.1f}s ({stats.actions / elapsed:,.0f} actions/s)")
+    print(f"Beat the Titan: {report['win_rate']:.1%}   mean actions to win: {report['mean_actions_to_win']}")
+    print(f"Actions to first boss fight: {report['actions_to_first_boss']}")
+    print(f"Actions to win:              {report['actions_to_win']}")
+    print("Deaths per fight by area:")
+    for area in AREA_NAMES:
+        print(f"  {area:<10} {report['death_rate_per_fight'][area]:.2%}  ({report['deaths_per_run'][area]:.2f} per run)")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json_out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+
+import api as api_module
+from api import GameAPI, HTTPError, HTTPServer
+from sessions import SessionManager
+
+
+@pytest.fixture
+def api(tmp_path):
+    return GameAPI(SessionManager(str(tmp_path)))
+
+def status(api, method, path, body=None):
+    try:
+        return api.route(method, path, {} if body is None else body)[0]
+    except HTTPError as e:
+        return e.status
+
+def new_session(api, seed=1):
+    code, reply = api.route("POST", "/sessions", {"seed": seed})
+    assert code == 201
+    return reply["session"]
+
+def test_session_lifecycle(api):
+    sid = new_session(api)
+    assert status(api, "GET", f"/sessions/{sid}") == 200
+    code, reply = api.route("POST", f"/sessions/{sid}/actions", {"type": "explore"})
+    assert code == 200 and reply["events"][0]["type"] == "explore" and "state" in reply
+    assert status(api, "DELETE", f"/sessions/{sid}") == 204
+    assert status(api, "GET", f"/sessions/{sid}") == 404
+    assert status(api, "POST", f"/sessions/{sid}/actions", {"type": "explore"}) == 404
+
+def test_command_lines(api):
+    sid = new_session(api)
+    code, reply = api.route("POST", f"/sessions/{sid}/actions", {"command": "explore"})
+    assert code == 200 and reply["text"]
+
+@pytest.mark.parametrize("method, path, expected", [
+    ("GET", "/", 404),
+    ("GET", "/nope", 404),
+    ("GET", "/sessions", 405),
+    ("PUT", "/sessions/{sid}", 405),
+    ("GET", "/sessions/{sid}/actions", 405),
+    ("POST", "/sessions/{sid}/other", 404),
+    ("POST", "/sessions/{sid}/actions/x/y", 404),
+    ("GET", "/sessions/unknown", 404),
+])
+def test_routing_errors(api, method, path, expected):
+    sid = new_session(api)
+    assert status(api, method, path.format(sid=sid), {"type": "explore"}) == expected
+
+@pytest.mark.parametrize("body", [
+    [1, 2],
+    {},
+    {"type": 5},
+    {"type": "boss"},
+    {"command": "boss"},
+    {"command": '{"type": "boss"}'},
+    {"command": "state"},
+    {"command": "{oops"},
+    {"type": "fly"},
+    {"type": "use_item", "item": [1]},
+    {"type": "equip", "weapon": {}},
+    {"type": "craft", "recipe": 3},
+    {"type": "upgrade", "path": ["Strength"]},
+    {"command": '{"type": "use_item", "item": {"a": 1}}'},
+])
+def test_bad_actions_are_400(api, body):
+    sid = new_session(api)
+    assert status(api, "POST", f"/sessions/{sid}/actions", body) == 400
+
+def test_bad_seed_is_400(api):
+    assert status(api, "POST", "/sessions", {"seed": "x"}) == 400
+
+def test_engine_key_error_is_not_a_404(api, monkeypatch):
+    sid = new_session(api)
+    def broken(state, action):
+        raise KeyError("Spear")
+    monkeypatch.setattr(api.engine, "step", broken)
+    with pytest.raises(KeyError):
+        api.route("POST", f"/sessions/{sid}/actions", {"type": "explore"})
+
+def test_session_closed_after_the_check_is_404(api, monkeypatch):
+    sid = new_session(api)
+    monkeypatch.setattr(type(api.sessions), "__contains__", lambda self, sid: True)
+    api.sessions.close(sid)
+    assert status(api, "GET", f"/sessions/{sid}") == 404
+
+def test_invalid_moves_are_events_not_errors(api):
+    sid = new_session(api)
+    code, reply = api.route("POST", f"/sessions/{sid}/actions", {"type": "advance", "accept": True})
+    assert code == 200 and reply["events"][0]["type"] == "invalid_action"
+
+
+def http_exchange(api, raw, wait=5.0):
+    """Send raw bytes to a real HTTPServer; returns everything it sends back before closing."""
+    async def run():
+        server = HTTPServer(api)
+        port = await server.start("127.0.0.1", 0)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(raw)
+        await writer.drain()
+        try:
+            return await asyncio.wait_for(reader.read(), wait)
+        finally:
+            writer.close()
+            await server.close()
+    return asyncio.run(run())
+
+def test_chunked_bodies_are_refused_and_the_connection_closed(api):
+    chunked = (b"POST /sessions HTTP/1.1\r\nHost: t\r\nTransfer-Encoding: chunked\r\n\r\n"
+               b"2\r\n{}\r\n0\r\n\r\n")
+    reply = http_exchange(api, chunked + b"GET /sessions HTTP/1.1\r\nHost: t\r\n\r\n")
+    assert reply.startswith(b"HTTP/1.1 501 Not Implemented\r\n")
+    assert b"Connection: close" in reply and reply.count(b"HTTP/1.1") == 1
+    assert api.requests == 0
+
+def test_bad_content_length_is_400(api):
+    reply = http_exchange(api, b"POST /sessions HTTP/1.1\r\nContent-Length: -5\r\n\r\n")
+    assert reply.startswith(b"HTTP/1.1 400 ")
+
+def test_slow_body_times_out(api, monkeypatch):
+    monkeypatch.setattr(api_module, "KEEPALIVE_TIMEOUT", 0.2)
+    reply = http_exchange(api, b"POST /sessions HTTP/1.1\r\nContent-Length: 10\r\n\r\n{}")
+    assert reply.startswith(b"HTTP/1.1 408 Request Timeout\r\n")
+    assert api.requests == 0
+
+def test_keep_alive_serves_several_requests(api):
+    one = b'POST /sessions HTTP/1.1\r\nContent-Length: 11\r\n\r\n{"seed": 1}'
+    reply = http_exchange(api, one + one + b"GET /nowhere HTTP/1.1\r\nConnection: close\r\n\r\n")
+    assert reply.count(b"HTTP/1.1 201 Created") == 2 and b"HTTP/1.1 404" in reply
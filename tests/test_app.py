@@ -0,0 +1,31 @@
+import app
+from engine import die
+
+
+def test_death_does_not_reset_twice(monkeypatch, capsys):
+    menus = []
+    monkeypatch.setattr(app, "go_to", menus.append)
+    monkeypatch.setattr(app, "show", lambda lines: None)
+    monkeypatch.setattr(app, "state", app.GameState())
+    app.state.bag["Wood"] = 3
+    events = []
+    die(app.state, "Wolf", events)
+    app.state.xp = 7            # a second reset would zero this
+    app.show_event(events[0])
+    assert menus == ["main"]
+    assert app.state.xp == 7 and app.state.bag == {"Wood": 3}
+    assert "Welcome To The Backwoods" in capsys.readouterr().out
+
+def test_autosave_slot_is_reserved(monkeypatch, capsys, tmp_path):
+    store = app.SlotStore(str(tmp_path))
+    store.save("autosave", app.GameState().to_dict())
+    store.save("mine", app.GameState().to_dict())
+    monkeypatch.setattr(app, "store", store)
+    monkeypatch.setattr(app, "ensure_save_dir", lambda: None)
+    monkeypatch.setattr(app, "devmode_active", False)
+    assert app.list_saves() == ["mine"]
+    answers = iter(["0", "AutoSave"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    app.save_game()
+    assert "reserved for autosaves" in capsys.readouterr().out
+    assert app.current_slot is None
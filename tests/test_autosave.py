@@ -0,0 +1,86 @@
+import threading
+import time
+
+import pytest
+
+from autosave import AutosaveWriter
+
+
+class FakeStore:
+    """Records append() calls; `gate` (if set) holds each write until released."""
+
+    def __init__(self, gate=None, fail=None):
+        self.writes = []
+        self.gate = gate
+        self.fail = fail
+        self.started = threading.Event()
+
+    def append(self, slot, snapshot):
+        self.started.set()
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.fail is not None and snapshot == self.fail:
+            raise OSError("disk full")
+        self.writes.append((slot, snapshot, time.monotonic()))
+
+
+def test_newer_snapshots_replace_waiting_ones():
+    gate = threading.Event()
+    store = FakeStore(gate)
+    writer = AutosaveWriter(store, min_interval=0)
+    writer.submit("a", 1)
+    store.started.wait(5)             # 1 is being written; the rest queue up behind it
+    for n in (2, 3, 4):
+        writer.submit("a", n)
+    writer.submit("b", 10)
+    gate.set()
+    writer.close()
+    assert [(slot, snap) for slot, snap, _ in store.writes] == [("a", 1), ("a", 4), ("b", 10)]
+    assert writer.coalesced == 2 and writer.written == 3
+
+def test_writes_are_spaced_by_min_interval():
+    store = FakeStore()
+    writer = AutosaveWriter(store, min_interval=0.2)
+    writer.submit("a", 1)
+    while not store.writes:
+        time.sleep(0.01)
+    writer.submit("a", 2)
+    deadline = time.monotonic() + 5
+    while len(store.writes) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    writer.close()
+    assert len(store.writes) == 2
+    assert store.writes[1][2] - store.writes[0][2] >= 0.19
+
+def test_flush_skips_the_wait_and_returns_once_written():
+    store = FakeStore()
+    writer = AutosaveWriter(store, min_interval=60)
+    writer.submit("a", 1)
+    writer.flush()
+    writer.submit("a", 2)             # would otherwise wait a minute
+    began = time.monotonic()
+    writer.flush()
+    assert time.monotonic() - began < 5
+    assert [snap for _, snap, _ in store.writes] == [1, 2]
+    writer.close()
+
+def test_close_writes_pending_and_stops():
+    store = FakeStore()
+    writer = AutosaveWriter(store, min_interval=60)
+    writer.submit("a", 1)
+    writer.submit("b", 2)
+    writer.close()
+    assert sorted(snap for _, snap, _ in store.writes) == [1, 2]
+    assert not writer._thread.is_alive()
+    with pytest.raises(RuntimeError):
+        writer.submit("a", 3)
+
+def test_failed_writes_are_reported_not_raised():
+    store = FakeStore(fail=1)
+    writer = AutosaveWriter(store, min_interval=0)
+    writer.submit("a", 1)
+    writer.flush()
+    writer.submit("a", 2)
+    writer.close()
+    assert writer.errors == [("a", "disk full")]
+    assert [snap for _, snap, _ in store.writes] == [2]
@@ -0,0 +1,53 @@
+import io
+import random
+
+import pytest
+
+from batch import main, parse_command, run_batch
+from engine import GameState
+
+
+@pytest.mark.parametrize("line, action", [
+    ("", None),
+    ("  # a comment", None),
+    ("state", "state"),
+    ("Explore", {"type": "explore"}),
+    ("traps", {"type": "check_traps"}),
+    ("use bandage", {"type": "use_item", "item": "Bandage"}),
+    ("craft", {"type": "craft", "recipe": None}),
+    ("advance y", {"type": "advance", "accept": True}),
+    ("advance no", {"type": "advance", "accept": False}),
+    ('{"type": "equip", "weapon": "Axe"}', {"type": "equip", "weapon": "Axe"}),
+])
+def test_parse_command(line, action):
+    assert parse_command(line) == action
+
+@pytest.mark.parametrize("line", ["{nope", "{\"type\": }"])
+def test_parse_command_bad_json(line):
+    with pytest.raises(ValueError):
+        parse_command(line)
+
+def test_run_batch_counts_and_errors():
+    out = io.StringIO()
+    commands, events, errors = run_batch(["explore", "", "{bad", "state"], GameState(random.Random(1)), out=out)
+    assert (commands, errors) == (2, 1)
+    assert len(out.getvalue().splitlines()) == events + errors
+
+def test_boss_is_rejected():
+    out = io.StringIO()
+    run_batch(["boss"], GameState(random.Random(1)), out=out)
+    assert '"reason":"unknown"' in out.getvalue()
+
+def test_seed_is_an_int(tmp_path, capsys):
+    commands = tmp_path / "cmds.txt"
+    commands.write_text("explore\nexplore\nsearch\n")
+    runs = []
+    for _ in range(2):
+        out = tmp_path / "events.jsonl"
+        with pytest.raises(SystemExit) as exit:
+            main([str(commands), "--seed", "7", "--out", str(out), "--final-state"])
+        assert exit.value.code == 0
+        runs.append(out.read_text())
+    assert runs[0] == runs[1]
+    with pytest.raises(SystemExit):
+        main([str(commands), "--seed", "seven"])
@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from checkpoints import CheckpointRing
+from engine import GameState
+
+
+def snapshot(xp, **changes):
+    state = GameState(random.Random(1))
+    state.add_to_bag("Wood", xp + 1)
+    return {**state.to_dict(), "xp": xp, **changes}
+
+def filled(count, capacity=64):
+    ring = CheckpointRing(capacity)
+    for xp in range(count):
+        assert ring.push(snapshot(xp), f"step {xp}")
+    return ring
+
+def test_get_rebuilds_every_checkpoint():
+    ring = filled(10)
+    assert len(ring) == 10
+    assert ring.labels()[:2] == ["step 9", "step 8"]
+    for n in range(10):
+        assert ring.get(n) == snapshot(9 - n)
+    with pytest.raises(IndexError):
+        ring.get(10)
+
+def test_unchanged_push_is_dropped():
+    ring = filled(3)
+    assert not ring.push(snapshot(2), "again")
+    assert len(ring) == 3
+
+def test_capacity_drops_the_oldest():
+    ring = filled(10, capacity=4)
+    assert len(ring) == 4
+    assert ring.get(3) == snapshot(6)
+
+def test_get_returns_a_copy():
+    ring = filled(2)
+    ring.get(0)["bag"]["Wood"] = 999
+    assert ring.get(0) == snapshot(1)
+
+def test_rewind_then_push():
+    ring = filled(6)
+    assert ring.rewind(2) == snapshot(3)
+    assert len(ring) == 4 and ring.labels()[0] == "step 3"
+    assert ring.get(1) == snapshot(2)
+    ring.push(snapshot(3, hp=1), "branch")
+    assert ring.labels()[:3] == ["branch", "step 3", "step 2"]
+    assert ring.get(1) == snapshot(3) and ring.get(4) == snapshot(0)
+
+def test_rewind_zero_keeps_everything():
+    ring = filled(3)
+    assert ring.rewind(0) == snapshot(2)
+    assert len(ring) == 3
+
+def test_rewind_to_the_oldest():
+    ring = filled(5)
+    assert ring.rewind(4) == snapshot(0)
+    assert len(ring) == 1 and ring.labels() == ["step 0"]
+
+def test_find_and_clear():
+    ring = filled(5)
+    assert ring.find(lambda label: label.endswith("1")) == 3
+    assert ring.find(lambda label: label == "nope") is None
+    ring.clear()
+    assert len(ring) == 0 and ring.labels() == [] and ring.size_bytes() == 0
@@ -0,0 +1,100 @@
+import json
+import random
+
+import pytest
+
+from engine import FIGHT_ACTIONS, GameEngine, GameState, start_boss_fight
+
+
+@pytest.fixture
+def engine():
+    return GameEngine()
+
+def new_state(seed=1):
+    return GameState(random.Random(seed))
+
+
+def test_step_returns_json_events(engine):
+    state = new_state()
+    for _ in range(50):
+        if state.pending_area is not None:
+            events = engine.step(state, {"type": "advance", "accept": False})
+        elif state.fight is not None:
+            events = engine.step(state, "attack")
+        else:
+            events = engine.step(state, "explore")
+        assert events and all(isinstance(ev["type"], str) for ev in events)
+        assert json.loads(json.dumps(events)) == events
+
+def test_string_action_is_shorthand(engine):
+    a, b = new_state(7), new_state(7)
+    assert engine.step(a, "explore") == engine.step(b, {"type": "explore"})
+    assert a.to_dict() == b.to_dict()
+
+def test_same_seed_same_events(engine):
+    runs = []
+    for _ in range(2):
+        state = new_state(42)
+        runs.append([engine.step(state, "search" if state.fight is None else "attack") for _ in range(30)])
+    assert runs[0] == runs[1]
+
+def test_state_round_trip():
+    state = new_state()
+    state.add_to_bag("Wood", 3)
+    state.buildings["Campfire"] = 1
+    state.xp, state.hp = 12, 40
+    copy = new_state()
+    copy.apply(json.loads(json.dumps(state.to_dict())))
+    assert copy.to_dict() == state.to_dict()
+
+@pytest.mark.parametrize("action", ["nope", {"type": None}, {"type": ["explore"]}, {}])
+def test_unknown_action(engine, action):
+    state = new_state()
+    before = state.to_dict()
+    events = engine.step(state, action)
+    assert [ev["type"] for ev in events] == ["invalid_action"]
+    assert events[0]["reason"] == "unknown"
+    assert state.to_dict() == before
+
+def test_boss_is_not_an_action(engine):
+    assert "boss" not in engine.handlers
+    assert "boss" not in FIGHT_ACTIONS
+    state = new_state()
+    assert engine.step(state, "boss")[0]["reason"] == "unknown"
+    assert state.fight is None
+
+def test_boss_cannot_replace_a_fight(engine):
+    state = new_state()
+    while state.fight is None:
+        engine.step(state, "search")
+    fight = state.fight
+    assert engine.step(state, "boss")[0]["reason"] == "in_fight"
+    assert state.fight is fight
+
+def test_menu_action_in_fight_is_rejected(engine):
+    state = new_state()
+    start_boss_fight(state, [])
+    events = engine.step(state, "explore")
+    assert events == [{"type": "invalid_action", "action": "explore", "reason": "in_fight"}]
+
+def test_pending_area_only_takes_advance(engine):
+    state = new_state()
+    state.pending_area = 1
+    assert engine.step(state, "explore")[0]["reason"] == "pending_area"
+    assert engine.step(state, {"type": "advance", "accept": True})[0]["type"] == "area_entered"
+    assert state.current_area_index == 1 and state.pending_area is None
+
+def test_advance_without_path(engine):
+    assert engine.step(new_state(), {"type": "advance", "accept": True})[0]["reason"] == "no_path"
+
+def test_death_resets_but_keeps_items(engine):
+    state = new_state(3)
+    state.add_to_bag("Wood", 5)
+    state.xp = 30
+    start_boss_fight(state, [])
+    state.hp = 1
+    events = []
+    while not any(ev["type"] == "death" for ev in events):
+        events = engine.step(state, "wait")
+    assert state.fight is None and state.hp == state.max_hp == 60 and state.xp == 0
+    assert state.bag["Wood"] == 5
@@ -0,0 +1,42 @@
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import fightsim
+import solver
+
+
+def rows_for(weapon, strength, adrenaline=False):
+    return [r for r in fightsim.grid()
+            if r["weapon"] == weapon and r["strength"] == strength and r["adrenaline"] == adrenaline
+            and r["level"] == strength + 1]
+
+@pytest.mark.parametrize("area, name, weapon, strength, adrenaline", [
+    ("Highlands", "Wild Ape", "Fists", 0, False),
+    ("Jungle", "Panther", "Bow", 0, False),        # Bow -1 vs non-flying
+    ("Highlands", "Eagle", "Bow", 0, False),       # ...but not vs flying
+    ("Jungle", "Crocodile", "Spear", 2, True),     # crits and adrenaline
+])
+def test_vectorised_fights_match_exact_odds(area, name, weapon, strength, adrenaline):
+    enemy = solver.find_enemy(name, area)
+    rows = rows_for(weapon, strength, adrenaline)
+    assert rows
+    fights = 20000
+    won, turns, hp_lost = fightsim.simulate_enemy(enemy, rows, fights, np.random.default_rng(7))
+    for i, row in enumerate(rows):
+        exact = solver.solve_fight(row["hp"], row["attack"], row["crit_chance"], row["weapon"],
+                                   enemy["name"], enemy["hp"], enemy["attack"])
+        p = exact["win"]
+        sigma = math.sqrt(max(p * (1 - p), 1e-4) / fights)
+        assert won[i].mean() == pytest.approx(p, abs=5 * sigma)
+        assert turns[i].mean() == pytest.approx(exact["expected_turns"], rel=0.02)
+        assert hp_lost[i].mean() == pytest.approx(exact["expected_hp_lost"], rel=0.03, abs=0.2)
+
+def test_table_is_cached_by_rules(tmp_path):
+    path = str(tmp_path / "table.npz")
+    first = fightsim.get_table(fights=20, seed=3, path=path)
+    again = fightsim.get_table(fights=20, seed=3, path=path)
+    assert np.array_equal(first["win_prob"], again["win_prob"])
+    assert len(first["enemy"]) == len(fightsim.all_enemies()) * len(fightsim.grid())
@@ -0,0 +1,91 @@
+import os
+import random
+import threading
+
+import pytest
+
+import history
+from engine import GameState
+from history import SaveHistory
+
+
+def snapshot(**changes):
+    state = GameState(random.Random(1))
+    state.add_to_bag("Wood", 4)
+    return {**state.to_dict(), **changes}
+
+@pytest.fixture
+def hist(tmp_path):
+    return SaveHistory(str(tmp_path))
+
+
+def test_record_and_get(hist):
+    first, second = snapshot(), snapshot(xp=40, bag={"Stone": 2})
+    assert hist.record("main", first) == 1
+    assert hist.record("main", second, "overwritten") == 2
+    assert hist.get("main", 1) == first and hist.get("main", 2) == second
+    assert [(v["n"], v["label"]) for v in hist.versions("main")] == [(1, "save"), (2, "overwritten")]
+    assert hist.slots() == ["main"]
+    with pytest.raises(KeyError):
+        hist.get("main", 3)
+
+def test_unchanged_save_is_not_a_version(hist):
+    assert hist.record("main", snapshot()) == 1
+    assert hist.record("main", snapshot(upgrade_amt=110.0)) is None   # 110.0 from a .sav equals 110
+    assert len(hist.versions("main")) == 1
+
+def test_versions_share_unchanged_parts(hist):
+    hist.record("main", snapshot())
+    before = hist.stats()["objects"]
+    hist.record("main", snapshot(bag={"Stone": 2}))
+    assert hist.stats()["objects"] == before + 2    # a new bag and a new root only
+    hist.record("other", snapshot())
+    assert hist.stats()["objects"] == before + 2    # same content as main v1: nothing new
+
+def test_prune_and_collect_garbage(hist):
+    for i in range(5):
+        hist.record("main", snapshot(xp=i, bag={"Stone": i + 1}))
+    hist.record("keep", snapshot(xp=0, bag={"Stone": 1}))   # shares everything with main v1
+    assert hist.prune("main", 2) == 3
+    assert [v["n"] for v in hist.versions("main")] == [4, 5]
+    removed, freed = hist.collect_garbage()
+    assert removed == 4 and freed > 0     # roots and bags of v2 and v3; v1's are still used by "keep"
+    assert hist.get("main", 4)["xp"] == 3 and hist.get("keep", 1)["bag"] == {"Stone": 1}
+    assert hist.prune("main", 0) == 2 and "main" not in hist.slots()
+    assert hist.prune("main", 3) == 0
+
+def test_prune_rejects_negative_keep(hist, capsys):
+    hist.record("main", snapshot())
+    with pytest.raises(ValueError):
+        hist.prune("main", -1)
+    with pytest.raises(SystemExit):
+        history.main(["--dir", os.path.dirname(hist.root), "prune", "--keep", "-1"])
+    assert "--keep must be 0 or more" in capsys.readouterr().err
+    assert len(hist.versions("main")) == 1
+
+@pytest.mark.skipif(history.fcntl is None, reason="needs fcntl")
+def test_collect_garbage_never_eats_a_version_being_recorded(hist, monkeypatch):
+    # Pause record() between writing its objects and appending the log line,
+    # and run a collection from another thread meanwhile.
+    objects_written, resume = threading.Event(), threading.Event()
+    real_versions = SaveHistory.versions
+    def versions(self, slot):
+        if threading.current_thread().name == "recorder":
+            objects_written.set()
+            resume.wait(5)
+        return real_versions(self, slot)
+    monkeypatch.setattr(SaveHistory, "versions", versions)
+
+    recorder = threading.Thread(target=hist.record, args=("main", snapshot()), name="recorder")
+    recorder.start()
+    objects_written.wait(5)
+    collected = []
+    collector = threading.Thread(target=lambda: collected.append(hist.collect_garbage()))
+    collector.start()
+    collector.join(0.2)
+    assert collector.is_alive()           # waiting on the lock
+    resume.set()
+    recorder.join(5)
+    collector.join(5)
+    assert collected == [(0, 0)]
+    assert hist.get("main", 1) == snapshot()
@@ -0,0 +1,69 @@
+import random
+from collections import Counter
+
+import pytest
+
+from api import summary
+from engine import GameEngine, GameState
+from loadtest import REFUSED_EVENTS, LoadStats, VirtualPlayer, assign_profiles, parse_mix, percentiles
+
+
+def play(profile, seed, steps):
+    """Drive a VirtualPlayer straight through the engine; returns (labels, stats)."""
+    engine, state = GameEngine(), GameState(random.Random(seed))
+    player, stats, labels = VirtualPlayer(profile, seed), LoadStats(), []
+    for _ in range(steps):
+        label, action = player.next_action(summary(state))
+        labels.append(label)
+        if action is not None:
+            stats.events(engine.step(state, action))
+    return labels, stats
+
+
+def test_boss_runner_only_sends_actions_the_game_accepts():
+    for seed in range(5):
+        labels, stats = play("boss", seed, 400)
+        assert stats.rejected == 0
+        assert "view" not in labels and "attack" in labels
+
+def test_profiles_follow_their_menus():
+    explorer, _ = play("explorer", 1, 300)
+    crafter, _ = play("crafter", 1, 300)
+    assert "view" in explorer and "craft" not in explorer
+    assert "craft" in crafter
+
+def test_next_action_answers_what_the_game_asks():
+    state = summary(GameState(random.Random(0)))
+    player = VirtualPlayer("explorer", 0)
+    assert player.next_action({**state, "fight": {"boss": False, "allow_run": True}})[0] == "attack"
+    assert player.next_action({**state, "hp": 2, "fight": {"boss": False, "allow_run": True}})[0] == "run"
+    assert player.next_action({**state, "pending_area": True})[0] == "advance"
+    offered = [{"path": "Strength"}, {"path": "Endurance"}]
+    paths = [player.next_action({**state, "level_up": offered})[1]["path"] for _ in range(3)]
+    assert paths == ["Strength", "Endurance", "Strength"]
+    assert player.next_action({**state, "weapons": ["Fists", "Axe"]}) == ("equip", {"type": "equip", "weapon": "Axe"})
+
+def test_every_refusal_counts_as_rejected():
+    stats = LoadStats()
+    stats.events([{"type": kind} for kind in REFUSED_EVENTS] + [{"type": "explore"}])
+    assert stats.rejected == len(REFUSED_EVENTS)
+    assert {"missing_materials", "no_building", "already_built", "trap_limit", "cook_failed",
+            "cannot_run", "already_owned", "already_equipped"} <= REFUSED_EVENTS
+
+def test_assign_profiles_matches_mix():
+    players, counts = assign_profiles(101, parse_mix("explorer=60,crafter=25,boss=15"), seed=3)
+    assert len(players) == 101 and sum(counts.values()) == 101
+    assert counts == {"explorer": 61, "crafter": 25, "boss": 15}
+    assert Counter(profile for profile, _ in players) == counts
+    assert len({seed for _, seed in players}) == 101
+    assert assign_profiles(101, parse_mix("explorer=60,crafter=25,boss=15"), seed=3)[0] == players
+
+def test_parse_mix_rejects_unknown_profiles():
+    assert parse_mix("boss") == {"boss": 1.0}
+    with pytest.raises(ValueError):
+        parse_mix("tourist=5")
+
+def test_percentiles():
+    assert percentiles([]) == {"count": 0}
+    p = percentiles([i / 1000 for i in range(100, 0, -1)])   # 1..100 ms, unsorted
+    assert p == {"count": 100, "p50": 51.0, "p95": 96.0, "p99": 100.0, "max": 100.0, "mean": 50.5}
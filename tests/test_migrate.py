@@ -0,0 +1,86 @@
+import json
+import os
+import sqlite3
+
+import pytest
+
+from engine import GameState
+from migrate import main, migrate, validate
+from saveformat import decode, export_json, load_json_save
+from storage import SlotStore
+
+GOOD = 30
+
+
+@pytest.fixture
+def saves(tmp_path):
+    """A save dir with GOOD valid slots and one, "broken", that is not a real area."""
+    src = tmp_path / "saves"
+    store = SlotStore(str(src))
+    for i in range(GOOD):
+        snapshot = GameState().to_dict()
+        snapshot.update(lv=i + 1, xp=i * 7)
+        store.save(f"slot{i:02}", snapshot)
+    broken = {**GameState().to_dict(), "current_area_index": 99}
+    (src / "broken.json").write_text(export_json(broken), encoding="utf-8")
+    return src
+
+def test_validate():
+    assert validate(GameState().to_dict()) == []
+    problems = validate({**GameState().to_dict(), "hp": "full", "current_weapon": "Laser"})
+    assert len(problems) == 2 and "hp" in problems[0] and "Laser" in problems[1]
+
+
+@pytest.mark.parametrize("fmt, ext", [("json", ".json"), ("binary", ".sav")])
+def test_convert_to_files(saves, tmp_path, fmt, ext):
+    dst = tmp_path / "out"
+    totals = migrate(str(saves), str(dst), fmt, workers=1)
+    assert (totals["slots"], totals["done"], totals["skipped"]) == (GOOD + 1, GOOD, 0)
+    assert [slot for slot, _ in totals["failures"]] == ["broken"]
+    assert sorted(os.listdir(dst)) == [f"slot{i:02}{ext}" for i in range(GOOD)]
+    data = (dst / f"slot07{ext}").read_bytes()
+    snapshot = load_json_save(data.decode("utf-8")) if fmt == "json" else decode(data)
+    assert (snapshot["lv"], snapshot["xp"]) == (8, 49)
+
+def test_convert_to_sqlite_and_resume(saves, tmp_path):
+    db = str(tmp_path / "out.db")
+    assert migrate(str(saves), db, "sqlite", workers=2)["done"] == GOOD
+    conn = sqlite3.connect(db)
+    assert conn.execute("SELECT COUNT(*) FROM slots").fetchone()[0] == GOOD
+    conn.close()
+    totals = migrate(str(saves), db, "sqlite", workers=1, resume=True)
+    assert (totals["done"], totals["skipped"], len(totals["failures"])) == (0, GOOD, 1)
+
+def test_failure_report_and_resume(saves, tmp_path, capsys):
+    dst, report = tmp_path / "out", tmp_path / "failures.json"
+    argv = [str(saves), str(dst), "--to", "binary", "--workers", "2", "--report", str(report)]
+    with pytest.raises(SystemExit) as exc:
+        main(argv)
+    assert exc.value.code == 1
+    failures = json.loads(report.read_text(encoding="utf-8"))
+    assert [f["slot"] for f in failures] == ["broken"] and "current_area_index 99" in failures[0]["error"]
+    assert f"{GOOD} converted" in capsys.readouterr().out
+
+    # Resuming redoes only what is missing or out of date: the broken slot, and a slot saved since
+    later = os.stat(dst / "slot03.sav").st_mtime + 5
+    os.utime(saves / "slot03.sav", (later, later))
+    with pytest.raises(SystemExit) as exc:
+        main(argv + ["--resume"])
+    assert exc.value.code == 1
+    assert f"1 converted, {GOOD - 1} already up to date, 1 failed of {GOOD + 1} slots" in capsys.readouterr().out
+
+def test_stale_temp_files_are_swept(saves, tmp_path, capsys):
+    dst = tmp_path / "out"
+    dst.mkdir()
+    (dst / "slot01.sav.tmp4242").write_bytes(b"half a save")
+    (dst / "notes.tmp").write_text("not ours")
+    with pytest.raises(SystemExit):
+        main([str(saves), str(dst), "--to", "binary", "--workers", "1"])
+    assert "Removed 1 temp files" in capsys.readouterr().out
+    assert not (dst / "slot01.sav.tmp4242").exists() and (dst / "notes.tmp").exists()
+    assert len([n for n in os.listdir(dst) if n.endswith(".sav")]) == GOOD
+
+def test_sqlite_needs_a_db_destination(saves, tmp_path):
+    with pytest.raises(SystemExit) as exc:
+        main([str(saves), str(tmp_path / "out"), "--to", "sqlite"])
+    assert "DST must be a .db file" in str(exc.value.code)
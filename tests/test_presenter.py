@@ -0,0 +1,113 @@
+import asyncio
+import io
+import time
+
+import pytest
+
+import presenter
+from narration import Typed
+from presenter import Reveal, duration, present, steps
+
+
+def test_steps_scale_with_speed():
+    script = ["a", 1.0, "b", Typed("cd", 0.5)]
+    # a Typed line waits after every character, its end included
+    assert steps(script, "cinematic") == [(0.0, "a\n"), (1.0, "b\nc"), (0.5, "d"), (0.5, "\n")]
+    assert steps(script, "fast") == [(0.0, "a\n"), (0.25, "b\nc"), (0.125, "d"), (0.125, "\n")]
+    assert duration(script, "fast") == pytest.approx(0.5)
+
+def test_text_without_delays_is_merged():
+    assert steps(["a", 0, "b", Typed("cd", 0), 2.0, "e"], "instant") == [(0.0, "a\nb\ncd\ne\n")]
+    assert steps(["a", 0, "b"], "cinematic") == [(0.0, "a\nb\n")]
+    assert steps(["a", 1.0], "cinematic") == [(0.0, "a\n"), (1.0, "")]   # a trailing pause still counts
+    assert steps([], "cinematic") == []
+
+
+def run_reveal(script, speed, during=None):
+    """Play a Reveal on a fresh loop; returns [(seconds since start, text), ...]."""
+    async def run():
+        loop = asyncio.get_running_loop()
+        began, writes, finished = loop.time(), [], asyncio.Event()
+        reveal = Reveal(script, speed, lambda text: writes.append((loop.time() - began, text)), finished.set)
+        reveal.start(loop)
+        if during is not None:
+            during(reveal)
+        await asyncio.wait_for(finished.wait(), 5)
+        return writes
+    return asyncio.run(run())
+
+def test_reveal_catches_up_after_a_late_loop():
+    # The loop is blocked past "b" and "c": both go out in one write, and "d"
+    # still lands on the script's own clock instead of being pushed back.
+    script = ["a", 0.05, "b", 0.05, "c", 0.4, "d"]
+    writes = run_reveal(script, "cinematic", during=lambda reveal: time.sleep(0.25))
+    assert [text for _, text in writes] == ["a\n", "b\nc\n", "d\n"]
+    assert writes[1][0] >= 0.25
+    assert writes[2][0] == pytest.approx(0.5, abs=0.08)
+
+def test_reveal_skip_writes_the_rest_once():
+    done = []
+    async def run():
+        loop = asyncio.get_running_loop()
+        writes = []
+        reveal = Reveal(["a", 10.0, "b", 10.0, "c"], "cinematic", writes.append, lambda: done.append(1)).start(loop)
+        reveal.skip()
+        reveal.skip()
+        await asyncio.sleep(0.05)
+        return writes, reveal.done
+    writes, finished = asyncio.run(run())
+    assert writes == ["a\n", "b\nc\n"] and finished and done == [1]
+
+def test_reveal_cancel_writes_nothing_more():
+    async def run():
+        writes = []
+        reveal = Reveal(["a", 0.02, "b"], "cinematic", writes.append).start()
+        reveal.cancel()
+        await asyncio.sleep(0.1)
+        return writes
+    assert asyncio.run(run()) == ["a\n"]
+
+
+class FakeKeys:
+    """Stands in for KeyWatcher: records waits, and `pressed` says whether a key came."""
+    waits = []
+
+    def __init__(self, pressed=False):
+        self.pressed = pressed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def wait(self, seconds):
+        FakeKeys.waits.append(seconds)
+        return self.pressed
+
+@pytest.mark.parametrize("script, speed, expected", [
+    ([], "cinematic", ""),
+    (["a", 1.0, Typed("bc", 0.5)], "instant", "a\nbc\n"),
+    (["a", 0, "b"], "cinematic", "a\nb\n"),
+])
+def test_present_skips_the_key_watcher_without_delays(monkeypatch, script, speed, expected):
+    def no_watcher(*args, **kwargs):
+        raise AssertionError("KeyWatcher entered for a plan with nothing to wait for")
+    monkeypatch.setattr(presenter, "KeyWatcher", no_watcher)
+    out = io.StringIO()
+    present(script, speed, out)
+    assert out.getvalue() == expected
+
+def test_present_waits_and_a_key_skips_the_rest(monkeypatch):
+    script = ["a", 1.0, "b", 2.0, "c"]
+    FakeKeys.waits = []
+    monkeypatch.setattr(presenter, "KeyWatcher", lambda: FakeKeys(pressed=False))
+    out = io.StringIO()
+    present(script, "fast", out)
+    assert out.getvalue() == "a\nb\nc\n" and FakeKeys.waits == [0.25, 0.5]
+
+    FakeKeys.waits = []
+    monkeypatch.setattr(presenter, "KeyWatcher", lambda: FakeKeys(pressed=True))
+    out = io.StringIO()
+    present(script, "cinematic", out)
+    assert out.getvalue() == "a\nb\nc\n" and FakeKeys.waits == [1.0]
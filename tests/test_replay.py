@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+from batch import parse_command
+from engine import GameEngine, GameState
+from replay import SessionRecorder, diff_snapshots, format_command, main, read_log, replay
+
+ACTIONS = ["explore", "search", "attack", "attack", "run", "wait", "check_traps",
+           {"type": "craft", "recipe": "Trap"}, {"type": "use_item", "item": "Bandage"}, "cook"]
+
+
+def record_session(path, seed, tamper_at=()):
+    """Play a seeded session the way app.py does, changing the state by hand at `tamper_at` turns."""
+    engine, state = GameEngine(), GameState(random.Random(seed))
+    recorder = SessionRecorder(path, seed)
+    picker = random.Random(seed + 1)
+    for turn in range(200):
+        if turn in tamper_at:   # what a dev command or a loaded save does: no engine action
+            state.hp = max(1, state.hp // 2)
+            state.bag["Bandage"] = state.bag.get("Bandage", 0) + 2
+        action = "attack" if state.fight is not None and picker.random() < 0.7 else picker.choice(ACTIONS)
+        if state.pending_area is not None:
+            action = {"type": "advance", "accept": picker.random() < 0.5}
+        recorder.before(state, action)
+        engine.step(state, action)
+        recorder.after(state)
+        if not state.alive:
+            break
+    recorder.close(state)
+    return state
+
+
+@pytest.mark.parametrize("action", [
+    "explore", {"type": "attack"}, {"type": "use_item", "item": "Bandage"},
+    {"type": "craft", "recipe": None}, {"type": "advance", "accept": False},
+    {"type": "equip", "weapon": "  Axe"}, {"type": "explore", "extra": 1},
+])
+def test_format_command_round_trips(action):
+    expected = {"type": action} if isinstance(action, str) else action
+    assert parse_command(format_command(action)) == expected
+
+def test_round_trip_matches_the_final_state(tmp_path):
+    path = tmp_path / "session.log"
+    played = record_session(str(path), seed=7)
+    seed, entries, final = read_log(str(path))
+    assert seed == 7 and final == played.to_dict()
+    assert not any(type(e) is tuple for e in entries[1:])   # only the opening snapshot: nothing left the engine
+    assert diff_snapshots(replay(seed, entries).to_dict(), final) == []
+
+def test_out_of_engine_changes_are_snapshotted(tmp_path):
+    path = tmp_path / "session.log"
+    played = record_session(str(path), seed=11, tamper_at=(5, 40))
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert sum(line.startswith("=") for line in lines) == 3   # the start, then each hand edit
+    seed, entries, final = read_log(str(path))
+    assert diff_snapshots(replay(seed, entries).to_dict(), final) == []
+    assert final == played.to_dict()
+
+    # Without the snapshot lines the replay drifts, and the final check catches it
+    path.write_text("\n".join(lines[:1] + [l for l in lines[2:] if not l.startswith("=")]) + "\n", encoding="utf-8")
+    seed, entries, final = read_log(str(path))
+    assert diff_snapshots(replay(seed, entries).to_dict(), final) != []
+    with pytest.raises(SystemExit) as exc:
+        main([str(path)])
+    assert exc.value.code == 1
+
+def test_main_reports_a_match(tmp_path, capsys):
+    path = tmp_path / "session.log"
+    record_session(str(path), seed=3, tamper_at=(10,))
+    main([str(path), "--repeat", "2"])
+    assert "matches the recording" in capsys.readouterr().err
+
+def test_read_log_rejects_other_files(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("explore\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        read_log(str(path))
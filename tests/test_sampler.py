@@ -0,0 +1,106 @@
+import copy
+import json
+import pickle
+import random
+from collections import Counter
+
+import pytest
+
+import engine
+from sampler import AliasTable, TableCache, edit_count, tracked
+
+
+def test_alias_table_matches_weights():
+    table = AliasTable([("a", 1), ("b", 3), ("c", 0)])
+    rng = random.Random(5)
+    counts = Counter(table.sample(rng) for _ in range(40000))
+    assert counts["c"] == 0
+    assert counts["b"] / counts["a"] == pytest.approx(3, rel=0.05)
+
+def test_alias_table_draw_matches_sample():
+    table = AliasTable([("a", 1), ("b", 3), ("c", 0)])
+    picks = table.draw(40000, random.Random(5))
+    assert len(picks) == 40000
+    assert picks[:50] == [table.sample(rng) for rng in [random.Random(5)] for _ in range(50)]
+    counts = Counter(picks)
+    assert counts["c"] == 0
+    assert counts["b"] / counts["a"] == pytest.approx(3, rel=0.05)
+
+def test_alias_table_zero_weights_pick_last():
+    assert AliasTable([("a", 0), ("b", 0)]).sample(random.Random(1)) == "b"
+
+def test_alias_table_needs_pairs():
+    with pytest.raises(ValueError):
+        AliasTable([])
+
+def test_table_cache_rebuilds_after_tracked_edit():
+    builds = []
+    cache = TableCache(lambda key, source: builds.append(key) or AliasTable(source))
+    source = tracked([("x", 1)])
+    first = cache.get("k", source)
+    assert cache.get("k", source) is first
+    source.append(("y", 1))
+    second = cache.get("k", source)
+    assert second is not first and second.keys == ["x", "y"]
+    source[1] = ("z", 1)
+    assert cache.get("k", source).keys == ["x", "z"]
+    assert cache.get("k", [("x", 1)]).keys == ["x"]
+    assert builds == ["k"] * 4
+
+def test_table_cache_plain_source_needs_invalidate():
+    cache = TableCache(lambda key, source: AliasTable(source))
+    source = [("x", 1)]
+    first = cache.get("k", source)
+    source.append(("y", 1))
+    assert cache.get("k", source) is first
+    cache.invalidate("k")
+    assert cache.get("k", source).keys == ["x", "y"]
+
+def test_tracked_sees_nested_edits():
+    table = tracked({"a": [("x", 1)], "w": {"areas": {"Camp"}}})
+    edits = [
+        lambda: table["a"].__setitem__(0, ("x", 2)),
+        lambda: table["w"]["areas"].add("Forest"),
+        lambda: table.__setitem__("b", [("y", 1)]),
+        lambda: table["b"].append(("z", 1)),   # values stored later are tracked too
+        lambda: table["w"]["areas"].__ior__({"Jungle"}),
+    ]
+    for edit in edits:
+        before = edit_count()
+        edit()
+        assert edit_count() > before
+    assert table == {"a": [("x", 2)], "b": [("y", 1), ("z", 1)],
+                     "w": {"areas": {"Camp", "Forest", "Jungle"}}}
+
+def test_tracked_tables_copy_and_serialize():
+    table = tracked({"a": [("x", 1)], "s": {"k"}})
+    assert pickle.loads(pickle.dumps(table)) == table
+    assert copy.deepcopy(table) == table
+    assert json.loads(json.dumps({"a": table["a"]})) == {"a": [["x", 1]]}
+
+def test_engine_samplers_follow_in_place_edits():
+    pairs = engine.RESOURCE_TABLE["Camp"]
+    saved = list(pairs)
+    try:
+        engine.resource_sampler("Camp")
+        pairs[:] = [("Wood", 1)]
+        assert engine.resource_sampler("Camp").draw(20, random.Random(0)) == ["Wood"] * 20
+    finally:
+        pairs[:] = saved
+    assert engine.resource_sampler("Camp").keys == [name for name, _ in saved]
+
+    areas = engine.FINDABLE_WEAPONS["Axe"]["areas"]
+    areas.add("Camp")
+    try:
+        assert "Axe" in engine.weapon_sampler("Camp").keys
+    finally:
+        areas.discard("Camp")
+    assert "Axe" not in engine.weapon_sampler("Camp").keys
+
+    pool = engine.AREA_ANIMALS["Camp"]
+    pool.append(engine.STRONG_ANIMALS["Camp"])
+    try:
+        assert len(engine.encounter_sampler("Camp").keys) == len(pool)
+    finally:
+        pool.pop()
+    assert len(engine.encounter_sampler("Camp").keys) == len(pool)
@@ -0,0 +1,82 @@
+import json
+import random
+import struct
+import zlib
+
+import pytest
+
+import saveformat
+from engine import GameState
+from saveformat import SaveFormatError, decode, encode, export_json, load_json_save
+
+
+def snapshot(**changes):
+    state = GameState(random.Random(1))
+    state.add_to_bag("Wood", 4)
+    state.add_to_bag("Medkit")
+    state.buildings["Campfire"] = 1
+    return {**state.to_dict(), **changes}
+
+def test_round_trip_keeps_types():
+    snap = snapshot()
+    back = decode(encode(snap))
+    assert back == snap
+    assert type(back["upgrade_amt"]) is int and type(back["alive"]) is bool
+
+@pytest.mark.parametrize("changes", [
+    {"upgrade_amt": 143.5},
+    {"upgrade_amt": 2**40},
+    {"xp": -1, "hp": 2**31, "lv": 70000, "crit_chance": 300, "strength_level": -2},
+    {"alive": 1},
+    {"bag": {"x" * 300: 1}},
+    {"bag": {"é" * 128: 1}},                     # 256 bytes in UTF-8
+    {"bag": {"Wood": 2**31}},
+    {"bag": {"Wood": -2**31 - 1}},
+    {"bag": {"Wood": 1.5}},
+    {"bag": {f"thing {i}": i for i in range(70000)}},
+    {"buildings": {"Trap": 2**40}},
+    {"weapons_inventory": {"Fists": {"name": "Fists", "bonus": 1.5}}},
+    {"weapons_inventory": {"Axe": {"name": "Axe", "bonus": 2**31}}},
+    {"weapons_inventory": {"y" * 256: {"name": "Axe", "bonus": 1}}},
+    {"weapons_inventory": {"Axe": {"name": "Axe", "bonus": 1, "tier": 2}}},
+    {"weapons_inventory": {"Axe": {"bonus": 1}}},
+    {"current_weapon": "z" * 256},
+    {"bag": {f"a{i}": 1 for i in range(40000)}, "buildings": {f"b{i}": 1 for i in range(40000)}},
+    {"mod_flag": [1, {"a": None}]},
+])
+def test_edge_values_round_trip(changes):
+    snap = snapshot(**changes)
+    assert decode(encode(snap)) == snap
+
+def test_local_names_are_interned():
+    snap = snapshot(bag={"Moon Dust": 3}, buildings={"Moon Dust": 1},
+                    weapons_inventory={"Moon Blade": {"name": "Moon Blade", "bonus": 9}},
+                    current_weapon="Moon Blade")
+    data = encode(snap)
+    assert data.count(b"Moon Dust") == 1 and data.count(b"Moon Blade") == 1
+    assert decode(data) == snap
+
+def test_corrupt_and_foreign_bytes():
+    data = encode(snapshot())
+    with pytest.raises(SaveFormatError, match="checksum"):
+        decode(data[:-5] + bytes([data[-5] ^ 1]) + data[-4:])
+    with pytest.raises(SaveFormatError):
+        decode(b'{"xp": 1}')
+    body = data[:20]
+    with pytest.raises(SaveFormatError, match="truncated"):
+        decode(body + struct.pack("<I", zlib.crc32(body)))
+
+def test_header_carries_the_only_binary_version():
+    data = encode(snapshot())
+    assert saveformat.HEADER.unpack_from(data) == (saveformat.MAGIC, saveformat.FORMAT_VERSION)
+    assert saveformat.FORMAT_VERSION == 2 and set(saveformat.DECODERS) == {2}
+    other = saveformat.HEADER.pack(saveformat.MAGIC, 3) + data[saveformat.HEADER.size:-4]
+    with pytest.raises(SaveFormatError, match="unsupported save version 3"):
+        decode(other + struct.pack("<I", zlib.crc32(other)))
+
+def test_json_saves_migrate():
+    original = {k: v for k, v in snapshot().items()
+                if k not in ("strength_level", "endurance_level", "survival_level", "crit_chance")}
+    back = load_json_save(json.dumps(original))
+    assert back["strength_level"] == 0 and back["crit_chance"] == 0
+    assert load_json_save(export_json(snapshot())) == snapshot()
@@ -0,0 +1,77 @@
+import json
+import os
+import random
+
+import pytest
+
+import savestats
+from engine import GameState
+from savestats import SaveStats, scan
+from storage import SlotStore
+
+
+def snapshot(lv, **bag):
+    state = GameState(random.Random(lv))
+    state.lv = lv
+    for name, n in bag.items():
+        state.add_to_bag(name, n)
+    return state.to_dict()
+
+@pytest.fixture
+def saves(tmp_path, monkeypatch):
+    monkeypatch.setattr(savestats, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(savestats, "CHUNK", 4)   # several buckets even for a small dir
+    store = SlotStore(str(tmp_path / "saves"), durable=False)
+    for i in range(20):
+        store.save(f"slot{i}", snapshot(1 + i % 3, Wood=i + 1))
+    return store
+
+def test_scan_totals(saves):
+    stats, parsed = scan(saves.save_dir, workers=1)
+    report = stats.report()
+    assert parsed == 20 and report["slots"] == 20 and report["failed"] == 0
+    assert report["levels"] == {"1": 7, "2": 7, "3": 6}
+    assert report["bag"]["Wood"] == {"total": sum(range(1, 21)), "saves": 20}
+
+def test_rerun_parses_only_changed_buckets(saves):
+    first, _ = scan(saves.save_dir, workers=1)
+    again, parsed = scan(saves.save_dir, workers=1)
+    assert parsed == 0 and again.report() == first.report()
+
+    saves.append("slot3", snapshot(9, Wood=3))
+    with open(os.path.join(saves.save_dir, "slot5.sav"), "wb") as f:
+        f.write(b"garbage")
+    stats, parsed = scan(saves.save_dir, workers=1)
+    assert 0 < parsed < 20
+    report = stats.report()
+    assert report["slots"] == 19 and report["failed"] == 1
+    assert report["levels"]["9"] == 1
+    assert report == scan(saves.save_dir, workers=1, use_cache=False)[0].report()
+
+def test_lone_journal_is_not_a_slot(saves):
+    with open(os.path.join(saves.save_dir, "ghost.journal"), "w") as f:
+        f.write("{}\n")
+    assert scan(saves.save_dir, workers=1)[0].report()["slots"] == 20
+
+def test_cache_is_json_without_per_save_rows(saves):
+    scan(saves.save_dir, workers=1)
+    (path,) = [os.path.join(savestats.CACHE_DIR, n) for n in os.listdir(savestats.CACHE_DIR)]
+    with open(path, encoding="utf-8") as f:
+        cache = json.load(f)
+    assert "slot0" not in json.dumps(cache)
+    assert len(cache["entries"]) == cache["buckets"] > 1
+
+def test_damaged_cache_is_ignored(saves):
+    scan(saves.save_dir, workers=1)
+    (name,) = os.listdir(savestats.CACHE_DIR)
+    with open(os.path.join(savestats.CACHE_DIR, name), "w") as f:
+        f.write("{not json")
+    stats, parsed = scan(saves.save_dir, workers=1)
+    assert parsed == 20 and stats.report()["slots"] == 20
+
+def test_stats_json_round_trip():
+    stats = SaveStats()
+    stats.add({"lv": 2, "area": "Forest", "weapon": "Axe", "weapons": ["Axe", "Fists"],
+               "bag": {"Wood": 3, "Rope": 0}, "buildings": {"Trap": 1}})
+    back = SaveStats.from_json(json.loads(json.dumps(stats.to_json())))
+    assert back.report() == stats.report() and back.levels == {2: 1}
@@ -0,0 +1,58 @@
+import asyncio
+import secrets
+
+import pytest
+
+from engine import start_boss_fight
+from server import GameServer
+
+
+@pytest.fixture
+def server(tmp_path):
+    return GameServer(str(tmp_path))
+
+def connect(server):
+    return server.sessions.create(seed=1, data={"slot": None, "player": secrets.token_hex(8)})
+
+def say(server, sid, line):
+    return "\n".join(item for item in asyncio.run(server.handle_command(sid, line)) if isinstance(item, str))
+
+def test_boss_is_not_a_command(server):
+    sid = connect(server)
+    assert "Unknown command" in say(server, sid, "boss")
+    assert "Unknown command" in say(server, sid, '{"type": "boss"}')
+    with server.sessions.session(sid) as s:
+        assert s.state.fight is None
+
+def test_death_restarts_once(server):
+    sid = connect(server)
+    with server.sessions.session(sid) as s:
+        s.state.add_to_bag("Wood", 4)
+        s.state.xp = 20
+        start_boss_fight(s.state, [])
+        s.state.hp = 1
+    reply = ""
+    while "Welcome To The Backwoods" not in reply:
+        reply = say(server, sid, "attack")
+    with server.sessions.session(sid) as s:
+        assert s.state.fight is None and s.state.hp == s.state.max_hp and s.state.xp == 0
+        assert s.state.bag["Wood"] == 4
+
+def test_saves_are_private_to_a_player(server):
+    ann, bob = connect(server), connect(server)
+    assert "player key" in say(server, ann, "save mine")
+    assert say(server, ann, "slots") == "Saves: mine"
+    assert say(server, bob, "slots") == "Saves: none"
+    assert "No save named 'mine'" in say(server, bob, "load mine")
+    say(server, bob, "save mine")   # bob's own slot, ann's is untouched
+    with server.sessions.session(ann) as s:
+        key = s.data["player"]
+    later = connect(server)
+    assert "Loaded save 'mine'" not in say(server, later, "load mine")
+    assert "✅" in say(server, later, f"key {key}")
+    assert "Loaded save 'mine'" in say(server, later, "load mine")
+
+@pytest.mark.parametrize("key", ["../../etc", "ABC", "0123456789abcdef0"])
+def test_bad_player_key(server, key):
+    sid = connect(server)
+    assert "not a player key" in say(server, sid, f"key {key}")
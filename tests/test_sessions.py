@@ -0,0 +1,92 @@
+import os
+
+import pytest
+
+from engine import GameEngine
+from sessions import SessionManager
+
+engine = GameEngine()
+
+
+def play(manager, sid, turns=5):
+    with manager.session(sid) as s:
+        for _ in range(turns):
+            engine.step(s.state, "explore" if s.state.fight is None else "attack")
+            if s.state.pending_area is not None:
+                engine.step(s.state, {"type": "advance", "accept": False})
+        return s.state.to_dict(), s.state.rng.getstate()
+
+def test_hibernated_session_continues_exactly(tmp_path):
+    manager = SessionManager(str(tmp_path), idle_timeout=10)
+    reference = SessionManager(str(tmp_path / "ref"), idle_timeout=1e9)
+    a = manager.create(seed=5, data={"name": "ann"})
+    b = reference.create(seed=5)
+    play(manager, a)
+    play(reference, b)
+    assert manager.sweep(now=float("inf")) == 1
+    assert manager.stats()["resident"] == 0 and os.path.exists(tmp_path / f"{a}.json")
+    assert play(manager, a) == play(reference, b)   # same state and same RNG position
+    assert manager.stats()["rehydrated"] == 1
+    with manager.session(a) as s:
+        assert s.data == {"name": "ann"}
+
+def test_fight_survives_hibernation(tmp_path):
+    manager = SessionManager(str(tmp_path))
+    sid = manager.create(seed=2)
+    with manager.session(sid) as s:
+        while s.state.fight is None:
+            engine.step(s.state, "search")
+        fight = s.state.fight
+    manager.sweep(now=float("inf"))
+    with manager.session(sid) as s:
+        assert s.state.fight == fight
+
+def test_sweep_skips_recent_and_busy(tmp_path):
+    manager = SessionManager(str(tmp_path), idle_timeout=100)
+    old, busy = manager.create(), manager.create()
+    with manager.session(busy):
+        assert manager.sweep(now=float("inf")) == 1   # only `old`
+    assert manager.sweep() == 0                      # `busy` was just used
+
+def test_memory_budget_evicts_least_recent(tmp_path):
+    manager = SessionManager(str(tmp_path), memory_budget=1)
+    sids = [manager.create(seed=i) for i in range(5)]
+    assert manager.stats()["resident"] <= 1
+    for sid in sids:
+        play(manager, sid, turns=1)
+    assert manager.stats()["resident"] <= 1 and len(manager) == 5
+
+def test_unknown_and_closed_sessions(tmp_path):
+    manager = SessionManager(str(tmp_path))
+    with pytest.raises(KeyError):
+        with manager.session("nope"):
+            pass
+    sid = manager.create()
+    manager.sweep(now=float("inf"))
+    manager.close(sid)
+    assert sid not in manager and not os.listdir(tmp_path)
+    with pytest.raises(KeyError):
+        with manager.session(sid):
+            pass
+
+def test_shared_managers_see_each_others_writes(tmp_path):
+    one = SessionManager(str(tmp_path), shared=True)
+    two = SessionManager(str(tmp_path), shared=True)
+    sid = one.create(seed=9)
+    assert sid in two
+    reference = SessionManager(str(tmp_path / "ref"))
+    ref = reference.create(seed=9)
+    for manager in (one, two, two, one, two):   # requests alternating between workers
+        assert play(manager, sid, turns=2) == play(reference, ref, turns=2)
+
+def test_shared_close_is_seen_by_the_other(tmp_path):
+    one = SessionManager(str(tmp_path), shared=True)
+    two = SessionManager(str(tmp_path), shared=True)
+    sid = one.create()
+    play(two, sid)
+    one.close(sid)
+    assert sid not in two
+    with pytest.raises(KeyError):
+        with two.session(sid):
+            pass
+    assert not os.listdir(tmp_path)
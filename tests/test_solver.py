@@ -0,0 +1,74 @@
+import random
+from collections import Counter
+
+import pytest
+
+import solver
+from engine import GameEngine, GameState, start_boss_fight, start_fight
+
+
+def simulate_fight(enemy, runs, seed=0):
+    engine, wins = GameEngine(), 0
+    for i in range(runs):
+        state = GameState(random.Random(seed + i))
+        start_fight(state, dict(enemy), [])
+        while state.fight is not None:
+            events = engine.step(state, "attack")
+        wins += any(ev["type"] == "victory" for ev in events)
+    return wins / runs
+
+def simulate_boss(solution, max_hp, att, crit_chance, items, runs, seed=0):
+    """Play the engine's Titan fight following `solution`; returns the win rate."""
+    engine, wins = GameEngine(), 0
+    for i in range(runs):
+        state = GameState(random.Random(seed + i))
+        state.max_hp = state.hp = max_hp
+        state.att, state.crit_chance = att, crit_chance
+        state.bag = dict(Counter(items))
+        start_boss_fight(state, [])
+        while state.fight is not None:
+            fight = state.fight
+            held = [name for name, n in state.bag.items() for _ in range(n)]
+            move = solution.action(state.hp, fight["enemy_hp"], fight["burn_turns"], held,
+                                   boosted=fight["attack"] > state.total_attack())
+            events = engine.step(state, "attack" if move == "attack" else {"type": "use_item", "item": move})
+        wins += any(ev["type"] == "boss_defeated" for ev in events)
+    return wins / runs
+
+
+def test_regular_fight_matches_simulation():
+    ape = solver.find_enemy("Wild Ape", "Highlands")
+    odds = solver.solve_fight(60, 6, 0, "Fists", ape["name"], ape["hp"], ape["attack"])
+    assert odds["win"] == pytest.approx(0.8883, abs=5e-5)
+    assert simulate_fight(ape, 20000) == pytest.approx(odds["win"], abs=0.009)   # ~4 sigma
+
+def test_bow_only_softens_non_flying_enemies():
+    wolf, hawk = solver.find_enemy("Wolf"), solver.find_enemy("Hawk")
+    assert solver.bow_reduction("Bow", wolf["name"]) == 1 and solver.bow_reduction("Bow", hawk["name"]) == 0
+    bow = solver.solve_fight(20, 6, 0, "Bow", wolf["name"], wolf["hp"], wolf["attack"])
+    fists = solver.solve_fight(20, 6, 0, "Fists", wolf["name"], wolf["hp"], wolf["attack"])
+    assert bow["win"] > fists["win"]
+
+def test_boss_policy_matches_simulation():
+    items = ["Fruit", "Adrenaline Shot"]
+    solution = solver.solve_boss(100, 20, 0, items, use_cache=False)
+    assert solution.survival() == pytest.approx(0.5172, abs=5e-5)
+    assert simulate_boss(solution, 100, 20, 0, items, 5000) == pytest.approx(solution.survival(), abs=0.03)
+
+def test_boss_policy_picks_which_heal():
+    solution = solver.solve_boss(90, 22, 0, ["Fruit", "Medkit"], use_cache=False)
+    medkit_only = solver.solve_boss(90, 22, 0, ["Medkit"], use_cache=False)
+    assert solution.survival() > medkit_only.survival()
+    moves = {solution.action(hp, b, burn) for hp in range(1, 91) for b in range(1, 201) for burn in range(4)}
+    assert {"attack", "Fruit", "Medkit"} <= moves
+    assert solution.action(5, 200, items=[]) == "attack"     # nothing left to use
+
+def test_boss_odds_uses_the_bag(monkeypatch, tmp_path):
+    monkeypatch.setattr(solver, "BOSS_CACHE_DIR", str(tmp_path))
+    state = GameState(random.Random(0))
+    state.max_hp = state.hp = 100
+    state.att = 20
+    plain = solver.boss_odds(state)
+    state.bag = {"Fruit": 1, "Adrenaline Shot": 1}
+    assert solver.boss_odds(state) > plain
+    assert len(list(tmp_path.iterdir())) == 2     # one cached solution per loadout
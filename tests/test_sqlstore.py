@@ -0,0 +1,66 @@
+import random
+import sqlite3
+import time
+
+import pytest
+
+from engine import GameState
+from saveformat import decode
+from sqlstore import SQLiteSlotStore
+
+
+def snapshot(**changes):
+    return {**GameState(random.Random(1)).to_dict(), **changes}
+
+@pytest.fixture
+def db(tmp_path):
+    store = SQLiteSlotStore(str(tmp_path / "saves.db"), pool_size=2, batch_size=1000, commit_interval=0.05)
+    yield store
+    store.close()
+
+def committed_xp(path, slot):
+    conn = sqlite3.connect(path)
+    try:
+        row = conn.execute("SELECT data FROM slots WHERE name = ?", (slot,)).fetchone()
+    finally:
+        conn.close()
+    return None if row is None else decode(row[0])["xp"]
+
+def test_save_load_delete(db):
+    db.save("a", snapshot(xp=3, lv=2))
+    assert db.load("a") == snapshot(xp=3, lv=2)
+    assert db.exists("a") and db.list() == ["a"]
+    assert db.catalog()[0]["level"] == 2
+    db.delete("a")
+    assert not db.exists("a")
+    with pytest.raises(FileNotFoundError):
+        db.load("a")
+    with pytest.raises(FileNotFoundError):
+        db.delete("a")
+
+def test_append_is_readable_before_commit(db):
+    db.save("a", snapshot())
+    db.append("a", snapshot(xp=9))
+    assert db.load("a")["xp"] == 9
+
+def test_last_append_commits_without_another_write(db):
+    db.save("a", snapshot())
+    db.append("a", snapshot(xp=7))
+    deadline = time.monotonic() + 5
+    while committed_xp(db.path, "a") != 7:
+        assert time.monotonic() < deadline, "the open batch was never committed"
+        time.sleep(0.02)
+    # ...and the write lock is free again for other connections
+    conn = sqlite3.connect(db.path, timeout=0)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("ROLLBACK")
+    finally:
+        conn.close()
+
+def test_close_commits(tmp_path):
+    path = str(tmp_path / "saves.db")
+    store = SQLiteSlotStore(path, commit_interval=60)
+    store.append("a", snapshot(xp=4))
+    store.close()
+    assert committed_xp(path, "a") == 4
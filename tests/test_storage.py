@@ -0,0 +1,114 @@
+import json
+import os
+import random
+
+import pytest
+
+import storage
+from engine import GameState
+from saveformat import encode
+from storage import SlotStore, apply_delta, diff_state, read_slot
+
+
+def snapshot(seed=1, **changes):
+    state = GameState(random.Random(seed))
+    state.add_to_bag("Wood", 2)
+    return {**state.to_dict(), **changes}
+
+def test_diff_and_apply_round_trip():
+    old = snapshot()
+    new = snapshot(xp=40, hp=12, bag={"Stone": 1}, buildings={"Campfire": 1})
+    delta = diff_state(old, new)
+    assert apply_delta(json.loads(json.dumps(old)), delta) == new
+    assert apply_delta(apply_delta(dict(old), delta), delta) == new   # absolute values: replay is harmless
+    assert diff_state(new, new) is None
+
+def test_save_append_load(tmp_path):
+    store = SlotStore(str(tmp_path), durable=False)
+    store.save("one", snapshot())
+    for xp in range(1, 6):
+        store.append("one", snapshot(xp=xp))
+    assert os.path.exists(store.journal_path("one"))
+    assert SlotStore(str(tmp_path)).load("one") == snapshot(xp=5)
+    assert read_slot(str(tmp_path), "one")[1] == 5
+
+def test_append_to_new_slot_saves(tmp_path):
+    store = SlotStore(str(tmp_path), durable=False)
+    store.append("fresh", snapshot(xp=3))
+    assert not os.path.exists(store.journal_path("fresh"))
+    assert store.load("fresh") == snapshot(xp=3)
+
+def test_compact_folds_the_journal(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "COMPACT_EVERY", 4)
+    store = SlotStore(str(tmp_path), durable=False)
+    store.save("s", snapshot())
+    for xp in range(1, 5):
+        store.append("s", snapshot(xp=xp))
+    assert not os.path.exists(store.journal_path("s"))
+    store.append("s", snapshot(xp=9))
+    assert SlotStore(str(tmp_path)).load("s") == snapshot(xp=9)
+
+def test_torn_journal_line_is_cut(tmp_path):
+    store = SlotStore(str(tmp_path), durable=False)
+    store.save("s", snapshot())
+    store.append("s", snapshot(xp=1))
+    with open(store.journal_path("s"), "ab") as f:
+        f.write(b'{"gen":1,"set":{"xp"')
+    fresh = SlotStore(str(tmp_path), durable=False)
+    assert fresh.load("s") == snapshot(xp=1)
+    fresh.append("s", snapshot(xp=2))
+    assert SlotStore(str(tmp_path)).load("s") == snapshot(xp=2)
+
+def test_crash_between_snapshot_and_journal_removal(tmp_path, monkeypatch):
+    store = SlotStore(str(tmp_path), durable=False)
+    store.save("s", snapshot())
+    store.append("s", snapshot(xp=50, hp=5))
+    journal = store.journal_path("s")
+
+    real_remove = os.remove
+    def crash(path):
+        if path == journal:
+            raise KeyboardInterrupt("power cut")
+        real_remove(path)
+    monkeypatch.setattr(os, "remove", crash)
+    with pytest.raises(KeyboardInterrupt):
+        store.save("s", snapshot(seed=2, xp=1))   # a new game saved over the slot
+    monkeypatch.setattr(os, "remove", real_remove)
+
+    assert os.path.exists(journal)   # the old deltas are still there...
+    fresh = SlotStore(str(tmp_path), durable=False)
+    assert fresh.load("s") == snapshot(seed=2, xp=1)   # ...but don't apply to the new snapshot
+    assert os.path.getsize(journal) == 0
+    fresh.append("s", snapshot(seed=2, xp=2))
+    assert SlotStore(str(tmp_path)).load("s") == snapshot(seed=2, xp=2)
+
+def test_old_saves_without_generations_still_load(tmp_path):
+    with open(tmp_path / "old.sav", "wb") as f:
+        f.write(encode(snapshot()))
+    with open(tmp_path / "old.journal", "w") as f:
+        f.write(json.dumps(diff_state(snapshot(), snapshot(xp=7))) + "\n")
+    store = SlotStore(str(tmp_path), durable=False)
+    assert store.load("old") == snapshot(xp=7)
+    store.append("old", snapshot(xp=8))
+    store.save("old", snapshot(xp=9))
+    assert SlotStore(str(tmp_path)).load("old") == snapshot(xp=9)
+
+def test_legacy_json_is_converted(tmp_path):
+    with open(tmp_path / "legacy.json", "w") as f:
+        json.dump(snapshot(lv=3), f)
+    store = SlotStore(str(tmp_path), durable=False)
+    assert store.load("legacy") == snapshot(lv=3)
+    store.save("legacy", snapshot(lv=4))
+    assert not os.path.exists(store.legacy_path("legacy"))
+    assert store.load("legacy") == snapshot(lv=4)
+
+def test_catalog_and_delete(tmp_path):
+    store = SlotStore(str(tmp_path), durable=False)
+    store.save("b", snapshot(lv=2))
+    store.save("A", snapshot())
+    assert store.list() == ["A", "b"]
+    assert {e["name"]: e["level"] for e in SlotStore(str(tmp_path)).catalog()} == {"A": 1, "b": 2}
+    store.delete("b")
+    assert store.list() == ["A"]
+    with pytest.raises(FileNotFoundError):
+        store.delete("b")
@@ -0,0 +1,48 @@
+import random
+
+from vecenv import ACTION_INDEX, ACTIONS, NUM_ACTIONS, OBS_SIZE, VecEnv, valid_actions
+
+REFUSED = {"invalid_action", "invalid_choice", "missing_materials", "no_building",
+           "already_built", "already_owned", "already_equipped", "trap_limit",
+           "cook_failed", "cannot_run", "cannot_use"}
+
+
+def test_masked_actions_are_never_refused():
+    env = VecEnv(16, seed=3)
+    for s in env.states:    # plenty of materials so the craft branches are reachable
+        s.bag.update({"Wood": 40, "Stone": 20, "Rope": 30, "Bones": 20, "Scales": 10, "Fur": 10, "Meat": 12})
+    rng = random.Random(0)
+    seen = set()
+    for _ in range(400):
+        masks = env.action_masks()
+        actions = []
+        for i, s in enumerate(env.states):
+            allowed = [a for a in range(NUM_ACTIONS) if masks[i * NUM_ACTIONS + a]]
+            assert sorted(allowed) == sorted(valid_actions(s))
+            actions.append(rng.choice(allowed))
+        _, _, _, events = env.step(actions)
+        for a, evs in zip(actions, events):
+            seen.add(a)
+            refused = [ev for ev in evs if ev["type"] in REFUSED]
+            assert not refused, (ACTIONS[a], refused)
+    for name in ("craft Trap", "craft Advanced Trap", "craft Campfire", "craft Workbench", "cook"):
+        assert ACTION_INDEX[name] in seen
+
+def test_buildings_leave_the_mask_once_unaffordable_or_built():
+    env = VecEnv(1)
+    s = env.states[0]
+    crafts = {a for a in valid_actions(s) if ACTIONS[a]["type"] == "craft"}
+    assert crafts == set()      # empty bag: nothing to build
+    s.bag.update({"Wood": 40, "Stone": 20, "Rope": 30, "Bones": 20})
+    s.buildings.update({"Workbench": 1, "Campfire": 1, "Trap": 4})
+    names = {ACTIONS[a]["recipe"] for a in valid_actions(s) if ACTIONS[a]["type"] == "craft"}
+    assert "Workbench" not in names and "Campfire" not in names and "Trap" not in names
+    assert "Advanced Trap" in names     # replaces a normal trap at the cap
+    s.buildings.update({"Trap": 0, "Advanced Trap": 4})
+    names = {ACTIONS[a]["recipe"] for a in valid_actions(s) if ACTIONS[a]["type"] == "craft"}
+    assert "Advanced Trap" not in names
+
+def test_obs_buffer_shape():
+    env = VecEnv(3)
+    obs, rewards, dones, events = env.step([ACTION_INDEX["explore"]] * 3)
+    assert len(obs) == 3 * OBS_SIZE and len(rewards) == 3 and len(dones) == 3 and len(events) == 3
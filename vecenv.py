@@ -0,0 +1,250 @@
+# ============================
+# VECENV.PY - Vectorized environment for training bots
+# Steps N independent games in lockstep through GameEngine.
+# Observations, rewards and done flags live in flat contiguous
+# arrays (stdlib array; zero-copy NumPy views if numpy is installed).
+#
+# Benchmark:  python vecenv.py [--envs 256] [--steps 2000] [--seed 0]
+# ============================
+
+import argparse
+import random
+import struct
+import time
+from array import array
+
+from engine import (
+    ADV_TRAP_COST,
+    CAMPFIRE_COST,
+    CRAFT_ARMOR_ADV,
+    CRAFT_WEAPONS_ADV,
+    CRAFT_WEAPONS_BASIC,
+    FINDABLE_WEAPONS,
+    ITEM_NAMES,
+    RESOURCE_NAMES,
+    TRAP_COST,
+    WORKBENCH_COST,
+    GameEngine,
+    GameState,
+)
+
+# ==== Action Space (index → engine action) ====
+ITEM_ORDER = sorted(ITEM_NAMES)
+RECIPES = [r["name"] for r in CRAFT_WEAPONS_BASIC + CRAFT_WEAPONS_ADV + CRAFT_ARMOR_ADV] + \
+          ["Trap", "Advanced Trap", "Campfire", "Workbench"]
+WEAPON_ORDER = ["Fists"] + [r["name"] for r in CRAFT_WEAPONS_BASIC + CRAFT_WEAPONS_ADV] + list(FINDABLE_WEAPONS)
+UPGRADE_PATHS = ["Strength", "Endurance", "Survival"]
+
+ACTIONS = (
+    [{"type": "explore"}, {"type": "search"}, {"type": "attack"}, {"type": "run"},
+     {"type": "advance", "accept": True}, {"type": "advance", "accept": False},
+     {"type": "cook"}, {"type": "check_traps"}]
+    + [{"type": "use_item", "item": name} for name in ITEM_ORDER]
+    + [{"type": "craft", "recipe": name} for name in RECIPES]
+    + [{"type": "upgrade", "path": path} for path in UPGRADE_PATHS]
+    + [{"type": "equip", "weapon": name} for name in WEAPON_ORDER]
+)
+ACTION_NAMES = [" ".join(str(v) for v in a.values()) for a in ACTIONS]
+ACTION_INDEX = {name: i for i, name in enumerate(ACTION_NAMES)}
+NUM_ACTIONS = len(ACTIONS)
+
+# ==== Observation Layout (one row of ints per env) ====
+BAG_ORDER = sorted(RESOURCE_NAMES) + ITEM_ORDER
+BUILDING_ORDER = ["Campfire", "Trap", "Advanced Trap", "Workbench"]
+OBS_FIELDS = (
+    ["hp", "max_hp", "xp", "upgrade_amt", "lv", "area", "strength", "endurance", "survival",
+     "crit_chance", "weapon", "attack", "adrenaline", "in_fight", "enemy_hp", "enemy_attack",
+     "boss", "burn_turns", "can_run", "pending_area"]
+    + ["bag:" + name for name in BAG_ORDER]
+    + ["building:" + name for name in BUILDING_ORDER]
+    + ["owns:" + name for name in WEAPON_ORDER]
+)
+OBS_SIZE = len(OBS_FIELDS)
+HOT_SIZE = OBS_FIELDS.index("bag:" + BAG_ORDER[0])   # scalar columns rewritten every step
+HOT_ROW = struct.Struct(f"{HOT_SIZE}i")
+INVENTORY_ROW = struct.Struct(f"{OBS_SIZE - HOT_SIZE}i")
+WEAPON_INDEX = {name: i for i, name in enumerate(WEAPON_ORDER)}
+
+# ==== Rewards ====
+WIN_REWARD = 100.0
+DEATH_PENALTY = 10.0
+INVALID_PENALTY = 0.1
+
+
+class VecEnv:
+    """
+    N games stepped together. step(actions) takes one action index per env and
+    returns (obs, rewards, dones, events): obs is an array('i') of N × OBS_SIZE,
+    rewards array('d'), dones array('b'), events the engine event lists.
+    Finished games (Titan beaten or max_steps reached) reset automatically.
+    """
+
+    def __init__(self, num_envs, seed=0, max_steps=5000):
+        self.num_envs = num_envs
+        self.max_steps = max_steps
+        self.engine = GameEngine()
+        self.states = [GameState(random.Random(f"vecenv-{seed}-{i}")) for i in range(num_envs)]
+        self.steps = [0] * num_envs
+        self.obs = array("i", bytes(4 * num_envs * OBS_SIZE))
+        self.rewards = array("d", bytes(8 * num_envs))
+        self.dones = array("b", bytes(num_envs))
+        self.events = [[] for _ in range(num_envs)]
+        self._seen = [None] * num_envs   # (bag, buildings, weapons dict, weapon count) last written
+        self.reset()
+
+    def reset(self):
+        for i, state in enumerate(self.states):
+            state.reset()
+            self.steps[i] = 0
+            self._write_obs(i)
+        return self.obs
+
+    def step(self, actions):
+        step = self.engine.step
+        states, rewards, dones = self.states, self.rewards, self.dones
+        for i, a in enumerate(actions):
+            state = states[i]
+            events = step(state, ACTIONS[a])
+            reward = 0.0
+            done = False
+            for ev in events:
+                kind = ev["type"]
+                if kind == "victory":
+                    reward += ev["xp"]
+                elif kind == "death":
+                    reward -= DEATH_PENALTY
+                elif kind == "boss_defeated":
+                    reward += WIN_REWARD
+                    done = True
+                elif kind == "invalid_action" or kind == "invalid_choice":
+                    reward -= INVALID_PENALTY
+            self.steps[i] += 1
+            if done or self.steps[i] >= self.max_steps:
+                done = True
+                state.reset()
+                self.steps[i] = 0
+            rewards[i] = reward
+            dones[i] = done
+            self.events[i] = events
+            self._write_obs(i)
+        return self.obs, rewards, dones, self.events
+
+    def _write_obs(self, i):
+        s = self.states[i]
+        fight = s.fight
+        obs = self.obs
+        offset = i * OBS_SIZE * 4
+        if fight is None:
+            HOT_ROW.pack_into(
+                obs, offset, s.hp, s.max_hp, s.xp, int(s.upgrade_amt), s.lv, s.current_area_index,
+                s.strength_level, s.endurance_level, s.survival_level, s.crit_chance,
+                WEAPON_INDEX.get(s.current_weapon, -1), s.total_attack(), s.adrenaline_active,
+                0, 0, 0, 0, 0, 0, -1 if s.pending_area is None else s.pending_area)
+        else:
+            HOT_ROW.pack_into(
+                obs, offset, s.hp, s.max_hp, s.xp, int(s.upgrade_amt), s.lv, s.current_area_index,
+                s.strength_level, s.endurance_level, s.survival_level, s.crit_chance,
+                WEAPON_INDEX.get(s.current_weapon, -1), s.total_attack(), s.adrenaline_active,
+                1, fight["enemy_hp"], fight["enemy"]["attack"], fight["boss"], fight["burn_turns"],
+                fight["allow_run"] and not fight["boss"], -1)
+
+        # Inventory columns only change on gathers/crafts/deaths, so skip them when nothing moved
+        bag, buildings, owned = s.bag, s.buildings, s.weapons_inventory
+        seen = self._seen[i]
+        if seen is None or seen[0] != bag or seen[1] != buildings or seen[2] is not owned or seen[3] != len(owned):
+            INVENTORY_ROW.pack_into(obs, offset + HOT_SIZE * 4,
+                                    *[bag.get(name, 0) for name in BAG_ORDER],
+                                    *[buildings.get(name, 0) for name in BUILDING_ORDER],
+                                    *[name in owned for name in WEAPON_ORDER])
+            self._seen[i] = (dict(bag), dict(buildings), owned, len(owned))
+
+    def action_masks(self):
+        """array('b') of N × NUM_ACTIONS: 1 where the action does something useful right now."""
+        masks = array("b", bytes(self.num_envs * NUM_ACTIONS))
+        for i, s in enumerate(self.states):
+            base = i * NUM_ACTIONS
+            for a in valid_actions(s):
+                masks[base + a] = 1
+        return masks
+
+    def as_numpy(self):
+        """Zero-copy (obs, rewards, dones) NumPy views; needs numpy."""
+        import numpy as np
+        return (np.frombuffer(self.obs, dtype=np.int32).reshape(self.num_envs, OBS_SIZE),
+                np.frombuffer(self.rewards, dtype=np.float64),
+                np.frombuffer(self.dones, dtype=np.int8))
+
+
+def valid_actions(s):
+    """Indices into ACTIONS that the engine would accept and that change something."""
+    index = ACTION_INDEX
+    if s.fight is not None:
+        valid = [index["attack"]]
+        if s.fight["allow_run"] and not s.fight["boss"]:
+            valid.append(index["run"])
+        valid += [index["use_item " + name] for name in ITEM_ORDER if s.bag.get(name, 0) > 0]
+        return valid
+    if s.pending_area is not None:
+        return [index["advance True"], index["advance False"]]
+
+    valid = [index["explore"], index["search"]]
+    valid += [index["use_item " + name] for name in ITEM_ORDER if s.bag.get(name, 0) > 0]
+    for kind, rec in s.gear_recipes():
+        if s.have_in_bag(rec["cost"]) and not (kind == "weapon" and rec["name"] in s.weapons_inventory):
+            valid.append(index["craft " + rec["name"]])
+    buildings = s.buildings
+    trap_room = not s.is_trap_cap_reached()
+    if trap_room and s.have_in_bag(TRAP_COST):
+        valid.append(index["craft Trap"])
+    if (buildings.get("Workbench", 0) and s.have_in_bag(ADV_TRAP_COST)
+            and (trap_room or buildings.get("Trap", 0))):
+        valid.append(index["craft Advanced Trap"])
+    for name, cost in (("Campfire", CAMPFIRE_COST), ("Workbench", WORKBENCH_COST)):
+        if not buildings.get(name) and s.have_in_bag(cost):
+            valid.append(index["craft " + name])
+    if s.can_level_up():
+        valid += [index["upgrade " + path] for path, _, _ in s.upgrade_choices()]
+    if s.buildings.get("Campfire", 0) and s.bag.get("Meat", 0) >= 5:
+        valid.append(index["cook"])
+    if s.buildings.get("Trap", 0) or s.buildings.get("Advanced Trap", 0):
+        valid.append(index["check_traps"])
+    valid += [index["equip " + name] for name in s.weapons_inventory
+              if name != s.current_weapon and name in WEAPON_INDEX]
+    return valid
+
+
+# ===============================================
+# Entry (throughput benchmark with a random masked policy)
+# ===============================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark VecEnv steps per second.")
+    parser.add_argument("--envs", type=int, default=256)
+    parser.add_argument("--steps", type=int, default=2000, help="lockstep iterations")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    env = VecEnv(args.envs, seed=args.seed)
+    rng = random.Random(args.seed)    # the policy; each game has its own stream
+    explore, attack = ACTION_INDEX["explore"], ACTION_INDEX["attack"]
+    advance = ACTION_INDEX["advance True"]
+
+    stepping = 0.0
+    for _ in range(args.steps):
+        actions = []
+        for s in env.states:
+            if s.fight is not None:
+                actions.append(attack)
+            elif s.pending_area is not None:
+                actions.append(advance)
+            else:
+                actions.append(explore if rng.random() < 0.9 else rng.randrange(NUM_ACTIONS))
+        began = time.perf_counter()
+        env.step(actions)
+        stepping += time.perf_counter() - began
+
+    total = args.envs * args.steps
+    print(f"{total:,} env steps in {stepping:.2f}s of step() time → {total / stepping:,.0f} steps/s "
+          f"({args.envs} envs, obs {OBS_SIZE} ints, {NUM_ACTIONS} actions)")
+
+if __name__ == "__main__":
+    main()